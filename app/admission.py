@@ -0,0 +1,138 @@
+import asyncio
+import heapq
+import itertools
+from typing import Dict, List, Tuple
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import (ADMISSION_READ_LIMIT, ADMISSION_WRITE_LIMIT, ADMISSION_EXPORT_LIMIT,
+                        ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_SECONDS, ADMISSION_RETRY_AFTER_SECONDS)
+
+API_PREFIX = "/api/v1/"
+
+# Heavy read paths that get their own, smaller limit
+EXPORT_PREFIXES = ("/api/v1/feed", "/api/v1/stats/")
+
+# POST routes that only read, taking their query as a JSON body
+READ_ONLY_POSTS = ("/api/v1/eligibility",)
+
+# Long-lived live push connections are not request-shaped and bypass admission
+STREAMING_PREFIXES = ("/api/v1/live/",)
+
+# Lower value = served first when a slot frees up
+DETAIL_PRIORITY = 0
+LIST_PRIORITY = 1
+
+# Concurrency limit with a bounded priority wait queue and a queueing deadline
+class ConcurrencyLimiter:
+    def __init__(self, name: str, limit: int, max_queue: int = ADMISSION_QUEUE_SIZE,
+                 timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+
+    async def acquire(self, priority: int = DETAIL_PRIORITY) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before the client went away
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._discard(entry)
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        # Hand the slot straight to the highest priority waiter, if any
+        while self._waiters:
+            future = heapq.heappop(self._waiters)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _discard(self, entry: list) -> None:
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def metrics(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": self.shed
+        }
+
+class AdmissionController:
+    def __init__(self):
+        self.limiters = {
+            "reads": ConcurrencyLimiter("reads", ADMISSION_READ_LIMIT),
+            "writes": ConcurrencyLimiter("writes", ADMISSION_WRITE_LIMIT),
+            "exports": ConcurrencyLimiter("exports", ADMISSION_EXPORT_LIMIT)
+        }
+
+    def classify(self, method: str, path: str) -> Tuple[str, int]:
+        if path.startswith(EXPORT_PREFIXES) or path.endswith("/batch-get"):
+            return "exports", LIST_PRIORITY
+        if method not in ("GET", "HEAD"):
+            if path.rstrip("/") in READ_ONLY_POSTS:
+                return "reads", LIST_PRIORITY
+            return "writes", DETAIL_PRIORITY
+        # List routes end with a slash, detail routes end with an id
+        return "reads", LIST_PRIORITY if path.endswith("/") else DETAIL_PRIORITY
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {name: limiter.metrics() for name, limiter in self.limiters.items()}
+
+admission = AdmissionController()
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or not scope["path"].startswith(API_PREFIX)
+                or scope["path"].startswith(STREAMING_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        group, priority = self.controller.classify(scope["method"], scope["path"])
+        limiter = self.controller.limiters[group]
+        if not await limiter.acquire(priority):
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
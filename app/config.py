@@ -0,0 +1,82 @@
+import os
+
+# Stats
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+
+# Archival of expired posts
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+# Batch get-by-ids
+MAX_BATCH_IDS = int(os.getenv("MAX_BATCH_IDS", "500"))
+
+# Write-behind ingestion
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "10000"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_FLUSH_INTERVAL_SECONDS = float(os.getenv("INGEST_FLUSH_INTERVAL_SECONDS", "0.5"))
+INGEST_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("INGEST_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+INGEST_TICKET_RETENTION = int(os.getenv("INGEST_TICKET_RETENTION", "100000"))
+
+# Admission control (concurrent requests per route group)
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", "32"))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", "16"))
+ADMISSION_EXPORT_LIMIT = int(os.getenv("ADMISSION_EXPORT_LIMIT", "4"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "128"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# Response/document cache
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # "memory" or "redis"
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_VERSIONS = int(os.getenv("CACHE_MAX_VERSIONS", "100000"))
+# Redis version counters expire this long after their last bump; entries never outlive them
+CACHE_VERSION_TTL_SECONDS = float(os.getenv("CACHE_VERSION_TTL_SECONDS", str(max(86400.0, 2 * CACHE_TTL_SECONDS))))
+
+# Bulk create
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+
+# Sector name fan-out
+SECTOR_FANOUT_BATCH_SIZE = int(os.getenv("SECTOR_FANOUT_BATCH_SIZE", "1000"))
+SECTOR_FANOUT_JOB_RETENTION = int(os.getenv("SECTOR_FANOUT_JOB_RETENTION", "100"))
+
+# Materialized per-state bundles
+BUNDLE_MAX_ITEMS = int(os.getenv("BUNDLE_MAX_ITEMS", "500"))
+BUNDLE_REFRESH_DELAY_SECONDS = float(os.getenv("BUNDLE_REFRESH_DELAY_SECONDS", "1"))
+
+# Live push (SSE / WebSocket)
+LIVE_BUFFER_SIZE = int(os.getenv("LIVE_BUFFER_SIZE", "100"))
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", "15"))
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "10000"))
+
+# Subscription matching
+MATCH_QUEUE_SIZE = int(os.getenv("MATCH_QUEUE_SIZE", "10000"))
+MATCH_BATCH_SIZE = int(os.getenv("MATCH_BATCH_SIZE", "1000"))
+MATCH_LATENCY_SAMPLES = int(os.getenv("MATCH_LATENCY_SAMPLES", "1000"))
+MATCH_RELOAD_SECONDS = float(os.getenv("MATCH_RELOAD_SECONDS", "30"))
+
+# Storage backend: "mongo", or "memory" for a read-only node serving a BSON snapshot
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+STORAGE_SNAPSHOT_DIR = os.getenv("STORAGE_SNAPSHOT_DIR", "snapshot/ccos_scrapesarthi")
+
+# Per-request profiling: requests carrying X-Profile-Token, or a sampled share of them
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+PROFILE_TOP_ENTRIES = int(os.getenv("PROFILE_TOP_ENTRIES", "30"))
+PROFILING_ENABLED = bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+# MongoDB connection
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "ccos_scrapesarthi")
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# Seconds between startup attempts while the database can't be reached
+STARTUP_RETRY_SECONDS = float(os.getenv("STARTUP_RETRY_SECONDS", "5"))
+
+# Document eligibility index
+ELIGIBILITY_REBUILD_DELAY_SECONDS = float(os.getenv("ELIGIBILITY_REBUILD_DELAY_SECONDS", "1"))
+ELIGIBILITY_RELOAD_SECONDS = float(os.getenv("ELIGIBILITY_RELOAD_SECONDS", "30"))
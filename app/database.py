@@ -1,5 +1,34 @@
+import threading
+from typing import Optional
 from pymongo import MongoClient
+from pymongo.database import Database
+from app.config import (MONGO_URI, MONGO_DB_NAME, MONGO_MIN_POOL_SIZE, MONGO_MAX_POOL_SIZE,
+                        MONGO_SERVER_SELECTION_TIMEOUT_MS)
+from app.profiling import mongo_timing_listener
 
-# MongoDB connection (synchronous)
-client = MongoClient("mongodb://localhost:27017")
-db = client["ccos_scrapesarthi"]
\ No newline at end of file
+# MongoDB connection (synchronous), created on first use or by the app lifespan
+_client: Optional[MongoClient] = None
+_lock = threading.Lock()
+
+def get_client() -> MongoClient:
+    global _client
+    with _lock:
+        if _client is None:
+            _client = MongoClient(
+                MONGO_URI,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[mongo_timing_listener]
+            )
+        return _client
+
+def get_db() -> Database:
+    return get_client()[MONGO_DB_NAME]
+
+def close_client() -> None:
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -1,16 +1,28 @@
-from app.database import db
+from app.storage import get_storage
 
 def get_states_and_cities_collection():
-    return db["states_and_cities"]
+    return get_storage()["states_and_cities"]
 
 def get_sectors_collection():
-    return db["sectors"]
+    return get_storage()["sectors"]
 
 def get_scheme_posts_collection():
-    return db["scheme_posts"]
+    return get_storage()["scheme_posts"]
 
 def get_gov_jobs_posts_collection():
-    return db["gov_jobs_posts"]
+    return get_storage()["gov_jobs_posts"]
 
 def get_digital_services_collection():
-    return db["digital_services"]
\ No newline at end of file
+    return get_storage()["digital_services"]
+
+def get_scheme_posts_archive_collection():
+    return get_storage()["scheme_posts_archive"]
+
+def get_gov_jobs_posts_archive_collection():
+    return get_storage()["gov_jobs_posts_archive"]
+
+def get_state_bundles_collection():
+    return get_storage()["state_bundles"]
+
+def get_subscriptions_collection():
+    return get_storage()["subscriptions"]
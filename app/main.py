@@ -1,10 +1,164 @@
-from fastapi import FastAPI
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from app.admission import AdmissionControlMiddleware, admission
+from app.config import MONGO_MIN_POOL_SIZE, STARTUP_RETRY_SECONDS
+from app.database import get_client
 from app.posts.api import router as posts_router
+from app.posts.archive import ExpiredPostArchiver
+from app.posts.bundles import StateBundleRefresher
+from app.posts.eligibility import eligibility_index
+from app.posts.feed import backfill_last_activity
+from app.posts.indexes import ensure_indexes
+from app.posts.ingest import ingest_queue
+from app.posts.live import live_hub
+from app.posts.matching import SubscriptionMatcher
+from app.posts.sector_fanout import backfill_sector_name
+from app.profiling import ProfilingMiddleware, admin_router as profiling_router
+from app.storage import get_storage, close_storage, ReadOnlyStorageError, UnsupportedQueryError
+from app.warmup import Readiness, warm_pool, measure_ping, ping, prime_index_metadata, prime_reference_data
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
-app.include_router(posts_router, prefix="/api/v1")
+def startup(app: FastAPI) -> None:
+    started = time.perf_counter()
+    storage = get_storage()
+    readiness = app.state.readiness
+    if not storage.read_only:
+        client = get_client()
+        readiness.checks["pool_warmed"] = warm_pool(client, MONGO_MIN_POOL_SIZE)
+        readiness.checks["ping_ms"] = measure_ping(client)
+        ensure_indexes(storage.db)
+        for name in ("scheme_posts", "gov_jobs_posts", "digital_services"):
+            backfill_last_activity(storage[name])
+        for name in ("scheme_posts", "gov_jobs_posts"):
+            backfill_sector_name(storage[name], storage["sectors"])
+        readiness.checks["indexes"] = prime_index_metadata(storage)
+    readiness.checks["reference_data"] = prime_reference_data(storage)
+    eligibility_index.load(storage)
 
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to the CCOS Scrapesarthi API"}
\ No newline at end of file
+    # Snapshot-serving nodes run no maintenance or write-side workers. The
+    # matcher is the only one that reads on start, so it goes first: if it
+    # fails, nothing has been started and the whole startup can be retried.
+    if not storage.read_only:
+        matcher = SubscriptionMatcher(storage)
+        matcher.start()
+        app.state.matcher = matcher
+        app.state.archiver = ExpiredPostArchiver(storage)
+        app.state.bundle_refresher = StateBundleRefresher(storage)
+        app.state.archiver.start()
+        ingest_queue.start()
+        app.state.bundle_refresher.start()
+    readiness.checks.pop("startup_error", None)
+    readiness.checks["startup_seconds"] = time.perf_counter() - started
+    readiness.ready = True
+
+def _startup_failed(app: FastAPI, exc: Exception) -> None:
+    logger.exception("Startup failed, retrying in %ss", STARTUP_RETRY_SECONDS)
+    app.state.readiness.checks["startup_error"] = str(exc)
+
+# Keeps a worker that started while the database was unreachable alive but
+# not ready, until a later attempt gets through
+def _retry_startup(app: FastAPI) -> None:
+    while not app.state.stopping.wait(STARTUP_RETRY_SECONDS):
+        try:
+            startup(app)
+            return
+        except Exception as exc:
+            _startup_failed(app, exc)
+
+def shutdown(app: FastAPI) -> None:
+    app.state.readiness.ready = False
+    # Workers only exist once a startup attempt got through
+    if app.state.matcher is not None:
+        # The ingest queue flushes first so its last writes still reach the workers below
+        ingest_queue.stop()
+        app.state.matcher.stop()
+        app.state.bundle_refresher.stop()
+        app.state.archiver.stop()
+    close_storage()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    retry = None
+    try:
+        await run_in_threadpool(startup, app)
+    except Exception as exc:
+        _startup_failed(app, exc)
+        retry = threading.Thread(target=_retry_startup, args=(app,), name="startup-retry", daemon=True)
+        retry.start()
+    yield
+    app.state.stopping.set()
+    if retry is not None:
+        await run_in_threadpool(retry.join)
+    await run_in_threadpool(shutdown, app)
+
+# Each app gets its own readiness and background workers. The caches, the
+# live hub, the ingest queue, the eligibility index, the admission limits and
+# the profile store are module-level and shared by every app in the process,
+# so run one app per worker process.
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+    app.state.readiness = Readiness()
+    app.state.stopping = threading.Event()
+    app.state.matcher = None
+    app.state.archiver = None
+    app.state.bundle_refresher = None
+
+    app.add_middleware(AdmissionControlMiddleware, controller=admission)
+    # Outermost, so a profile's total includes time spent waiting for admission
+    app.add_middleware(ProfilingMiddleware)
+
+    app.include_router(posts_router, prefix="/api/v1")
+    app.include_router(profiling_router, prefix="/admin")
+
+    @app.exception_handler(ReadOnlyStorageError)
+    def read_only_storage_handler(request: Request, exc: ReadOnlyStorageError):
+        return JSONResponse({"detail": "This node is read-only"}, status_code=405)
+
+    @app.exception_handler(UnsupportedQueryError)
+    def unsupported_query_handler(request: Request, exc: UnsupportedQueryError):
+        return JSONResponse({"detail": str(exc)}, status_code=501)
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to the CCOS Scrapesarthi API"}
+
+    # Liveness: the process is up and serving
+    @app.get("/healthz")
+    def healthz():
+        return {"status": "ok"}
+
+    # Readiness: startup warm-up finished and the database still answers
+    @app.get("/readyz")
+    def readyz(request: Request):
+        readiness = request.app.state.readiness
+        if readiness.ready and not get_storage().read_only:
+            try:
+                readiness.checks["ping_ms"] = ping(get_client())
+            except Exception as exc:
+                return JSONResponse({**readiness.report(), "ready": False, "error": str(exc)}, status_code=503)
+        if not readiness.ready:
+            return JSONResponse(readiness.report(), status_code=503)
+        return readiness.report()
+
+    @app.get("/metrics/admission")
+    def admission_metrics():
+        return admission.metrics()
+
+    @app.get("/metrics/live")
+    def live_metrics():
+        return live_hub.metrics()
+
+    @app.get("/metrics/matching")
+    def matching_metrics(request: Request):
+        matcher = request.app.state.matcher
+        return matcher.metrics() if matcher else {}
+
+    return app
+
+app = create_app()
@@ -1,19 +1,105 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Body, Query, Request, Response, WebSocket
+from fastapi.responses import JSONResponse, StreamingResponse
 from pymongo.collection import Collection
-from typing import List
+from bson import ObjectId
+from typing import Any, Dict, List, Optional, Union
 from .schema import (StatesAndCitiesCreate, StatesAndCitiesResponse, StatesAndCitiesUpdate,
+                     CityCreate, CityUpdate, CityImport, CityImportResponse,
                      SectorCreate, SectorResponse, SectorUpdate,
                      SchemePostCreate, SchemePostResponse, SchemePostUpdate,
                      GovJobPostCreate, GovJobPostResponse, GovJobPostUpdate,
-                     DigitalServiceCreate, DigitalServiceResponse, DigitalServiceUpdate)
-from .model import (StatesAndCities, City, Sector, SchemePost, Document, Update, GovJobPost, DigitalService)
+                     DigitalServiceCreate, DigitalServiceResponse, DigitalServiceUpdate,
+                     FacetStatsResponse, BatchGetRequest, StatesAndCitiesBatchResponse, SectorBatchResponse,
+                     SchemePostBatchResponse, GovJobPostBatchResponse, DigitalServiceBatchResponse,
+                     FeedResponse, PostUpdatesPush, PostUpdatesBulkPush, PostUpdatesBulkResponse,
+                     IngestTicket, BulkCreateResponse, validate_batch, scheme_post_batch_validator,
+                     gov_job_post_batch_validator, digital_service_batch_validator, SectorFanoutJob,
+                     StateBundleResponse, SubscriptionCreate, SubscriptionResponse, SubscriptionUpdate,
+                     EligibilityRequest, EligibilityResponse)
+from .model import (StatesAndCities, City, Sector, SchemePost, Document, Update, GovJobPost, DigitalService,
+                    Subscription, prepare_post_documents, insert_post_documents)
 from app.dependencies import (get_states_and_cities_collection, get_sectors_collection,
                               get_scheme_posts_collection, get_gov_jobs_posts_collection,
-                              get_digital_services_collection)
+                              get_digital_services_collection, get_scheme_posts_archive_collection,
+                              get_gov_jobs_posts_archive_collection, get_state_bundles_collection,
+                              get_subscriptions_collection)
 from .examples import (states_and_cities_examples, sector_examples, scheme_post_examples,
                        gov_job_post_examples, digital_service_examples)
-
-router = APIRouter()
+from .stats import get_facet_stats
+from .feed import read_feed
+from .cache import response_cache
+from .ingest import ingest_queue, IngestQueueFull, IngestQueueClosed
+from .sector_fanout import sector_fanout
+from .bundles import etag_matches, get_bundle
+from .eligibility import eligibility_index
+from .live import live_hub, LiveHubFull, LIVE_RESOURCES, sse_events, pump_websocket
+from app.config import MAX_BATCH_IDS, BULK_MAX_ITEMS
+from app.profiling import ProfiledRoute
+from app.storage import ReadOnlyStorageError, is_read_only
+
+router = APIRouter(route_class=ProfiledRoute)
+
+# Batch get-by-ids helpers shared by all resources
+def _split_ids(ids: str) -> List[str]:
+    return [item_id.strip() for item_id in ids.split(",") if item_id.strip()]
+
+def _enqueue(collection: Collection, document: dict) -> JSONResponse:
+    # Nothing drains the queue on a read-only node, so refuse like any other write
+    if is_read_only(collection):
+        raise ReadOnlyStorageError(f"{collection.name} is read-only on this node")
+    try:
+        ticket = ingest_queue.submit(collection, document)
+    except (IngestQueueFull, IngestQueueClosed):
+        raise HTTPException(status_code=503, detail="Ingestion queue is full, retry later",
+                            headers={"Retry-After": "1"})
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=ticket)
+
+def _bulk_create(validator, items: List[Any], collection: Collection, sectors: Optional[Collection] = None) -> dict:
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items can be created at once")
+    valid, errors = validate_batch(validator, items)
+    data = [item for _, item in valid]
+    # One lookup resolves the sector names for the whole batch
+    sector_names = Sector.find_names([item["sector_id"] for item in data], sectors) if sectors is not None else None
+    inserted_ids = insert_post_documents(prepare_post_documents(data, sector_names), collection)
+    return {"inserted_ids": inserted_ids, "errors": errors}
+
+def _bulk_notes(request: PostUpdatesBulkPush) -> Dict[str, List[Update]]:
+    if not request.notes:
+        raise HTTPException(status_code=400, detail="No update notes provided")
+    notes: Dict[str, List[Update]] = {}
+    for note in request.notes:
+        notes.setdefault(note.post_id, []).append(Update(date=note.date, note=note.note))
+    return notes
+
+# Cached reads; entries are invalidated by the models' write paths
+def _find_cached(model, item_id: str, collection: Collection) -> Optional[dict]:
+    def load():
+        item = model.find_by_id(item_id, collection)
+        return item.to_dict() if item else None
+    return response_cache.get_document(collection.name, item_id, load)
+
+def _list_cached(model, collection: Collection) -> List[dict]:
+    return response_cache.get_list(collection.name, lambda: [item.to_dict() for item in model.find_all(collection)])
+
+def _sector_name(sector_id: str, sectors: Collection) -> Optional[str]:
+    if not ObjectId.is_valid(sector_id):
+        return None
+    sector = _find_cached(Sector, sector_id, sectors)
+    return sector["name"] if sector else None
+
+def _batch_get(model, ids: List[str], collection: Collection, archive: Optional[Collection] = None) -> dict:
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids can be requested at once")
+
+    found = {item.id: item for item in model.find_by_ids(ids, collection)}
+    if archive is not None and len(found) < len(ids):
+        found.update((item.id, item) for item in model.find_by_ids([i for i in ids if i not in found], archive))
+    return {
+        "items": [found[item_id].to_dict() for item_id in ids if item_id in found],
+        "missing": [item_id for item_id in ids if item_id not in found]
+    }
 
 # CRUD for states_and_cities
 @router.post(
@@ -32,15 +118,20 @@ def create_states_and_cities(
 
 @router.get("/states-and-cities/{state_id}", response_model=StatesAndCitiesResponse)
 def get_states_and_cities(state_id: str, collection: Collection = Depends(get_states_and_cities_collection)):
-    state = StatesAndCities.find_by_id(state_id, collection)
+    state = _find_cached(StatesAndCities, state_id, collection)
     if not state:
         raise HTTPException(status_code=404, detail="State not found")
-    return state.to_dict()
+    return state
+
+@router.post("/states-and-cities/batch-get", response_model=StatesAndCitiesBatchResponse)
+def batch_get_states_and_cities(request: BatchGetRequest, collection: Collection = Depends(get_states_and_cities_collection)):
+    return _batch_get(StatesAndCities, request.ids, collection)
 
-@router.get("/states-and-cities/", response_model=List[StatesAndCitiesResponse])
-def list_states_and_cities(collection: Collection = Depends(get_states_and_cities_collection)):
-    states = StatesAndCities.find_all(collection)
-    return [state.to_dict() for state in states]
+@router.get("/states-and-cities/", response_model=Union[List[StatesAndCitiesResponse], StatesAndCitiesBatchResponse])
+def list_states_and_cities(ids: Optional[str] = None, collection: Collection = Depends(get_states_and_cities_collection)):
+    if ids is not None:
+        return _batch_get(StatesAndCities, _split_ids(ids), collection)
+    return _list_cached(StatesAndCities, collection)
 
 @router.put("/states-and-cities/{state_id}", response_model=StatesAndCitiesResponse)
 def update_states_and_cities(state_id: str, state_update: StatesAndCitiesUpdate,
@@ -69,6 +160,56 @@ def delete_states_and_cities(state_id: str, collection: Collection = Depends(get
     state.delete(collection)
     return None
 
+# City operations on a single state
+def _state_or_city_missing(state_id: str, collection: Collection) -> HTTPException:
+    if not collection.find_one({"_id": ObjectId(state_id)}, {"_id": 1}):
+        return HTTPException(status_code=404, detail="State not found")
+    return HTTPException(status_code=404, detail="City not found")
+
+@router.post("/states-and-cities/{state_id}/cities", response_model=CityImportResponse)
+def import_cities(state_id: str, request: CityImport,
+                  collection: Collection = Depends(get_states_and_cities_collection)):
+    result = StatesAndCities.import_cities(state_id, [City(**city.model_dump()) for city in request.cities], collection)
+    if result is None:
+        raise HTTPException(status_code=404, detail="State not found")
+    state, added = result
+    added_ids = set(added)
+    skipped = [city.city_id for city in request.cities if city.city_id not in added_ids]
+    return {"state": state.to_dict(), "added": added, "skipped": skipped}
+
+@router.post(
+    "/states-and-cities/{state_id}/cities/{city_id}",
+    response_model=StatesAndCitiesResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def add_city(state_id: str, city_id: str, city: CityCreate,
+             collection: Collection = Depends(get_states_and_cities_collection)):
+    state = StatesAndCities.add_city(state_id, City(city_id=city_id, name=city.name), collection)
+    if not state:
+        if not collection.find_one({"_id": ObjectId(state_id)}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="State not found")
+        raise HTTPException(status_code=409, detail="City already exists")
+    return state.to_dict()
+
+@router.patch("/states-and-cities/{state_id}/cities/{city_id}", response_model=StatesAndCitiesResponse)
+def update_city(state_id: str, city_id: str, city_update: CityUpdate,
+                collection: Collection = Depends(get_states_and_cities_collection)):
+    # A city's fields are all required, so null is not a value they can be set to
+    update_data = {key: value for key, value in city_update.model_dump(exclude_unset=True).items()
+                   if value is not None}
+    if not update_data:
+        raise HTTPException(status_code=422, detail="No update data provided")
+    state = StatesAndCities.update_city(state_id, city_id, update_data, collection)
+    if not state:
+        raise _state_or_city_missing(state_id, collection)
+    return state.to_dict()
+
+@router.delete("/states-and-cities/{state_id}/cities/{city_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_city(state_id: str, city_id: str, collection: Collection = Depends(get_states_and_cities_collection)):
+    if not StatesAndCities.remove_city(state_id, city_id, collection):
+        raise _state_or_city_missing(state_id, collection)
+    return None
+
 # CRUD for sectors
 @router.post(
     "/sectors/",
@@ -85,19 +226,26 @@ def create_sector(
 
 @router.get("/sectors/{sector_id}", response_model=SectorResponse)
 def get_sector(sector_id: str, collection: Collection = Depends(get_sectors_collection)):
-    sector = Sector.find_by_id(sector_id, collection)
+    sector = _find_cached(Sector, sector_id, collection)
     if not sector:
         raise HTTPException(status_code=404, detail="Sector not found")
-    return sector.to_dict()
+    return sector
+
+@router.post("/sectors/batch-get", response_model=SectorBatchResponse)
+def batch_get_sectors(request: BatchGetRequest, collection: Collection = Depends(get_sectors_collection)):
+    return _batch_get(Sector, request.ids, collection)
 
-@router.get("/sectors/", response_model=List[SectorResponse])
-def list_sectors(collection: Collection = Depends(get_sectors_collection)):
-    sectors = Sector.find_all(collection)
-    return [sector.to_dict() for sector in sectors]
+@router.get("/sectors/", response_model=Union[List[SectorResponse], SectorBatchResponse])
+def list_sectors(ids: Optional[str] = None, collection: Collection = Depends(get_sectors_collection)):
+    if ids is not None:
+        return _batch_get(Sector, _split_ids(ids), collection)
+    return _list_cached(Sector, collection)
 
 @router.put("/sectors/{sector_id}", response_model=SectorResponse)
-def update_sector(sector_id: str, sector_update: SectorUpdate,
-                  collection: Collection = Depends(get_sectors_collection)):
+def update_sector(sector_id: str, sector_update: SectorUpdate, response: Response,
+                  collection: Collection = Depends(get_sectors_collection),
+                  scheme_posts: Collection = Depends(get_scheme_posts_collection),
+                  gov_jobs_posts: Collection = Depends(get_gov_jobs_posts_collection)):
     sector = Sector.find_by_id(sector_id, collection)
     if not sector:
         raise HTTPException(status_code=404, detail="Sector not found")
@@ -106,9 +254,14 @@ def update_sector(sector_id: str, sector_update: SectorUpdate,
     if not update_data:
         raise HTTPException(status_code=400, detail="No update data provided")
 
+    renamed = "name" in update_data and update_data["name"] != sector.name
     for key, value in update_data.items():
         setattr(sector, key, value)
     sector.save(collection)
+    if renamed:
+        # Posts carry a copy of the sector name; refresh it in the background
+        job = sector_fanout.start(sector.id, sector.name, [scheme_posts, gov_jobs_posts])
+        response.headers["X-Sector-Fanout-Job"] = job["job_id"]
     return sector.to_dict()
 
 @router.delete("/sectors/{sector_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -120,18 +273,10 @@ def delete_sector(sector_id: str, collection: Collection = Depends(get_sectors_c
     return None
 
 # CRUD for scheme_posts
-@router.post(
-    "/scheme-posts/",
-    response_model=SchemePostResponse,
-    status_code=status.HTTP_201_CREATED
-)
-def create_scheme_post(
-    post: SchemePostCreate = Body(openapi_examples=scheme_post_examples),  # Corrected to examples
-    collection: Collection = Depends(get_scheme_posts_collection)
-):
+def _scheme_post_from_create(post: SchemePostCreate, sector_name: Optional[str] = None) -> SchemePost:
     required_documents = [Document(**doc.dict()) for doc in post.required_documents]
     updates = [Update(**update.dict()) for update in post.updates]
-    post_obj = SchemePost(
+    return SchemePost(
         title=post.title,
         start_date=post.start_date,
         end_date=post.end_date,
@@ -140,26 +285,71 @@ def create_scheme_post(
         states=post.states,
         cities=post.cities,
         updates=updates,
-        sector_id=post.sector_id
+        sector_id=post.sector_id,
+        sector_name=sector_name
     )
+
+@router.post(
+    "/scheme-posts/",
+    response_model=SchemePostResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_scheme_post(
+    post: SchemePostCreate = Body(openapi_examples=scheme_post_examples),  # Corrected to examples
+    collection: Collection = Depends(get_scheme_posts_collection),
+    sectors: Collection = Depends(get_sectors_collection)
+):
+    post_obj = _scheme_post_from_create(post, _sector_name(post.sector_id, sectors))
     post_obj.save(collection)
     return post_obj.to_dict()
 
+@router.post("/scheme-posts/ingest", response_model=IngestTicket, status_code=status.HTTP_202_ACCEPTED)
+def ingest_scheme_post(
+    post: SchemePostCreate = Body(openapi_examples=scheme_post_examples),
+    collection: Collection = Depends(get_scheme_posts_collection),
+    sectors: Collection = Depends(get_sectors_collection)
+):
+    return _enqueue(collection, _scheme_post_from_create(post, _sector_name(post.sector_id, sectors)).to_mongo())
+
+@router.post("/scheme-posts/bulk", response_model=BulkCreateResponse)
+def bulk_create_scheme_posts(items: List[Any] = Body(...),
+                             collection: Collection = Depends(get_scheme_posts_collection),
+                             sectors: Collection = Depends(get_sectors_collection)):
+    return _bulk_create(scheme_post_batch_validator, items, collection, sectors)
+
 @router.get("/scheme-posts/{post_id}", response_model=SchemePostResponse)
-def get_scheme_post(post_id: str, collection: Collection = Depends(get_scheme_posts_collection)):
-    post = SchemePost.find_by_id(post_id, collection)
+def get_scheme_post(post_id: str, include_archived: bool = False,
+                    collection: Collection = Depends(get_scheme_posts_collection),
+                    archive: Collection = Depends(get_scheme_posts_archive_collection)):
+    post = _find_cached(SchemePost, post_id, collection)
+    if not post and include_archived:
+        archived = SchemePost.find_by_id(post_id, archive)
+        post = archived.to_dict() if archived else None
     if not post:
         raise HTTPException(status_code=404, detail="Scheme post not found")
-    return post.to_dict()
-
-@router.get("/scheme-posts/", response_model=List[SchemePostResponse])
-def list_scheme_posts(collection: Collection = Depends(get_scheme_posts_collection)):
-    posts = SchemePost.find_all(collection)
+    return post
+
+@router.post("/scheme-posts/batch-get", response_model=SchemePostBatchResponse)
+def batch_get_scheme_posts(request: BatchGetRequest, include_archived: bool = False,
+                           collection: Collection = Depends(get_scheme_posts_collection),
+                           archive: Collection = Depends(get_scheme_posts_archive_collection)):
+    return _batch_get(SchemePost, request.ids, collection, archive if include_archived else None)
+
+@router.get("/scheme-posts/", response_model=Union[List[SchemePostResponse], SchemePostBatchResponse])
+def list_scheme_posts(ids: Optional[str] = None, include_archived: bool = False,
+                      collection: Collection = Depends(get_scheme_posts_collection),
+                      archive: Collection = Depends(get_scheme_posts_archive_collection)):
+    if ids is not None:
+        return _batch_get(SchemePost, _split_ids(ids), collection, archive if include_archived else None)
+    if not include_archived:
+        return _list_cached(SchemePost, collection)
+    posts = SchemePost.find_all(collection) + SchemePost.find_all(archive)
     return [post.to_dict() for post in posts]
 
 @router.put("/scheme-posts/{post_id}", response_model=SchemePostResponse)
 def update_scheme_post(post_id: str, post_update: SchemePostUpdate,
-                      collection: Collection = Depends(get_scheme_posts_collection)):
+                      collection: Collection = Depends(get_scheme_posts_collection),
+                      sectors: Collection = Depends(get_sectors_collection)):
     post = SchemePost.find_by_id(post_id, collection)
     if not post:
         raise HTTPException(status_code=404, detail="Scheme post not found")
@@ -172,6 +362,8 @@ def update_scheme_post(post_id: str, post_update: SchemePostUpdate,
         update_data["required_documents"] = [Document(**doc) for doc in update_data["required_documents"]]
     if "updates" in update_data:
         update_data["updates"] = [Update(**update) for update in update_data["updates"]]
+    if "sector_id" in update_data:
+        update_data["sector_name"] = _sector_name(update_data["sector_id"], sectors)
 
     for key, value in update_data.items():
         setattr(post, key, value)
@@ -186,19 +378,29 @@ def delete_scheme_post(post_id: str, collection: Collection = Depends(get_scheme
     post.delete(collection)
     return None
 
+@router.post("/scheme-posts/{post_id}/updates", response_model=SchemePostResponse)
+def push_scheme_post_updates(post_id: str, request: PostUpdatesPush,
+                             collection: Collection = Depends(get_scheme_posts_collection)):
+    if not request.updates:
+        raise HTTPException(status_code=400, detail="No update notes provided")
+    updates = [Update(**update.model_dump()) for update in request.updates]
+    post = SchemePost.push_updates(post_id, updates, collection, request.keep_last, request.sort_by_date)
+    if not post:
+        raise HTTPException(status_code=404, detail="Scheme post not found")
+    return post.to_dict()
+
+@router.post("/scheme-posts/updates", response_model=PostUpdatesBulkResponse)
+def push_scheme_posts_updates_bulk(request: PostUpdatesBulkPush, collection: Collection = Depends(get_scheme_posts_collection)):
+    matched, modified, missing = SchemePost.push_updates_bulk(
+        _bulk_notes(request), collection, request.keep_last, request.sort_by_date
+    )
+    return {"matched": matched, "modified": modified, "missing": missing}
+
 # CRUD for gov_jobs_posts
-@router.post(
-    "/gov-jobs-posts/",
-    response_model=GovJobPostResponse,
-    status_code=status.HTTP_201_CREATED
-)
-def create_gov_job_post(
-    post: GovJobPostCreate = Body(openapi_examples=gov_job_post_examples),  # Corrected to examples
-    collection: Collection = Depends(get_gov_jobs_posts_collection)
-):
+def _gov_job_post_from_create(post: GovJobPostCreate, sector_name: Optional[str] = None) -> GovJobPost:
     required_documents = [Document(**doc.dict()) for doc in post.required_documents]
     updates = [Update(**update.dict()) for update in post.updates]
-    post_obj = GovJobPost(
+    return GovJobPost(
         title=post.title,
         start_date=post.start_date,
         end_date=post.end_date,
@@ -207,26 +409,71 @@ def create_gov_job_post(
         states=post.states,
         cities=post.cities,
         updates=updates,
-        sector_id=post.sector_id
+        sector_id=post.sector_id,
+        sector_name=sector_name
     )
+
+@router.post(
+    "/gov-jobs-posts/",
+    response_model=GovJobPostResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_gov_job_post(
+    post: GovJobPostCreate = Body(openapi_examples=gov_job_post_examples),  # Corrected to examples
+    collection: Collection = Depends(get_gov_jobs_posts_collection),
+    sectors: Collection = Depends(get_sectors_collection)
+):
+    post_obj = _gov_job_post_from_create(post, _sector_name(post.sector_id, sectors))
     post_obj.save(collection)
     return post_obj.to_dict()
 
+@router.post("/gov-jobs-posts/ingest", response_model=IngestTicket, status_code=status.HTTP_202_ACCEPTED)
+def ingest_gov_job_post(
+    post: GovJobPostCreate = Body(openapi_examples=gov_job_post_examples),
+    collection: Collection = Depends(get_gov_jobs_posts_collection),
+    sectors: Collection = Depends(get_sectors_collection)
+):
+    return _enqueue(collection, _gov_job_post_from_create(post, _sector_name(post.sector_id, sectors)).to_mongo())
+
+@router.post("/gov-jobs-posts/bulk", response_model=BulkCreateResponse)
+def bulk_create_gov_job_posts(items: List[Any] = Body(...),
+                              collection: Collection = Depends(get_gov_jobs_posts_collection),
+                              sectors: Collection = Depends(get_sectors_collection)):
+    return _bulk_create(gov_job_post_batch_validator, items, collection, sectors)
+
 @router.get("/gov-jobs-posts/{post_id}", response_model=GovJobPostResponse)
-def get_gov_job_post(post_id: str, collection: Collection = Depends(get_gov_jobs_posts_collection)):
-    post = GovJobPost.find_by_id(post_id, collection)
+def get_gov_job_post(post_id: str, include_archived: bool = False,
+                     collection: Collection = Depends(get_gov_jobs_posts_collection),
+                     archive: Collection = Depends(get_gov_jobs_posts_archive_collection)):
+    post = _find_cached(GovJobPost, post_id, collection)
+    if not post and include_archived:
+        archived = GovJobPost.find_by_id(post_id, archive)
+        post = archived.to_dict() if archived else None
     if not post:
         raise HTTPException(status_code=404, detail="Government job post not found")
-    return post.to_dict()
-
-@router.get("/gov-jobs-posts/", response_model=List[GovJobPostResponse])
-def list_gov_job_posts(collection: Collection = Depends(get_gov_jobs_posts_collection)):
-    posts = GovJobPost.find_all(collection)
+    return post
+
+@router.post("/gov-jobs-posts/batch-get", response_model=GovJobPostBatchResponse)
+def batch_get_gov_job_posts(request: BatchGetRequest, include_archived: bool = False,
+                            collection: Collection = Depends(get_gov_jobs_posts_collection),
+                            archive: Collection = Depends(get_gov_jobs_posts_archive_collection)):
+    return _batch_get(GovJobPost, request.ids, collection, archive if include_archived else None)
+
+@router.get("/gov-jobs-posts/", response_model=Union[List[GovJobPostResponse], GovJobPostBatchResponse])
+def list_gov_job_posts(ids: Optional[str] = None, include_archived: bool = False,
+                       collection: Collection = Depends(get_gov_jobs_posts_collection),
+                       archive: Collection = Depends(get_gov_jobs_posts_archive_collection)):
+    if ids is not None:
+        return _batch_get(GovJobPost, _split_ids(ids), collection, archive if include_archived else None)
+    if not include_archived:
+        return _list_cached(GovJobPost, collection)
+    posts = GovJobPost.find_all(collection) + GovJobPost.find_all(archive)
     return [post.to_dict() for post in posts]
 
 @router.put("/gov-jobs-posts/{post_id}", response_model=GovJobPostResponse)
 def update_gov_job_post(post_id: str, post_update: GovJobPostUpdate,
-                       collection: Collection = Depends(get_gov_jobs_posts_collection)):
+                       collection: Collection = Depends(get_gov_jobs_posts_collection),
+                       sectors: Collection = Depends(get_sectors_collection)):
     post = GovJobPost.find_by_id(post_id, collection)
     if not post:
         raise HTTPException(status_code=404, detail="Government job post not found")
@@ -239,6 +486,8 @@ def update_gov_job_post(post_id: str, post_update: GovJobPostUpdate,
         update_data["required_documents"] = [Document(**doc) for doc in update_data["required_documents"]]
     if "updates" in update_data:
         update_data["updates"] = [Update(**update) for update in update_data["updates"]]
+    if "sector_id" in update_data:
+        update_data["sector_name"] = _sector_name(update_data["sector_id"], sectors)
 
     for key, value in update_data.items():
         setattr(post, key, value)
@@ -253,19 +502,29 @@ def delete_gov_job_post(post_id: str, collection: Collection = Depends(get_gov_j
     post.delete(collection)
     return None
 
+@router.post("/gov-jobs-posts/{post_id}/updates", response_model=GovJobPostResponse)
+def push_gov_job_post_updates(post_id: str, request: PostUpdatesPush,
+                              collection: Collection = Depends(get_gov_jobs_posts_collection)):
+    if not request.updates:
+        raise HTTPException(status_code=400, detail="No update notes provided")
+    updates = [Update(**update.model_dump()) for update in request.updates]
+    post = GovJobPost.push_updates(post_id, updates, collection, request.keep_last, request.sort_by_date)
+    if not post:
+        raise HTTPException(status_code=404, detail="Government job post not found")
+    return post.to_dict()
+
+@router.post("/gov-jobs-posts/updates", response_model=PostUpdatesBulkResponse)
+def push_gov_job_posts_updates_bulk(request: PostUpdatesBulkPush, collection: Collection = Depends(get_gov_jobs_posts_collection)):
+    matched, modified, missing = GovJobPost.push_updates_bulk(
+        _bulk_notes(request), collection, request.keep_last, request.sort_by_date
+    )
+    return {"matched": matched, "modified": modified, "missing": missing}
+
 # CRUD for digital_services
-@router.post(
-    "/digital-services/",
-    response_model=DigitalServiceResponse,
-    status_code=status.HTTP_201_CREATED
-)
-def create_digital_service(
-    service: DigitalServiceCreate = Body(openapi_examples=digital_service_examples),  # Corrected to examples
-    collection: Collection = Depends(get_digital_services_collection)
-):
+def _digital_service_from_create(service: DigitalServiceCreate) -> DigitalService:
     required_documents = [Document(**doc.dict()) for doc in service.required_documents]
     updates = [Update(**update.dict()) for update in service.updates]
-    service_obj = DigitalService(
+    return DigitalService(
         title=service.title,
         description=service.description,
         required_documents=required_documents,
@@ -273,20 +532,48 @@ def create_digital_service(
         states=service.states,
         cities=service.cities
     )
+
+@router.post(
+    "/digital-services/",
+    response_model=DigitalServiceResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_digital_service(
+    service: DigitalServiceCreate = Body(openapi_examples=digital_service_examples),  # Corrected to examples
+    collection: Collection = Depends(get_digital_services_collection)
+):
+    service_obj = _digital_service_from_create(service)
     service_obj.save(collection)
     return service_obj.to_dict()
 
+@router.post("/digital-services/ingest", response_model=IngestTicket, status_code=status.HTTP_202_ACCEPTED)
+def ingest_digital_service(
+    service: DigitalServiceCreate = Body(openapi_examples=digital_service_examples),
+    collection: Collection = Depends(get_digital_services_collection)
+):
+    return _enqueue(collection, _digital_service_from_create(service).to_mongo())
+
+@router.post("/digital-services/bulk", response_model=BulkCreateResponse)
+def bulk_create_digital_services(items: List[Any] = Body(...),
+                                 collection: Collection = Depends(get_digital_services_collection)):
+    return _bulk_create(digital_service_batch_validator, items, collection)
+
 @router.get("/digital-services/{service_id}", response_model=DigitalServiceResponse)
 def get_digital_service(service_id: str, collection: Collection = Depends(get_digital_services_collection)):
-    service = DigitalService.find_by_id(service_id, collection)
+    service = _find_cached(DigitalService, service_id, collection)
     if not service:
         raise HTTPException(status_code=404, detail="Digital service not found")
-    return service.to_dict()
+    return service
+
+@router.post("/digital-services/batch-get", response_model=DigitalServiceBatchResponse)
+def batch_get_digital_services(request: BatchGetRequest, collection: Collection = Depends(get_digital_services_collection)):
+    return _batch_get(DigitalService, request.ids, collection)
 
-@router.get("/digital-services/", response_model=List[DigitalServiceResponse])
-def list_digital_services(collection: Collection = Depends(get_digital_services_collection)):
-    services = DigitalService.find_all(collection)
-    return [service.to_dict() for service in services]
+@router.get("/digital-services/", response_model=Union[List[DigitalServiceResponse], DigitalServiceBatchResponse])
+def list_digital_services(ids: Optional[str] = None, collection: Collection = Depends(get_digital_services_collection)):
+    if ids is not None:
+        return _batch_get(DigitalService, _split_ids(ids), collection)
+    return _list_cached(DigitalService, collection)
 
 @router.put("/digital-services/{service_id}", response_model=DigitalServiceResponse)
 def update_digital_service(service_id: str, service_update: DigitalServiceUpdate,
@@ -315,4 +602,166 @@ def delete_digital_service(service_id: str, collection: Collection = Depends(get
     if not service:
         raise HTTPException(status_code=404, detail="Digital service not found")
     service.delete(collection)
-    return None
\ No newline at end of file
+    return None
+
+@router.post("/digital-services/{service_id}/updates", response_model=DigitalServiceResponse)
+def push_digital_service_updates(service_id: str, request: PostUpdatesPush,
+                                 collection: Collection = Depends(get_digital_services_collection)):
+    if not request.updates:
+        raise HTTPException(status_code=400, detail="No update notes provided")
+    updates = [Update(**update.model_dump()) for update in request.updates]
+    service = DigitalService.push_updates(service_id, updates, collection, request.keep_last, request.sort_by_date)
+    if not service:
+        raise HTTPException(status_code=404, detail="Digital service not found")
+    return service.to_dict()
+
+@router.post("/digital-services/updates", response_model=PostUpdatesBulkResponse)
+def push_digital_services_updates_bulk(request: PostUpdatesBulkPush, collection: Collection = Depends(get_digital_services_collection)):
+    matched, modified, missing = DigitalService.push_updates_bulk(
+        _bulk_notes(request), collection, request.keep_last, request.sort_by_date
+    )
+    return {"matched": matched, "modified": modified, "missing": missing}
+
+# Stats
+@router.get("/stats/facets", response_model=FacetStatsResponse)
+def get_stats_facets(scheme_posts: Collection = Depends(get_scheme_posts_collection),
+                     gov_jobs_posts: Collection = Depends(get_gov_jobs_posts_collection),
+                     digital_services: Collection = Depends(get_digital_services_collection)):
+    return get_facet_stats(scheme_posts, gov_jobs_posts, digital_services)
+
+# Latest feed across scheme posts, gov job posts and digital services
+@router.get("/feed", response_model=FeedResponse)
+def get_feed(limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None,
+             scheme_posts: Collection = Depends(get_scheme_posts_collection),
+             gov_jobs_posts: Collection = Depends(get_gov_jobs_posts_collection),
+             digital_services: Collection = Depends(get_digital_services_collection)):
+    # Keyed by route name, which is what each item reports as its resource
+    collections = {
+        "scheme-posts": scheme_posts,
+        "gov-jobs-posts": gov_jobs_posts,
+        "digital-services": digital_services
+    }
+    try:
+        return read_feed(collections, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+# Write-behind ingestion tickets
+@router.get("/ingest/tickets/{ticket_id}", response_model=IngestTicket)
+def get_ingest_ticket(ticket_id: str):
+    ticket = ingest_queue.get_ticket(ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ingestion ticket not found")
+    return ticket
+
+# Sector name fan-out jobs
+@router.get("/sector-fanout-jobs/", response_model=List[SectorFanoutJob])
+def list_sector_fanout_jobs():
+    return sector_fanout.list_jobs()
+
+@router.get("/sector-fanout-jobs/{job_id}", response_model=SectorFanoutJob)
+def get_sector_fanout_job(job_id: str):
+    job = sector_fanout.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sector fan-out job not found")
+    return job
+
+# CRUD for alert subscriptions
+@router.post("/subscriptions/", response_model=SubscriptionResponse, status_code=status.HTTP_201_CREATED)
+def create_subscription(subscription: SubscriptionCreate,
+                        collection: Collection = Depends(get_subscriptions_collection)):
+    subscription_obj = Subscription(**subscription.model_dump())
+    subscription_obj.save(collection)
+    return subscription_obj.to_dict()
+
+@router.get("/subscriptions/{subscription_id}", response_model=SubscriptionResponse)
+def get_subscription(subscription_id: str, collection: Collection = Depends(get_subscriptions_collection)):
+    subscription = Subscription.find_by_id(subscription_id, collection)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    return subscription.to_dict()
+
+@router.get("/subscriptions/", response_model=List[SubscriptionResponse])
+def list_subscriptions(subscriber_id: str, collection: Collection = Depends(get_subscriptions_collection)):
+    return [subscription.to_dict() for subscription in Subscription.find_by_subscriber(subscriber_id, collection)]
+
+@router.put("/subscriptions/{subscription_id}", response_model=SubscriptionResponse)
+def update_subscription(subscription_id: str, subscription_update: SubscriptionUpdate,
+                        collection: Collection = Depends(get_subscriptions_collection)):
+    subscription = Subscription.find_by_id(subscription_id, collection)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+
+    update_data = subscription_update.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No update data provided")
+
+    for key, value in update_data.items():
+        setattr(subscription, key, value)
+    subscription.save(collection)
+    return subscription.to_dict()
+
+@router.delete("/subscriptions/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_subscription(subscription_id: str, collection: Collection = Depends(get_subscriptions_collection)):
+    subscription = Subscription.find_by_id(subscription_id, collection)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    subscription.delete(collection)
+    return None
+
+# Open posts whose required documents are all held by the caller
+@router.post("/eligibility", response_model=EligibilityResponse)
+def check_eligibility(request: EligibilityRequest):
+    items, total = eligibility_index.eligible(
+        request.documents, request.state, request.sector_id, request.resources, request.limit
+    )
+    return {"items": items, "total": total}
+
+# Materialized per-state bundles
+@router.get("/states/{name}/bundle", response_model=StateBundleResponse)
+def get_state_bundle(name: str, request: Request, response: Response,
+                     bundles: Collection = Depends(get_state_bundles_collection),
+                     scheme_posts: Collection = Depends(get_scheme_posts_collection),
+                     gov_jobs_posts: Collection = Depends(get_gov_jobs_posts_collection),
+                     digital_services: Collection = Depends(get_digital_services_collection)):
+    sources = {
+        "scheme_posts": scheme_posts,
+        "gov_jobs_posts": gov_jobs_posts,
+        "digital_services": digital_services
+    }
+    bundle = get_bundle(name, bundles, sources)
+    headers = {"ETag": bundle["etag"], "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), bundle["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return {**bundle, "state": bundle["_id"]}
+
+# Live push of post writes
+@router.get("/live/events")
+async def live_events(request: Request, state: Optional[str] = None, city: Optional[str] = None,
+                      sector: Optional[str] = None, resource: Optional[str] = None):
+    if resource and resource not in LIVE_RESOURCES.values():
+        raise HTTPException(status_code=400, detail="Unknown resource")
+    try:
+        subscriber = live_hub.subscribe(state, city, sector, resource)
+    except LiveHubFull:
+        raise HTTPException(status_code=503, detail="Too many live subscribers")
+    return StreamingResponse(
+        sse_events(request, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/live/ws")
+async def live_socket(websocket: WebSocket, state: Optional[str] = None, city: Optional[str] = None,
+                      sector: Optional[str] = None, resource: Optional[str] = None):
+    if resource and resource not in LIVE_RESOURCES.values():
+        await websocket.close(code=1008)
+        return
+    try:
+        subscriber = live_hub.subscribe(state, city, sector, resource)
+    except LiveHubFull:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+    await pump_websocket(websocket, subscriber)
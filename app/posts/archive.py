@@ -0,0 +1,100 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import ReplaceOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+from app.config import ARCHIVE_RETENTION_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL_SECONDS
+from app.storage import StorageBackend
+from .model import notify_write
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Collections whose expired posts are moved to a "<name>_archive" collection
+ARCHIVED_COLLECTIONS = ("scheme_posts", "gov_jobs_posts")
+
+def archive_collection_name(name: str) -> str:
+    return f"{name}_archive"
+
+def expired_filter(cutoff: datetime) -> Dict:
+    return {"end_date": {"$lt": cutoff}}
+
+def _copy_to_archive(archive: Collection, batch: List[Dict]) -> None:
+    try:
+        archive.insert_many(batch, ordered=False)
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        if exc.details.get("writeConcernErrors") or any(e["code"] != DUPLICATE_KEY_ERROR for e in errors):
+            raise
+        # Left over from a run that crashed between copying and deleting:
+        # overwrite them so the archive holds the latest version of each post
+        archive.bulk_write(
+            [ReplaceOne({"_id": batch[e["index"]]["_id"]}, batch[e["index"]], upsert=True) for e in errors],
+            ordered=False
+        )
+
+def archive_expired_posts(collection: Collection, archive: Collection,
+                          retention_days: int = ARCHIVE_RETENTION_DAYS,
+                          batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    moved = 0
+    while True:
+        batch = list(collection.find(expired_filter(cutoff)).sort("end_date", 1).limit(batch_size))
+        if not batch:
+            return moved
+        # Copy first, then delete: a crash in between only leaves posts that
+        # are copied again (idempotently) on the next run
+        _copy_to_archive(archive, batch)
+        ids = [doc["_id"] for doc in batch]
+        # Re-check expiry: a post whose end_date was extended after the read
+        # stays live, and its now stale archive copy is removed again
+        result = collection.delete_many({"_id": {"$in": ids}, **expired_filter(cutoff)})
+        kept = {doc["_id"] for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+        if kept:
+            archive.delete_many({"_id": {"$in": list(kept)}})
+        for doc in batch:
+            if doc["_id"] not in kept:
+                notify_write(collection.name, "delete", doc)
+        moved += result.deleted_count
+
+class ExpiredPostArchiver:
+    def __init__(self, db: StorageBackend, retention_days: int = ARCHIVE_RETENTION_DAYS,
+                 batch_size: int = ARCHIVE_BATCH_SIZE, interval: float = ARCHIVE_INTERVAL_SECONDS):
+        self.db = db
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        moved = {}
+        for name in ARCHIVED_COLLECTIONS:
+            moved[name] = archive_expired_posts(
+                self.db[name], self.db[archive_collection_name(name)], self.retention_days, self.batch_size
+            )
+        return moved
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                moved = self.run_once()
+                if any(moved.values()):
+                    logger.info("Archived expired posts: %s", moved)
+            except Exception:
+                logger.exception("Archiving expired posts failed")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="post-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
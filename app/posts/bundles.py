@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from bson import encode
+from pymongo import DESCENDING
+from pymongo.collection import Collection
+from app.config import BUNDLE_MAX_ITEMS, BUNDLE_REFRESH_DELAY_SECONDS
+from app.storage import StorageBackend, is_read_only
+from .model import add_write_listener, remove_write_listener
+
+logger = logging.getLogger(__name__)
+
+# Bundle section -> source collection
+BUNDLE_SECTIONS = {
+    "schemes": "scheme_posts",
+    "jobs": "gov_jobs_posts",
+    "services": "digital_services"
+}
+SUMMARY_PROJECTION = {
+    "title": 1, "cities": 1, "sector_id": 1, "sector_name": 1,
+    "start_date": 1, "end_date": 1, "last_activity": 1
+}
+
+def open_posts_filter(state: str, now: datetime, has_end_date: bool = True) -> Dict:
+    query = {"states": state}
+    if has_end_date:
+        query["end_date"] = {"$gte": now}
+    return query
+
+def _summary(document: Dict) -> Dict:
+    summary = {"id": str(document["_id"]), "title": document["title"], "cities": document.get("cities", [])}
+    for field in ("sector_id", "sector_name", "start_date", "end_date", "last_activity"):
+        if field in document:
+            summary[field] = document[field]
+    return summary
+
+def build_bundle(state: str, sources: Dict[str, Collection], now: Optional[datetime] = None) -> Dict:
+    now = now or datetime.utcnow()
+    bundle = {"_id": state, "counts": {}, "post_ids": []}
+    end_dates = []
+    for section, collection_name in BUNDLE_SECTIONS.items():
+        collection = sources[collection_name]
+        has_end_date = collection_name != "digital_services"
+        query = open_posts_filter(state, now, has_end_date)
+        documents = list(
+            collection.find(query, SUMMARY_PROJECTION).sort("last_activity", DESCENDING).limit(BUNDLE_MAX_ITEMS)
+        )
+        bundle[section] = [_summary(document) for document in documents]
+        bundle["post_ids"] += [document["_id"] for document in documents]
+        count = len(documents)
+        if count == BUNDLE_MAX_ITEMS:
+            count = collection.count_documents(query)
+        bundle["counts"][section] = count
+        end_dates += [document["end_date"] for document in documents if document.get("end_date")]
+
+    content = {section: bundle[section] for section in BUNDLE_SECTIONS}
+    content["counts"] = bundle["counts"]
+    bundle["etag"] = '"' + hashlib.sha1(encode(content)).hexdigest() + '"'
+    # The bundle goes stale as soon as its first included post closes
+    bundle["valid_until"] = min(end_dates) if end_dates else None
+    bundle["built_at"] = now
+    return bundle
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison over the listed tags; "*" matches any existing bundle
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or _opaque_tag(etag) in {_opaque_tag(tag) for tag in tags}
+
+def rebuild_bundle(state: str, bundles: Collection, sources: Dict[str, Collection]) -> Dict:
+    bundle = build_bundle(state, sources)
+    # Read-only nodes serve freshly built bundles without storing them
+    if not is_read_only(bundles):
+        bundles.replace_one({"_id": state}, bundle, upsert=True)
+    return bundle
+
+def get_bundle(state: str, bundles: Collection, sources: Dict[str, Collection]) -> Dict:
+    # Served with a single _id read; built on first use or once a post in it has closed
+    bundle = bundles.find_one({"_id": state})
+    if bundle is None:
+        bundle = build_bundle(state, sources)
+        # Unknown state names are answered without materializing an empty bundle
+        if bundle["post_ids"] and not is_read_only(bundles):
+            bundles.replace_one({"_id": state}, bundle, upsert=True)
+    elif bundle.get("valid_until") and bundle["valid_until"] < datetime.utcnow():
+        bundle = rebuild_bundle(state, bundles, sources)
+    return bundle
+
+# Rebuilds the bundles of the states touched by post writes in the background,
+# coalescing bursts of writes into one rebuild per state
+class StateBundleRefresher:
+    def __init__(self, db: StorageBackend, delay: float = BUNDLE_REFRESH_DELAY_SECONDS):
+        self.bundles = db["state_bundles"]
+        self.sources = {name: db[name] for name in BUNDLE_SECTIONS.values()}
+        self.delay = delay
+        self._states: Set[str] = set()
+        self._post_ids: Set = set()
+        self._rebuild_all = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _on_write(self, collection_name: str, op: str, document: Optional[Dict]) -> None:
+        if collection_name not in self.sources:
+            return
+        with self._lock:
+            if document is None:
+                self._rebuild_all = True
+            else:
+                self._states.update(document.get("states", []))
+                # Also catches states the post has just been removed from
+                self._post_ids.add(document["_id"])
+        self._wake.set()
+
+    def _affected_states(self) -> List[str]:
+        with self._lock:
+            states, post_ids, rebuild_all = self._states, self._post_ids, self._rebuild_all
+            self._states, self._post_ids, self._rebuild_all = set(), set(), False
+        if rebuild_all:
+            states |= set(self.bundles.distinct("_id"))
+        if post_ids:
+            states |= {b["_id"] for b in self.bundles.find({"post_ids": {"$in": list(post_ids)}}, {"_id": 1})}
+        return sorted(states)
+
+    def refresh(self) -> int:
+        states = self._affected_states()
+        for state in states:
+            rebuild_bundle(state, self.bundles, self.sources)
+        return len(states)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Let a burst of writes settle before rebuilding
+            self._stop.wait(self.delay)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing state bundles failed")
+
+    def start(self) -> None:
+        add_write_listener(self._on_write)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="state-bundles", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        remove_write_listener(self._on_write)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from bson import decode, encode
+from app.config import (CACHE_BACKEND, CACHE_REDIS_URL, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, CACHE_MAX_VERSIONS,
+                        CACHE_VERSION_TTL_SECONDS)
+from .model import add_write_listener, _naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Cached values are stored wrapped as {"v": value}, so a miss (None) can be
+# told apart from a cached None (e.g. a document that doesn't exist)
+class CacheBackend:
+    def get(self, key: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict, ttl: float) -> None:
+        raise NotImplementedError
+
+    def get_versions(self, names: Sequence[str]) -> List[int]:
+        raise NotImplementedError
+
+    def bump_version(self, name: str) -> None:
+        raise NotImplementedError
+
+# Per-process LRU, suitable for a single worker
+class MemoryLRUBackend(CacheBackend):
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_versions: int = CACHE_MAX_VERSIONS):
+        self.max_entries = max_entries
+        self.max_versions = max_versions
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Every bump takes the next value of one clock, so a version is never
+        # handed out twice. Names evicted from the bounded map read as the
+        # clock at their eviction, which is newer than anything cached for them.
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Dict, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_versions(self, names: Sequence[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(name, self._floor) for name in names]
+
+    def bump_version(self, name: str) -> None:
+        with self._lock:
+            self._clock += 1
+            self._versions[name] = self._clock
+            self._versions.move_to_end(name)
+            while len(self._versions) > self.max_versions:
+                self._versions.popitem(last=False)
+                self._floor = self._clock
+
+# Shared by all workers; speaks the Redis protocol through the redis client.
+# Version keys take their value from one shared clock and expire after
+# version_ttl; entries are capped below that, so a name whose key expired
+# (and reads 0 again) can't pick up an entry cached before it was last bumped.
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str = CACHE_REDIS_URL, client: Any = None,
+                 version_ttl: float = CACHE_VERSION_TTL_SECONDS):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self.version_ttl = version_ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        raw = self._client.get(key)
+        return decode(raw) if raw is not None else None
+
+    def set(self, key: str, value: Dict, ttl: float) -> None:
+        self._client.set(key, encode(value), px=int(min(ttl, self.version_ttl / 2) * 1000))
+
+    def get_versions(self, names: Sequence[str]) -> List[int]:
+        return [int(raw) if raw is not None else 0 for raw in self._client.mget([f"version:{n}" for n in names])]
+
+    def bump_version(self, name: str) -> None:
+        self._client.set(f"version:{name}", self._client.incr("version-clock"), px=int(self.version_ttl * 1000))
+
+# Concurrent callers asking for the same key share a single load
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, "_Call"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+# BSON decodes datetimes as naive UTC, so values are normalized the same way
+# before they are cached and every backend hands back identical values
+def _naive_datetimes(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _naive_utc(value)
+    if isinstance(value, dict):
+        return {key: _naive_datetimes(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_naive_datetimes(item) for item in value]
+    return value
+
+# Versioned cache: each entry key embeds the current value of the version
+# counters it depends on, so bumping a counter invalidates every entry built
+# from it without having to find and delete them.
+#   list:<collection>        bumped by every write to the collection
+#   doc:<collection>/<id>    bumped by writes to that document
+#   epoch:<collection>       bumped by bulk writes that don't say which documents changed
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float = CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self._flight = SingleFlight()
+
+    def get_or_load(self, key: str, version_names: Sequence[str], loader: Callable[[], Any],
+                    ttl: Optional[float] = None) -> Any:
+        try:
+            versions = self.backend.get_versions(version_names)
+            full_key = f"{key}@{'.'.join(str(version) for version in versions)}"
+            hit = self.backend.get(full_key)
+        except Exception:
+            logger.exception("Cache lookup failed for %s", key)
+            return loader()
+        if hit is not None:
+            return hit["v"]
+        return self._flight.do(full_key, lambda: self._load(full_key, loader, ttl))
+
+    def _load(self, full_key: str, loader: Callable[[], Any], ttl: Optional[float]) -> Any:
+        value = _naive_datetimes(loader())
+        try:
+            self.backend.set(full_key, {"v": value}, self.ttl if ttl is None else ttl)
+        except Exception:
+            logger.exception("Cache store failed for %s", full_key)
+        return value
+
+    def get_document(self, collection_name: str, item_id: str, loader: Callable[[], Any]) -> Any:
+        return self.get_or_load(
+            f"{collection_name}/{item_id}",
+            [f"epoch:{collection_name}", f"doc:{collection_name}/{item_id}"],
+            loader
+        )
+
+    def get_list(self, collection_name: str, loader: Callable[[], Any]) -> Any:
+        return self.get_or_load(f"{collection_name}/", [f"list:{collection_name}"], loader)
+
+    def invalidate(self, collection_name: str, item_id: Optional[str] = None) -> None:
+        try:
+            self.backend.bump_version(f"list:{collection_name}")
+            if item_id is None:
+                self.backend.bump_version(f"epoch:{collection_name}")
+            else:
+                self.backend.bump_version(f"doc:{collection_name}/{item_id}")
+        except Exception:
+            logger.exception("Cache invalidation failed for %s", collection_name)
+
+def _create_backend() -> CacheBackend:
+    if CACHE_BACKEND == "redis":
+        return RedisBackend()
+    return MemoryLRUBackend()
+
+response_cache = ResponseCache(_create_backend())
+
+def _invalidate_on_write(collection_name: str, op: str, document: Optional[Dict]) -> None:
+    item_id = str(document["_id"]) if document else None
+    response_cache.invalidate(collection_name, item_id)
+
+add_write_listener(_invalidate_on_write)
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from pymongo.collection import Collection
+from app.storage import StorageBackend
+from app.config import ELIGIBILITY_REBUILD_DELAY_SECONDS, ELIGIBILITY_RELOAD_SECONDS
+from .cache import response_cache
+from .model import add_write_listener, _naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Collection -> resource name reported in eligibility results
+ELIGIBILITY_RESOURCES = {
+    "scheme_posts": "scheme-posts",
+    "gov_jobs_posts": "gov-jobs-posts",
+    "digital_services": "digital-services"
+}
+ELIGIBILITY_PROJECTION = {
+    "title": 1, "required_documents": 1, "states": 1, "cities": 1, "sector_id": 1, "sector_name": 1,
+    "end_date": 1, "last_activity": 1
+}
+
+def normalize_document_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+# In-memory index answering "which open posts require only documents I hold".
+# Document names are interned into bit positions and every post keeps the mask
+# of its required documents. Posts are grouped by mask, so a query tests each
+# distinct mask once with (mask & ~held) == 0 instead of checking every post.
+# Write notifications only reach the worker that made the write, so queries
+# also rebuild collections whose shared list:<collection> cache version moved.
+class EligibilityIndex:
+    def __init__(self, reload_seconds: float = ELIGIBILITY_RELOAD_SECONDS):
+        self._bits: Dict[str, int] = {}
+        self._posts: Dict[Tuple[str, str], Tuple[int, Dict]] = {}
+        self._by_mask: Dict[int, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self.collections: Dict[str, Collection] = {}
+        self._dirty: Set[str] = set()
+        self._rebuild: Optional[threading.Timer] = None
+        self.reload_seconds = reload_seconds
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def _mask(self, names: List[str], intern: bool) -> int:
+        mask = 0
+        for name in names:
+            key = normalize_document_name(name)
+            if key not in self._bits:
+                if not intern:
+                    # Nobody requires it, so holding it changes nothing
+                    continue
+                self._bits[key] = len(self._bits)
+            mask |= 1 << self._bits[key]
+        return mask
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        previous = self._posts.pop(key, None)
+        if previous is not None:
+            keys = self._by_mask[previous[0]]
+            keys.discard(key)
+            if not keys:
+                del self._by_mask[previous[0]]
+
+    def _add(self, collection_name: str, document: Dict) -> None:
+        key = (collection_name, str(document["_id"]))
+        self._remove(key)
+        required = [doc["name"] for doc in document.get("required_documents", [])]
+        mask = self._mask(required, intern=True)
+        summary = {field: document.get(field) for field in ELIGIBILITY_PROJECTION}
+        # Listener documents carry request dates as given, possibly tz-aware
+        for field in ("end_date", "last_activity"):
+            if isinstance(summary[field], datetime):
+                summary[field] = _naive_utc(summary[field])
+        summary["required_documents"] = required
+        self._posts[key] = (mask, summary)
+        self._by_mask.setdefault(mask, set()).add(key)
+
+    def upsert(self, collection_name: str, document: Dict) -> None:
+        with self._lock:
+            self._add(collection_name, document)
+
+    def remove(self, collection_name: str, post_id: str) -> None:
+        with self._lock:
+            self._remove((collection_name, post_id))
+
+    def load_collection(self, collection: Collection) -> None:
+        documents = list(collection.find({}, ELIGIBILITY_PROJECTION))
+        with self._lock:
+            for key in [key for key in self._posts if key[0] == collection.name]:
+                self._remove(key)
+            for document in documents:
+                self._add(collection.name, document)
+
+    def rename_sector(self, sector_id: str, sector_name: str) -> None:
+        with self._lock:
+            for _, summary in self._posts.values():
+                if summary["sector_id"] == sector_id:
+                    summary["sector_name"] = sector_name
+
+    def mark_dirty(self, collection_name: str) -> None:
+        # Bulk changes arrive in bursts (one per fan-out batch); rebuild once, off the writer's thread
+        with self._lock:
+            self._dirty.add(collection_name)
+            if self._rebuild is not None:
+                return
+            self._rebuild = threading.Timer(ELIGIBILITY_REBUILD_DELAY_SECONDS, self._rebuild_dirty)
+            self._rebuild.daemon = True
+            self._rebuild.start()
+
+    def _rebuild_dirty(self) -> None:
+        with self._lock:
+            dirty, self._dirty, self._rebuild = self._dirty, set(), None
+        for name in sorted(dirty):
+            try:
+                self.load_collection(self.collections[name])
+            except Exception:
+                logger.exception("Rebuilding the eligibility index for %s failed", name)
+
+    def _collection_versions(self, names: List[str]) -> Dict[str, int]:
+        try:
+            versions = response_cache.backend.get_versions([f"list:{name}" for name in names])
+        except Exception:
+            logger.exception("Could not read the eligibility collection versions")
+            return {}
+        return dict(zip(names, versions))
+
+    def reload_if_changed(self) -> List[str]:
+        self._checked_at = time.monotonic()
+        versions = self._collection_versions(list(self.collections))
+        changed = [name for name, version in versions.items() if version != self._versions.get(name)]
+        for name in changed:
+            # Recorded before the rebuild reads, so a write racing it is picked up by the next check
+            self._versions[name] = versions[name]
+            self.mark_dirty(name)
+        return changed
+
+    def load(self, db: StorageBackend) -> None:
+        self._versions = self._collection_versions(list(ELIGIBILITY_RESOURCES))
+        self._checked_at = time.monotonic()
+        for name in ELIGIBILITY_RESOURCES:
+            self.load_collection(db[name])
+        self.collections = {name: db[name] for name in ELIGIBILITY_RESOURCES}
+
+    def eligible(self, documents: List[str], state: Optional[str] = None, sector_id: Optional[str] = None,
+                 resources: Optional[List[str]] = None, limit: int = 100,
+                 now: Optional[datetime] = None) -> Tuple[List[Dict], int]:
+        now = now or datetime.utcnow()
+        if self.collections and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.reload_if_changed()
+        with self._lock:
+            held = self._mask(documents, intern=False)
+            keys = [key for mask, group in self._by_mask.items() if mask & ~held == 0 for key in group]
+            items = []
+            for collection_name, post_id in keys:
+                resource = ELIGIBILITY_RESOURCES[collection_name]
+                summary = self._posts[(collection_name, post_id)][1]
+                if resources and resource not in resources:
+                    continue
+                if summary["end_date"] is not None and summary["end_date"] < now:
+                    continue
+                if state and state not in summary["states"]:
+                    continue
+                if sector_id and summary["sector_id"] != sector_id:
+                    continue
+                items.append({**summary, "resource": resource, "id": post_id})
+        items.sort(key=lambda item: item["last_activity"] or datetime.min, reverse=True)
+        return items[:limit], len(items)
+
+eligibility_index = EligibilityIndex()
+
+def _refresh_on_write(collection_name: str, op: str, document: Optional[Dict]) -> None:
+    # Writes before the startup load are picked up by the load itself
+    if not eligibility_index.collections:
+        return
+    if collection_name == "sectors":
+        # Patch the copied sector names right away; the posts' own fan-out follows
+        if op != "delete" and document is not None:
+            eligibility_index.rename_sector(str(document["_id"]), document["name"])
+        return
+    if collection_name not in eligibility_index.collections:
+        return
+    if document is None:
+        eligibility_index.mark_dirty(collection_name)
+    elif op == "delete":
+        eligibility_index.remove(collection_name, str(document["_id"]))
+    else:
+        eligibility_index.upsert(collection_name, document)
+
+add_write_listener(_refresh_on_write)
@@ -0,0 +1,92 @@
+import base64
+import heapq
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, Optional, Tuple
+from bson import ObjectId
+from pymongo import DESCENDING
+from pymongo.collection import Collection
+from .model import notify_write
+
+FEED_SORT = [("last_activity", DESCENDING), ("_id", DESCENDING)]
+FEED_PROJECTION = {
+    "title": 1, "description": 1, "states": 1, "cities": 1,
+    "sector_id": 1, "sector_name": 1, "start_date": 1, "end_date": 1, "last_activity": 1
+}
+
+def encode_cursor(last_activity: datetime, object_id: ObjectId) -> str:
+    raw = json.dumps({"t": last_activity.isoformat(), "id": str(object_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(raw["t"]), ObjectId(raw["id"])
+    except Exception:
+        raise ValueError("Invalid feed cursor")
+
+def feed_filter(after: Optional[Tuple[datetime, ObjectId]] = None) -> Dict:
+    if after is None:
+        return {}
+    last_activity, object_id = after
+    # Everything strictly after the cursor in (last_activity, _id) descending order
+    return {"$or": [
+        {"last_activity": {"$lt": last_activity}},
+        {"last_activity": last_activity, "_id": {"$lt": object_id}}
+    ]}
+
+def _tagged(resource: str, documents: Iterator[Dict]) -> Iterator[Tuple[str, Dict]]:
+    for document in documents:
+        yield resource, document
+
+def _sort_key(item: Tuple[str, Dict]) -> Tuple[datetime, ObjectId]:
+    return item[1]["last_activity"], item[1]["_id"]
+
+def read_feed(collections: Dict[str, Collection], limit: int, cursor: Optional[str] = None) -> Dict:
+    query = feed_filter(decode_cursor(cursor) if cursor else None)
+    # No collection can contribute more than limit + 1 items to a page
+    cursors = {
+        resource: collection.find(query, FEED_PROJECTION).sort(FEED_SORT).limit(limit + 1)
+        for resource, collection in collections.items()
+    }
+    try:
+        merged = heapq.merge(
+            *(_tagged(resource, documents) for resource, documents in cursors.items()),
+            key=_sort_key, reverse=True
+        )
+        page = list(islice(merged, limit + 1))
+    finally:
+        for documents in cursors.values():
+            documents.close()
+
+    items = page[:limit]
+    return {
+        "items": [
+            {
+                "resource": resource,
+                "id": str(document["_id"]),
+                "title": document["title"],
+                "description": document["description"],
+                "states": document["states"],
+                "cities": document["cities"],
+                "sector_id": document.get("sector_id"),
+                "sector_name": document.get("sector_name"),
+                "start_date": document.get("start_date"),
+                "end_date": document.get("end_date"),
+                "last_activity": document["last_activity"]
+            }
+            for resource, document in items
+        ],
+        "next_cursor": encode_cursor(*_sort_key(items[-1])) if len(page) > limit else None
+    }
+
+def backfill_last_activity(collection: Collection) -> int:
+    # Posts written before the feed existed get the same sort key save() computes
+    result = collection.update_many(
+        {"last_activity": {"$exists": False}},
+        [{"$set": {"last_activity": {"$ifNull": [{"$max": "$updates.date"}, {"$toDate": "$_id"}]}}}]
+    )
+    if result.modified_count:
+        notify_write(collection.name, "update")
+    return result.modified_count
@@ -0,0 +1,24 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database
+
+def ensure_indexes(db: Database) -> None:
+    # The archiver scans expired posts by end date
+    for name in ("scheme_posts", "gov_jobs_posts"):
+        db[name].create_index([("end_date", ASCENDING)])
+    # Sector renames refresh the denormalized sector_name by sector
+    for name in ("scheme_posts", "gov_jobs_posts"):
+        db[name].create_index([("sector_id", ASCENDING)])
+    # The startup backfill looks for posts still missing sector_name
+    for name in ("scheme_posts", "gov_jobs_posts"):
+        db[name].create_index([("sector_name", ASCENDING), ("sector_id", ASCENDING)])
+    # The feed walks each post collection newest first
+    for name in ("scheme_posts", "gov_jobs_posts", "digital_services"):
+        db[name].create_index([("last_activity", DESCENDING), ("_id", DESCENDING)])
+    # Bundles list a state's open posts newest first (equality, sort, range)
+    for name in ("scheme_posts", "gov_jobs_posts"):
+        db[name].create_index([("states", ASCENDING), ("last_activity", DESCENDING), ("end_date", ASCENDING)])
+    db["digital_services"].create_index([("states", ASCENDING), ("last_activity", DESCENDING)])
+    # Post writes look up the bundles that currently list the post
+    db["state_bundles"].create_index([("post_ids", ASCENDING)])
+    # Subscriptions are listed per subscriber
+    db["subscriptions"].create_index([("subscriber_id", ASCENDING)])
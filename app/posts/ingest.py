@@ -0,0 +1,154 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+from pymongo import ReplaceOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+from app.config import (INGEST_QUEUE_SIZE, INGEST_BATCH_SIZE, INGEST_FLUSH_INTERVAL_SECONDS,
+                        INGEST_ENQUEUE_TIMEOUT_SECONDS, INGEST_TICKET_RETENTION)
+from .model import notify_write
+
+logger = logging.getLogger(__name__)
+
+class IngestQueueFull(Exception):
+    pass
+
+class IngestQueueClosed(Exception):
+    pass
+
+# Buffers validated posts and writes them to Mongo in batched bulk_writes from
+# a background thread. Each accepted post gets a ticket to look up its outcome.
+class IngestQueue:
+    def __init__(self, max_size: int = INGEST_QUEUE_SIZE, batch_size: int = INGEST_BATCH_SIZE,
+                 flush_interval: float = INGEST_FLUSH_INTERVAL_SECONDS,
+                 enqueue_timeout: float = INGEST_ENQUEUE_TIMEOUT_SECONDS,
+                 ticket_retention: int = INGEST_TICKET_RETENTION):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.ticket_retention = ticket_retention
+        self._queue: "queue.Queue[Tuple[str, Collection, Dict]]" = queue.Queue(max_size)
+        self._tickets: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tickets_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._accepting = False
+        self._accepting_lock = threading.Lock()
+
+    def submit(self, collection: Collection, document: Dict) -> Dict:
+        ticket = {
+            "ticket_id": uuid4().hex,
+            "resource": collection.name,
+            "id": str(document["_id"]),
+            "status": "queued",
+            "error": None
+        }
+        self._set_ticket(ticket)
+        try:
+            # Holding the lock guarantees stop() sees every accepted post before draining
+            with self._accepting_lock:
+                if not self._accepting:
+                    raise IngestQueueClosed()
+                try:
+                    # Backpressure: wait briefly for room, then let the caller retry later
+                    self._queue.put((ticket["ticket_id"], collection, document), timeout=self.enqueue_timeout)
+                except queue.Full:
+                    raise IngestQueueFull()
+        except (IngestQueueFull, IngestQueueClosed):
+            with self._tickets_lock:
+                self._tickets.pop(ticket["ticket_id"], None)
+            raise
+        return dict(ticket)
+
+    def get_ticket(self, ticket_id: str) -> Optional[Dict]:
+        with self._tickets_lock:
+            ticket = self._tickets.get(ticket_id)
+            return dict(ticket) if ticket else None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _set_ticket(self, ticket: Dict) -> None:
+        with self._tickets_lock:
+            self._tickets[ticket["ticket_id"]] = ticket
+            while len(self._tickets) > self.ticket_retention:
+                self._tickets.popitem(last=False)
+
+    def _update_ticket(self, ticket_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._tickets_lock:
+            ticket = self._tickets.get(ticket_id)
+            if ticket:
+                ticket["status"] = status
+                ticket["error"] = error
+
+    def _collect(self) -> List[Tuple[str, Collection, Dict]]:
+        # Flush when the batch is full or flush_interval after its first item
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            if len(batch) == 1:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _flush(self, batch: List[Tuple[str, Collection, Dict]]) -> None:
+        by_collection: Dict[str, List[Tuple[str, Collection, Dict]]] = {}
+        for item in batch:
+            by_collection.setdefault(item[1].full_name, []).append(item)
+
+        for items in by_collection.values():
+            collection = items[0][1]
+            failed: Dict[int, str] = {}
+            upserted: Dict[int, object] = {}
+            try:
+                result = collection.bulk_write(
+                    [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for _, _, document in items],
+                    ordered=False
+                )
+                upserted = result.upserted_ids
+            except BulkWriteError as exc:
+                failed = {error["index"]: error["errmsg"] for error in exc.details.get("writeErrors", [])}
+                upserted = {u["index"]: u["_id"] for u in exc.details.get("upserted", [])}
+            except Exception as exc:
+                logger.exception("Flushing %d queued posts to %s failed", len(items), collection.name)
+                failed = {index: str(exc) for index in range(len(items))}
+
+            for index, (ticket_id, _, document) in enumerate(items):
+                if index in failed:
+                    self._update_ticket(ticket_id, "failed", failed[index])
+                    continue
+                self._update_ticket(ticket_id, "written")
+                notify_write(collection.name, "insert" if index in upserted else "update", document)
+
+    def _run(self) -> None:
+        # Keep going after stop() until everything queued has been written
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+        self._accepting = True
+
+    def stop(self) -> None:
+        with self._accepting_lock:
+            self._accepting = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+ingest_queue = IngestQueue()
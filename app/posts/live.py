@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+from bson import ObjectId
+from fastapi import Request, WebSocket
+from fastapi.encoders import jsonable_encoder
+from app.config import LIVE_BUFFER_SIZE, LIVE_KEEPALIVE_SECONDS, LIVE_MAX_SUBSCRIBERS
+from .model import add_write_listener
+
+logger = logging.getLogger(__name__)
+
+# Collection -> resource name used in the API paths and the resource filter
+LIVE_RESOURCES = {
+    "scheme_posts": "scheme-posts",
+    "gov_jobs_posts": "gov-jobs-posts",
+    "digital_services": "digital-services"
+}
+EVENT_FIELDS = ("title", "states", "cities", "sector_id", "sector_name", "start_date", "end_date", "last_activity")
+
+class LiveHubFull(Exception):
+    pass
+
+# A connected client; its buffer lives on the event loop that serves the connection
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, filters: Dict[str, Optional[str]], buffer_size: int):
+        self.loop = loop
+        self.filters = {key: value for key, value in filters.items() if value}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+    def matches(self, resource: str, document: Optional[Dict]) -> bool:
+        if self.filters.get("resource", resource) != resource:
+            return False
+        if document is None:
+            # Bulk invalidations carry no document, so only the resource filter applies
+            return True
+        if "state" in self.filters and self.filters["state"] not in document.get("states", []):
+            return False
+        if "city" in self.filters and self.filters["city"] not in document.get("cities", []):
+            return False
+        if "sector" in self.filters and self.filters["sector"] != document.get("sector_id"):
+            return False
+        return True
+
+    # Runs on the subscriber's loop
+    def offer(self, event: Optional[str]) -> None:
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: discard its backlog and tell the connection to close
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+# In-process fan-out of post writes to live subscribers. Each event is encoded
+# once and handed to the matching subscribers' loops from the writing thread.
+class LiveHub:
+    def __init__(self, buffer_size: int = LIVE_BUFFER_SIZE, max_subscribers: int = LIVE_MAX_SUBSCRIBERS):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, state: Optional[str] = None, city: Optional[str] = None,
+                  sector: Optional[str] = None, resource: Optional[str] = None) -> Subscriber:
+        subscriber = Subscriber(
+            asyncio.get_running_loop(),
+            {"state": state, "city": city, "sector": sector, "resource": resource},
+            self.buffer_size
+        )
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise LiveHubFull()
+            self._subscribers = self._subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+            if subscriber.dropped:
+                self.dropped += 1
+
+    def publish(self, collection_name: str, op: str, document: Optional[Dict]) -> None:
+        resource = LIVE_RESOURCES.get(collection_name)
+        subscribers = self._subscribers
+        if resource is None or not subscribers:
+            return
+        targets = [s for s in subscribers if s.matches(resource, document)]
+        if not targets:
+            return
+        event = {"op": op, "resource": resource}
+        if document is not None:
+            event["id"] = str(document["_id"])
+            event["post"] = {field: document[field] for field in EVENT_FIELDS if field in document}
+        payload = json.dumps(jsonable_encoder(event, custom_encoder={ObjectId: str}))
+        self.published += 1
+        for subscriber in targets:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, payload)
+            except RuntimeError:
+                # The subscriber's loop has already shut down
+                pass
+
+    def metrics(self) -> Dict[str, int]:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+live_hub = LiveHub()
+
+# Server-Sent Events body for one subscriber
+async def sse_events(request: Request, subscriber: Subscriber) -> AsyncIterator[str]:
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), LIVE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                yield "event: dropped\ndata: {}\n\n"
+                break
+            yield f"event: post\ndata: {event}\n\n"
+    finally:
+        live_hub.unsubscribe(subscriber)
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+# Forwards events to an accepted WebSocket until either side goes away
+async def pump_websocket(websocket: WebSocket, subscriber: Subscriber) -> None:
+    disconnected = asyncio.ensure_future(_wait_disconnect(websocket))
+    try:
+        while True:
+            event = asyncio.ensure_future(subscriber.queue.get())
+            done, _ = await asyncio.wait({event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                event.cancel()
+                break
+            if event.result() is None:
+                # Slow consumer, the client is expected to reconnect
+                await websocket.close(code=1013)
+                break
+            await websocket.send_text(event.result())
+    finally:
+        disconnected.cancel()
+        live_hub.unsubscribe(subscriber)
+
+add_write_listener(live_hub.publish)
@@ -0,0 +1,264 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from pymongo.collection import Collection
+from app.config import MATCH_QUEUE_SIZE, MATCH_BATCH_SIZE, MATCH_LATENCY_SAMPLES, MATCH_RELOAD_SECONDS
+from app.storage import StorageBackend
+from .cache import response_cache
+from .eligibility import normalize_document_name
+from .model import add_write_listener, remove_write_listener
+
+logger = logging.getLogger(__name__)
+
+# Collections whose new posts are matched -> resource name used in subscriptions
+MATCH_RESOURCES = {
+    "scheme_posts": "scheme-posts",
+    "gov_jobs_posts": "gov-jobs-posts"
+}
+FACETS = ("states", "cities", "sector_ids", "resources")
+
+Notifier = Callable[[str, str, List[str]], None]
+
+def log_notifier(resource: str, post_id: str, subscriber_ids: List[str]) -> None:
+    logger.info("Matched %d subscribers for %s/%s", len(subscriber_ids), resource, post_id)
+
+# One subscription as held in memory; empty sets mean "any"
+class _Entry:
+    __slots__ = ("subscription_id", "subscriber_id", "states", "cities", "sector_ids", "resources", "documents")
+
+    def __init__(self, document: Dict):
+        self.subscription_id = str(document["_id"])
+        self.subscriber_id = document["subscriber_id"]
+        self.states = frozenset(document.get("states", []))
+        self.cities = frozenset(document.get("cities", []))
+        self.sector_ids = frozenset(document.get("sector_ids", []))
+        self.resources = frozenset(document.get("resources", []))
+        self.documents = frozenset(normalize_document_name(name) for name in document.get("documents", []))
+
+    def accepts(self, resource: str, states: Set[str], cities: Set[str], sector_id: Optional[str],
+                required_documents: Set[str]) -> bool:
+        return ((not self.resources or resource in self.resources)
+                and (not self.states or not self.states.isdisjoint(states))
+                # State-wide posts without cities reach every city
+                and (not self.cities or not cities or not self.cities.isdisjoint(cities))
+                and (not self.sector_ids or sector_id in self.sector_ids)
+                and (not self.documents or required_documents <= self.documents))
+
+# Inverted index from a facet value to the subscriptions that ask for it, plus
+# the subscriptions that leave the facet open
+class _Facet:
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.wildcard: Set[str] = set()
+
+    def add(self, subscription_id: str, values: Iterable[str]) -> None:
+        if not values:
+            self.wildcard.add(subscription_id)
+        for value in values:
+            self.postings.setdefault(value, set()).add(subscription_id)
+
+    def remove(self, subscription_id: str, values: Iterable[str]) -> None:
+        self.wildcard.discard(subscription_id)
+        for value in values:
+            ids = self.postings.get(value)
+            if ids is not None:
+                ids.discard(subscription_id)
+                if not ids:
+                    del self.postings[value]
+
+    def estimate(self, values: Iterable[str]) -> int:
+        return len(self.wildcard) + sum(len(self.postings.get(value, ())) for value in values)
+
+    def candidates(self, values: Iterable[str]) -> Set[str]:
+        result = set(self.wildcard)
+        for value in values:
+            result |= self.postings.get(value, set())
+        return result
+
+class SubscriptionIndex:
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._facets = {name: _Facet() for name in FACETS}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, subscription_id: str) -> None:
+        entry = self._entries.pop(subscription_id, None)
+        if entry is not None:
+            for name, facet in self._facets.items():
+                facet.remove(subscription_id, getattr(entry, name))
+
+    def upsert(self, document: Dict) -> None:
+        entry = _Entry(document)
+        with self._lock:
+            self._remove(entry.subscription_id)
+            self._entries[entry.subscription_id] = entry
+            for name, facet in self._facets.items():
+                facet.add(entry.subscription_id, getattr(entry, name))
+
+    def remove(self, subscription_id: str) -> None:
+        with self._lock:
+            self._remove(subscription_id)
+
+    def load(self, collection: Collection) -> None:
+        index = SubscriptionIndex()
+        for document in collection.find():
+            index.upsert(document)
+        with self._lock:
+            self._entries, self._facets = index._entries, index._facets
+
+    def match(self, resource: str, post: Dict) -> List[str]:
+        states = set(post.get("states", []))
+        cities = set(post.get("cities", []))
+        sector_id = post.get("sector_id")
+        required_documents = {normalize_document_name(document["name"])
+                              for document in post.get("required_documents", [])}
+        lookups = {
+            "states": states,
+            "sector_ids": [sector_id] if sector_id else [],
+            "resources": [resource]
+        }
+        if cities:
+            lookups["cities"] = cities
+        with self._lock:
+            # Generate candidates from the most selective facet, then verify each one
+            name = min(lookups, key=lambda facet: self._facets[facet].estimate(lookups[facet]))
+            candidates = self._facets[name].candidates(lookups[name])
+            matched = {}
+            for subscription_id in candidates:
+                entry = self._entries[subscription_id]
+                if entry.accepts(resource, states, cities, sector_id, required_documents):
+                    matched[entry.subscriber_id] = None
+        return list(matched)
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+# Matches every newly created scheme or job post against the subscriptions in
+# a background thread and hands matched subscriber ids to the notifier in batches.
+# Write notifications only reach the worker that made the write, so the index
+# is also reloaded whenever the shared list:subscriptions cache version moves.
+class SubscriptionMatcher:
+    def __init__(self, db: StorageBackend, notifier: Notifier = log_notifier, batch_size: int = MATCH_BATCH_SIZE,
+                 queue_size: int = MATCH_QUEUE_SIZE, reload_seconds: float = MATCH_RELOAD_SECONDS):
+        self.subscriptions = db["subscriptions"]
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.reload_seconds = reload_seconds
+        self.index = SubscriptionIndex()
+        self._loaded_version: Optional[int] = None
+        self._checked_at = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._match_ms = deque(maxlen=MATCH_LATENCY_SAMPLES)
+        self._lag_ms = deque(maxlen=MATCH_LATENCY_SAMPLES)
+        self.posts_matched = 0
+        self.subscribers_notified = 0
+        self.posts_dropped = 0
+
+    def _on_write(self, collection_name: str, op: str, document: Optional[Dict]) -> None:
+        if collection_name == self.subscriptions.name:
+            if document is None:
+                self.index.load(self.subscriptions)
+            elif op == "delete":
+                self.index.remove(str(document["_id"]))
+            else:
+                self.index.upsert(document)
+        elif collection_name in MATCH_RESOURCES and op == "insert" and document is not None:
+            try:
+                self._queue.put_nowait((collection_name, document, time.perf_counter()))
+            except queue.Full:
+                # Never hold up the write; the post simply produces no alerts
+                self.posts_dropped += 1
+                logger.warning("Subscription matching queue full, skipped %s", document["_id"])
+
+    def match_post(self, collection_name: str, document: Dict, queued_at: Optional[float] = None) -> int:
+        resource = MATCH_RESOURCES[collection_name]
+        started = time.perf_counter()
+        subscriber_ids = self.index.match(resource, document)
+        self._match_ms.append((time.perf_counter() - started) * 1000)
+        post_id = str(document["_id"])
+        for start in range(0, len(subscriber_ids), self.batch_size):
+            try:
+                self.notifier(resource, post_id, subscriber_ids[start:start + self.batch_size])
+            except Exception:
+                logger.exception("Notifier failed for %s/%s", resource, post_id)
+        if queued_at is not None:
+            self._lag_ms.append((time.perf_counter() - queued_at) * 1000)
+        self.posts_matched += 1
+        self.subscribers_notified += len(subscriber_ids)
+        return len(subscriber_ids)
+
+    def _subscriptions_version(self) -> Optional[int]:
+        try:
+            return response_cache.backend.get_versions([f"list:{self.subscriptions.name}"])[0]
+        except Exception:
+            logger.exception("Could not read the subscriptions version")
+            return None
+
+    def reload_if_changed(self) -> bool:
+        self._checked_at = time.monotonic()
+        version = self._subscriptions_version()
+        if version is None or version == self._loaded_version:
+            return False
+        # Read the version first so a write racing the load triggers another reload
+        self.index.load(self.subscriptions)
+        self._loaded_version = version
+        return True
+
+    def _run(self) -> None:
+        # Keeps going after stop() until the queue is drained
+        while not (self._stop.is_set() and self._queue.empty()):
+            if time.monotonic() - self._checked_at >= self.reload_seconds:
+                try:
+                    self.reload_if_changed()
+                except Exception:
+                    logger.exception("Subscription index reload failed")
+            try:
+                collection_name, document, queued_at = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.match_post(collection_name, document, queued_at)
+
+    def start(self) -> None:
+        # Loaded before listening, so a failed load leaves nothing registered;
+        # writes in between move the version and are picked up by the next reload
+        self._loaded_version = self._subscriptions_version()
+        self._checked_at = time.monotonic()
+        self.index.load(self.subscriptions)
+        add_write_listener(self._on_write)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="subscription-matcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        remove_write_listener(self._on_write)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self) -> Dict:
+        result = {
+            "subscriptions": len(self.index),
+            "queue_depth": self._queue.qsize(),
+            "posts_matched": self.posts_matched,
+            "posts_dropped": self.posts_dropped,
+            "subscribers_notified": self.subscribers_notified
+        }
+        for name, samples in (("match_ms", self._match_ms), ("lag_ms", self._lag_ms)):
+            ordered = sorted(samples)
+            if ordered:
+                result[name] = {
+                    "p50": _percentile(ordered, 0.5),
+                    "p95": _percentile(ordered, 0.95),
+                    "p99": _percentile(ordered, 0.99),
+                    "max": ordered[-1]
+                }
+        return result
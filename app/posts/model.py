@@ -1,7 +1,42 @@
+import logging
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.collection import Collection
 from bson import ObjectId
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Listeners called after every write that goes through the models, as
+# listener(collection_name, op, document) with op one of insert/update/delete
+_write_listeners: List[Callable[[str, str, Optional[Dict]], None]] = []
+
+def add_write_listener(listener: Callable[[str, str, Optional[Dict]], None]) -> None:
+    _write_listeners.append(listener)
+
+def remove_write_listener(listener: Callable[[str, str, Optional[Dict]], None]) -> None:
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+def notify_write(collection_name: str, op: str, document: Optional[Dict] = None) -> None:
+    for listener in _write_listeners:
+        try:
+            listener(collection_name, op, document)
+        except Exception:
+            # A failing listener must never fail the write itself
+            logger.exception("Write listener failed for %s", collection_name)
+
+def _naive_utc(value: datetime) -> datetime:
+    # MongoDB hands back naive UTC datetimes; keep computed dates comparable with them
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def compute_last_activity(update_dates: List[datetime], object_id: ObjectId) -> datetime:
+    # Latest update date, or the creation time for posts without updates
+    if update_dates:
+        return max(_naive_utc(date) for date in update_dates)
+    return _naive_utc(object_id.generation_time)
 
 # Nested class for City in states_and_cities
 class City:
@@ -48,20 +83,96 @@ class StatesAndCities:
         data = self.to_dict()
         # Convert id to ObjectId for MongoDB storage
         data["_id"] = ObjectId(self.id)
-        collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        result = collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        notify_write(collection.name, "insert" if result.upserted_id is not None else "update", data)
 
     @classmethod
     def find_by_id(cls, state_id: str, collection: Collection) -> Optional["StatesAndCities"]:
         data = collection.find_one({"_id": ObjectId(state_id)})
         return cls.from_dict(data) if data else None
 
+    @classmethod
+    def find_by_ids(cls, state_ids: List[str], collection: Collection) -> List["StatesAndCities"]:
+        object_ids = [ObjectId(state_id) for state_id in state_ids if ObjectId.is_valid(state_id)]
+        found = {str(data["_id"]): data for data in collection.find({"_id": {"$in": object_ids}})}
+        # Keep the requested order; unknown ids are skipped
+        return [cls.from_dict(found[state_id]) for state_id in state_ids if state_id in found]
+
     @classmethod
     def find_all(cls, collection: Collection) -> List["StatesAndCities"]:
         data = collection.find()
         return [cls.from_dict(state) for state in data]
 
+    # City operations: one round trip each, without rewriting the whole cities array
+    @classmethod
+    def _city_update(cls, query: Dict, update, collection: Collection) -> Optional["StatesAndCities"]:
+        data = collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+        if data is None:
+            return None
+        notify_write(collection.name, "update", data)
+        return cls.from_dict(data)
+
+    @classmethod
+    def add_city(cls, state_id: str, city: City, collection: Collection) -> Optional["StatesAndCities"]:
+        # None when the state is missing or already has a city with this id
+        return cls._city_update(
+            {"_id": ObjectId(state_id), "cities.city_id": {"$ne": city.city_id}},
+            {"$push": {"cities": city.to_dict()}},
+            collection
+        )
+
+    @classmethod
+    def update_city(cls, state_id: str, city_id: str, fields: Dict,
+                    collection: Collection) -> Optional["StatesAndCities"]:
+        # The positional $ targets the city matched by the cities.city_id filter
+        return cls._city_update(
+            {"_id": ObjectId(state_id), "cities.city_id": city_id},
+            {"$set": {f"cities.$.{key}": value for key, value in fields.items()}},
+            collection
+        )
+
+    @classmethod
+    def remove_city(cls, state_id: str, city_id: str, collection: Collection) -> Optional["StatesAndCities"]:
+        return cls._city_update(
+            {"_id": ObjectId(state_id), "cities.city_id": city_id},
+            {"$pull": {"cities": {"city_id": city_id}}},
+            collection
+        )
+
+    @classmethod
+    def import_cities(cls, state_id: str, cities: List[City],
+                      collection: Collection) -> Optional[Tuple["StatesAndCities", List[str]]]:
+        # Appends the cities whose ids the state doesn't have yet; returns the state and the added ids
+        incoming, seen = [], set()
+        for city in cities:
+            if city.city_id not in seen:
+                seen.add(city.city_id)
+                incoming.append(city.to_dict())
+        existing = {"$ifNull": ["$cities", []]}
+        data = collection.find_one_and_update(
+            {"_id": ObjectId(state_id)},
+            [{"$set": {"cities": {"$concatArrays": [existing, {"$filter": {
+                "input": {"$literal": incoming},
+                "as": "city",
+                "cond": {"$not": [{"$in": ["$$city.city_id", {"$map": {
+                    "input": existing, "as": "known", "in": "$$known.city_id"
+                }}]}]}
+            }}]}}}],
+            return_document=ReturnDocument.BEFORE
+        )
+        if data is None:
+            return None
+        # Same result the server computed, derived from the document before the update
+        known = {city["city_id"] for city in data.get("cities", [])}
+        added = [city for city in incoming if city["city_id"] not in known]
+        data["cities"] = data.get("cities", []) + added
+        notify_write(collection.name, "update", data)
+        return cls.from_dict(data), [city["city_id"] for city in added]
+
     def delete(self, collection: Collection) -> bool:
         result = collection.delete_one({"_id": ObjectId(self.id)})
+        if result.deleted_count:
+            notify_write(collection.name, "delete", {**self.to_dict(), "_id": ObjectId(self.id)})
         return result.deleted_count > 0
 
 # Model for sectors collection
@@ -89,13 +200,29 @@ class Sector:
     def save(self, collection: Collection) -> None:
         data = self.to_dict()
         data["_id"] = ObjectId(self.id)  # Convert to ObjectId for MongoDB
-        collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        result = collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        notify_write(collection.name, "insert" if result.upserted_id is not None else "update", data)
 
     @classmethod
     def find_by_id(cls, sector_id: str, collection: Collection) -> Optional["Sector"]:
         data = collection.find_one({"_id": ObjectId(sector_id)})
         return cls.from_dict(data) if data else None
 
+    @classmethod
+    def find_by_ids(cls, sector_ids: List[str], collection: Collection) -> List["Sector"]:
+        object_ids = [ObjectId(sector_id) for sector_id in sector_ids if ObjectId.is_valid(sector_id)]
+        found = {str(data["_id"]): data for data in collection.find({"_id": {"$in": object_ids}})}
+        # Keep the requested order; unknown ids are skipped
+        return [cls.from_dict(found[sector_id]) for sector_id in sector_ids if sector_id in found]
+
+    @classmethod
+    def find_names(cls, sector_ids: List[str], collection: Collection) -> Dict[str, str]:
+        object_ids = [ObjectId(sector_id) for sector_id in set(sector_ids) if ObjectId.is_valid(sector_id)]
+        return {
+            str(data["_id"]): data["name"]
+            for data in collection.find({"_id": {"$in": object_ids}}, {"name": 1})
+        }
+
     @classmethod
     def find_all(cls, collection: Collection) -> List["Sector"]:
         data = collection.find()
@@ -103,6 +230,8 @@ class Sector:
 
     def delete(self, collection: Collection) -> bool:
         result = collection.delete_one({"_id": ObjectId(self.id)})
+        if result.deleted_count:
+            notify_write(collection.name, "delete", {**self.to_dict(), "_id": ObjectId(self.id)})
         return result.deleted_count > 0
 
 # Nested classes for scheme_posts, gov_jobs_posts, and digital_services
@@ -145,11 +274,67 @@ class Update:
             note=data["note"]
         )
 
+# $push of new update notes, optionally kept sorted by date and capped to the latest entries
+def push_updates_operation(updates: List[Update], keep_last: Optional[int] = None,
+                           sort_by_date: bool = True) -> Dict:
+    push = {"$each": [update.to_dict() for update in updates]}
+    if sort_by_date:
+        push["$sort"] = {"date": 1}
+    if keep_last is not None:
+        push["$slice"] = -keep_last
+    return {
+        "$push": {"updates": push},
+        "$max": {"last_activity": max(_naive_utc(update.date) for update in updates)}
+    }
+
+def _push_updates_bulk(notes: Dict[str, List[Update]], collection: Collection,
+                       keep_last: Optional[int], sort_by_date: bool) -> Tuple[int, int, List[str]]:
+    # Malformed ids can't match a post, so they are only reported as missing
+    valid = [post_id for post_id in notes if ObjectId.is_valid(post_id)]
+    if not valid:
+        return 0, 0, list(notes)
+    requests = [
+        UpdateOne({"_id": ObjectId(post_id)}, push_updates_operation(notes[post_id], keep_last, sort_by_date))
+        for post_id in valid
+    ]
+    result = collection.bulk_write(requests, ordered=False)
+    found = set()
+    for data in collection.find({"_id": {"$in": [ObjectId(post_id) for post_id in valid]}}):
+        found.add(str(data["_id"]))
+        notify_write(collection.name, "update", data)
+    return result.matched_count, result.modified_count, [post_id for post_id in notes if post_id not in found]
+
+# Turns batch-validated post data (see schema.validate_batch) into documents
+# ready for insert_many, mirroring what the models' to_mongo() produces
+def prepare_post_documents(items: List[Dict], sector_names: Optional[Dict[str, str]] = None) -> List[Dict]:
+    documents = []
+    for item in items:
+        document = {"_id": ObjectId(), **item}
+        if sector_names is not None:
+            document["sector_name"] = sector_names.get(document["sector_id"])
+        for required_document in document["required_documents"]:
+            required_document.setdefault("type", None)
+            required_document.setdefault("description", None)
+        document["last_activity"] = compute_last_activity(
+            [update["date"] for update in document["updates"]], document["_id"]
+        )
+        documents.append(document)
+    return documents
+
+def insert_post_documents(documents: List[Dict], collection: Collection) -> List[str]:
+    if not documents:
+        return []
+    collection.insert_many(documents, ordered=False)
+    for document in documents:
+        notify_write(collection.name, "insert", document)
+    return [str(document["_id"]) for document in documents]
+
 # Model for scheme_posts collection
 class SchemePost:
     def __init__(self, title: str, start_date: datetime, end_date: datetime, description: str,
                  required_documents: List[Document], states: List[str], cities: List[str],
-                 updates: List[Update], sector_id: str, id: Optional[str] = None):
+                 updates: List[Update], sector_id: str, id: Optional[str] = None,
+                 sector_name: Optional[str] = None):
         self.id = id if id else str(ObjectId())
         self.title = title
         self.start_date = start_date
@@ -160,6 +345,7 @@ class SchemePost:
         self.cities = cities
         self.updates = updates
         self.sector_id = sector_id
+        self.sector_name = sector_name  # Denormalized copy of the sector's name
 
     def to_dict(self) -> Dict:
         return {
@@ -172,7 +358,8 @@ class SchemePost:
             "states": self.states,
             "cities": self.cities,
             "updates": [update.to_dict() for update in self.updates],
-            "sector_id": self.sector_id  # Keep sector_id as string
+            "sector_id": self.sector_id,  # Keep sector_id as string
+            "sector_name": self.sector_name
         }
 
     @classmethod
@@ -187,19 +374,55 @@ class SchemePost:
             states=data["states"],
             cities=data["cities"],
             updates=[Update.from_dict(update) for update in data["updates"]],
-            sector_id=str(data["sector_id"])
+            sector_id=str(data["sector_id"]),
+            sector_name=data.get("sector_name")
         )
 
-    def save(self, collection: Collection) -> None:
+    def last_activity(self) -> datetime:
+        return compute_last_activity([update.date for update in self.updates], ObjectId(self.id))
+
+    def to_mongo(self) -> Dict:
         data = self.to_dict()
         data["_id"] = ObjectId(self.id)  # Convert to ObjectId for MongoDB
-        collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        data["last_activity"] = self.last_activity()  # Sort key for the feed
+        return data
+
+    def save(self, collection: Collection) -> None:
+        data = self.to_mongo()
+        result = collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        notify_write(collection.name, "insert" if result.upserted_id is not None else "update", data)
 
     @classmethod
     def find_by_id(cls, post_id: str, collection: Collection) -> Optional["SchemePost"]:
         data = collection.find_one({"_id": ObjectId(post_id)})
         return cls.from_dict(data) if data else None
 
+    @classmethod
+    def push_updates(cls, post_id: str, updates: List[Update], collection: Collection,
+                     keep_last: Optional[int] = None, sort_by_date: bool = True) -> Optional["SchemePost"]:
+        # Appends notes in one round trip instead of rewriting the whole document
+        data = collection.find_one_and_update(
+            {"_id": ObjectId(post_id)},
+            push_updates_operation(updates, keep_last, sort_by_date),
+            return_document=ReturnDocument.AFTER
+        )
+        if not data:
+            return None
+        notify_write(collection.name, "update", data)
+        return cls.from_dict(data)
+
+    @classmethod
+    def push_updates_bulk(cls, notes: Dict[str, List[Update]], collection: Collection,
+                          keep_last: Optional[int] = None, sort_by_date: bool = True) -> Tuple[int, int, List[str]]:
+        return _push_updates_bulk(notes, collection, keep_last, sort_by_date)
+
+    @classmethod
+    def find_by_ids(cls, post_ids: List[str], collection: Collection) -> List["SchemePost"]:
+        object_ids = [ObjectId(post_id) for post_id in post_ids if ObjectId.is_valid(post_id)]
+        found = {str(data["_id"]): data for data in collection.find({"_id": {"$in": object_ids}})}
+        # Keep the requested order; unknown ids are skipped
+        return [cls.from_dict(found[post_id]) for post_id in post_ids if post_id in found]
+
     @classmethod
     def find_all(cls, collection: Collection) -> List["SchemePost"]:
         data = collection.find()
@@ -207,13 +430,16 @@ class SchemePost:
 
     def delete(self, collection: Collection) -> bool:
         result = collection.delete_one({"_id": ObjectId(self.id)})
+        if result.deleted_count:
+            notify_write(collection.name, "delete", {**self.to_dict(), "_id": ObjectId(self.id)})
         return result.deleted_count > 0
 
 # Model for gov_jobs_posts collection
 class GovJobPost:
     def __init__(self, title: str, start_date: datetime, end_date: datetime, description: str,
                  required_documents: List[Document], states: List[str], cities: List[str],
-                 updates: List[Update], sector_id: str, id: Optional[str] = None):
+                 updates: List[Update], sector_id: str, id: Optional[str] = None,
+                 sector_name: Optional[str] = None):
         self.id = id if id else str(ObjectId())
         self.title = title
         self.start_date = start_date
@@ -224,6 +450,7 @@ class GovJobPost:
         self.cities = cities
         self.updates = updates
         self.sector_id = sector_id
+        self.sector_name = sector_name  # Denormalized copy of the sector's name
 
     def to_dict(self) -> Dict:
         return {
@@ -236,7 +463,8 @@ class GovJobPost:
             "states": self.states,
             "cities": self.cities,
             "updates": [update.to_dict() for update in self.updates],
-            "sector_id": self.sector_id  # Keep sector_id as string
+            "sector_id": self.sector_id,  # Keep sector_id as string
+            "sector_name": self.sector_name
         }
 
     @classmethod
@@ -251,19 +479,55 @@ class GovJobPost:
             states=data["states"],
             cities=data["cities"],
             updates=[Update.from_dict(update) for update in data["updates"]],
-            sector_id=str(data["sector_id"])
+            sector_id=str(data["sector_id"]),
+            sector_name=data.get("sector_name")
         )
 
-    def save(self, collection: Collection) -> None:
+    def last_activity(self) -> datetime:
+        return compute_last_activity([update.date for update in self.updates], ObjectId(self.id))
+
+    def to_mongo(self) -> Dict:
         data = self.to_dict()
         data["_id"] = ObjectId(self.id)  # Convert to ObjectId for MongoDB
-        collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        data["last_activity"] = self.last_activity()  # Sort key for the feed
+        return data
+
+    def save(self, collection: Collection) -> None:
+        data = self.to_mongo()
+        result = collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        notify_write(collection.name, "insert" if result.upserted_id is not None else "update", data)
 
     @classmethod
     def find_by_id(cls, post_id: str, collection: Collection) -> Optional["GovJobPost"]:
         data = collection.find_one({"_id": ObjectId(post_id)})
         return cls.from_dict(data) if data else None
 
+    @classmethod
+    def push_updates(cls, post_id: str, updates: List[Update], collection: Collection,
+                     keep_last: Optional[int] = None, sort_by_date: bool = True) -> Optional["GovJobPost"]:
+        # Appends notes in one round trip instead of rewriting the whole document
+        data = collection.find_one_and_update(
+            {"_id": ObjectId(post_id)},
+            push_updates_operation(updates, keep_last, sort_by_date),
+            return_document=ReturnDocument.AFTER
+        )
+        if not data:
+            return None
+        notify_write(collection.name, "update", data)
+        return cls.from_dict(data)
+
+    @classmethod
+    def push_updates_bulk(cls, notes: Dict[str, List[Update]], collection: Collection,
+                          keep_last: Optional[int] = None, sort_by_date: bool = True) -> Tuple[int, int, List[str]]:
+        return _push_updates_bulk(notes, collection, keep_last, sort_by_date)
+
+    @classmethod
+    def find_by_ids(cls, post_ids: List[str], collection: Collection) -> List["GovJobPost"]:
+        object_ids = [ObjectId(post_id) for post_id in post_ids if ObjectId.is_valid(post_id)]
+        found = {str(data["_id"]): data for data in collection.find({"_id": {"$in": object_ids}})}
+        # Keep the requested order; unknown ids are skipped
+        return [cls.from_dict(found[post_id]) for post_id in post_ids if post_id in found]
+
     @classmethod
     def find_all(cls, collection: Collection) -> List["GovJobPost"]:
         data = collection.find()
@@ -271,6 +535,8 @@ class GovJobPost:
 
     def delete(self, collection: Collection) -> bool:
         result = collection.delete_one({"_id": ObjectId(self.id)})
+        if result.deleted_count:
+            notify_write(collection.name, "delete", {**self.to_dict(), "_id": ObjectId(self.id)})
         return result.deleted_count > 0
 
 # Model for digital_services collection
@@ -308,16 +574,51 @@ class DigitalService:
             cities=data["cities"]
         )
 
-    def save(self, collection: Collection) -> None:
+    def last_activity(self) -> datetime:
+        return compute_last_activity([update.date for update in self.updates], ObjectId(self.id))
+
+    def to_mongo(self) -> Dict:
         data = self.to_dict()
         data["_id"] = ObjectId(self.id)  # Convert to ObjectId for MongoDB
-        collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        data["last_activity"] = self.last_activity()  # Sort key for the feed
+        return data
+
+    def save(self, collection: Collection) -> None:
+        data = self.to_mongo()
+        result = collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        notify_write(collection.name, "insert" if result.upserted_id is not None else "update", data)
 
     @classmethod
     def find_by_id(cls, service_id: str, collection: Collection) -> Optional["DigitalService"]:
         data = collection.find_one({"_id": ObjectId(service_id)})
         return cls.from_dict(data) if data else None
 
+    @classmethod
+    def push_updates(cls, service_id: str, updates: List[Update], collection: Collection,
+                     keep_last: Optional[int] = None, sort_by_date: bool = True) -> Optional["DigitalService"]:
+        # Appends notes in one round trip instead of rewriting the whole document
+        data = collection.find_one_and_update(
+            {"_id": ObjectId(service_id)},
+            push_updates_operation(updates, keep_last, sort_by_date),
+            return_document=ReturnDocument.AFTER
+        )
+        if not data:
+            return None
+        notify_write(collection.name, "update", data)
+        return cls.from_dict(data)
+
+    @classmethod
+    def push_updates_bulk(cls, notes: Dict[str, List[Update]], collection: Collection,
+                          keep_last: Optional[int] = None, sort_by_date: bool = True) -> Tuple[int, int, List[str]]:
+        return _push_updates_bulk(notes, collection, keep_last, sort_by_date)
+
+    @classmethod
+    def find_by_ids(cls, service_ids: List[str], collection: Collection) -> List["DigitalService"]:
+        object_ids = [ObjectId(service_id) for service_id in service_ids if ObjectId.is_valid(service_id)]
+        found = {str(data["_id"]): data for data in collection.find({"_id": {"$in": object_ids}})}
+        # Keep the requested order; unknown ids are skipped
+        return [cls.from_dict(found[service_id]) for service_id in service_ids if service_id in found]
+
     @classmethod
     def find_all(cls, collection: Collection) -> List["DigitalService"]:
         data = collection.find()
@@ -325,4 +626,63 @@ class DigitalService:
 
     def delete(self, collection: Collection) -> bool:
         result = collection.delete_one({"_id": ObjectId(self.id)})
-        return result.deleted_count > 0
\ No newline at end of file
+        if result.deleted_count:
+            notify_write(collection.name, "delete", {**self.to_dict(), "_id": ObjectId(self.id)})
+        return result.deleted_count > 0
+
+# Model for subscriptions collection: a user's saved alert preferences.
+# Empty lists mean "any"; documents lists what the user already holds.
+class Subscription:
+    def __init__(self, subscriber_id: str, states: List[str], cities: List[str], sector_ids: List[str],
+                 documents: List[str], resources: List[str], id: Optional[str] = None):
+        self.id = id if id else str(ObjectId())
+        self.subscriber_id = subscriber_id
+        self.states = states
+        self.cities = cities
+        self.sector_ids = sector_ids
+        self.documents = documents
+        self.resources = resources
+
+    def to_dict(self) -> Dict:
+        return {
+            "_id": self.id,
+            "subscriber_id": self.subscriber_id,
+            "states": self.states,
+            "cities": self.cities,
+            "sector_ids": self.sector_ids,
+            "documents": self.documents,
+            "resources": self.resources
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Subscription":
+        return cls(
+            id=str(data["_id"]),
+            subscriber_id=data["subscriber_id"],
+            states=data.get("states", []),
+            cities=data.get("cities", []),
+            sector_ids=data.get("sector_ids", []),
+            documents=data.get("documents", []),
+            resources=data.get("resources", [])
+        )
+
+    def save(self, collection: Collection) -> None:
+        data = self.to_dict()
+        data["_id"] = ObjectId(self.id)
+        result = collection.replace_one({"_id": data["_id"]}, data, upsert=True)
+        notify_write(collection.name, "insert" if result.upserted_id is not None else "update", data)
+
+    @classmethod
+    def find_by_id(cls, subscription_id: str, collection: Collection) -> Optional["Subscription"]:
+        data = collection.find_one({"_id": ObjectId(subscription_id)})
+        return cls.from_dict(data) if data else None
+
+    @classmethod
+    def find_by_subscriber(cls, subscriber_id: str, collection: Collection) -> List["Subscription"]:
+        return [cls.from_dict(data) for data in collection.find({"subscriber_id": subscriber_id})]
+
+    def delete(self, collection: Collection) -> bool:
+        result = collection.delete_one({"_id": ObjectId(self.id)})
+        if result.deleted_count:
+            notify_write(collection.name, "delete", {**self.to_dict(), "_id": ObjectId(self.id)})
+        return result.deleted_count > 0
@@ -0,0 +1,235 @@
+# Query-plan regression harness.
+#
+# Seeds a scratch database on a local mongod, creates the app's indexes and
+# runs explain("executionStats") for every query shape the models and post
+# services issue. A shape fails when its winning plan scans the collection
+# or examines too many keys/documents per returned document.
+#
+#   python -m app.posts.query_plans --uri mongodb://localhost:27017 --report plans.md
+#
+# Unfiltered listings (find_all, the facet aggregations) read whole
+# collections by design and are not part of the harness.
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.database import Database
+from .archive import expired_filter
+from .bundles import BUNDLE_SECTIONS, build_bundle, open_posts_filter
+from .feed import FEED_SORT, feed_filter
+from .indexes import ensure_indexes
+from .sector_fanout import stale_sector_name_filter
+from .model import SchemePost, GovJobPost, DigitalService, Document, Subscription, Update
+
+INDEX_STAGES = {"IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_CLUSTERED_IXSCAN", "COUNT_SCAN", "DISTINCT_SCAN"}
+
+DEFAULT_MAX_DOCS_RATIO = 2.0
+DEFAULT_MAX_KEYS_RATIO = 3.0
+
+# A query the app issues, built against the seeded database so filters refer to real values
+class QueryShape:
+    def __init__(self, name: str, collection: str,
+                 build: Callable[[Database], Tuple[Dict, Optional[List], Optional[int]]],
+                 max_docs_ratio: float = DEFAULT_MAX_DOCS_RATIO,
+                 max_keys_ratio: float = DEFAULT_MAX_KEYS_RATIO):
+        self.name = name
+        self.collection = collection
+        self.build = build
+        self.max_docs_ratio = max_docs_ratio
+        self.max_keys_ratio = max_keys_ratio
+
+def _sample_ids(db: Database, collection: str, count: int) -> List[ObjectId]:
+    return [doc["_id"] for doc in db[collection].find({}, {"_id": 1}).limit(count)]
+
+def _by_id(collection: str) -> Callable:
+    return lambda db: ({"_id": _sample_ids(db, collection, 1)[0]}, None, 1)
+
+def _by_ids(collection: str) -> Callable:
+    return lambda db: ({"_id": {"$in": _sample_ids(db, collection, 20)}}, None, None)
+
+def _feed_page(collection: str, page: int) -> Callable:
+    def build(db: Database):
+        after = None
+        if page:
+            middle = db[collection].find({}, {"last_activity": 1}).sort(FEED_SORT).skip(page * 20).limit(1).next()
+            after = (middle["last_activity"], middle["_id"])
+        return feed_filter(after), FEED_SORT, 21
+    return build
+
+def _expired(collection: str) -> Callable:
+    return lambda db: (expired_filter(datetime.utcnow() - timedelta(days=90)), [("end_date", 1)], 500)
+
+def _stale_sector_name(collection: str) -> Callable:
+    def build(db: Database):
+        sector_id = db[collection].find_one({}, {"sector_id": 1})["sector_id"]
+        return stale_sector_name_filter(sector_id, "Renamed sector"), None, 1000
+    return build
+
+def _state_bundle(collection: str) -> Callable:
+    def build(db: Database):
+        state = db[collection].find_one({}, {"states": 1})["states"][0]
+        query = open_posts_filter(state, datetime.utcnow(), collection != "digital_services")
+        return query, [("last_activity", -1)], 500
+    return build
+
+def _missing(query: Dict) -> Callable:
+    return lambda db: (query, None, None)
+
+def _by_subscriber(db: Database):
+    subscriber_id = db["subscriptions"].find_one({}, {"subscriber_id": 1})["subscriber_id"]
+    return {"subscriber_id": subscriber_id}, None, None
+
+def _bundles_listing(collection: str) -> Callable:
+    return lambda db: ({"post_ids": {"$in": _sample_ids(db, collection, 20)}}, None, None)
+
+QUERY_SHAPES: List[QueryShape] = []
+for _name in ("scheme_posts", "gov_jobs_posts", "digital_services"):
+    QUERY_SHAPES += [
+        QueryShape(f"{_name}.find_by_id", _name, _by_id(_name)),
+        QueryShape(f"{_name}.find_by_ids", _name, _by_ids(_name)),
+        QueryShape(f"{_name}.feed_first_page", _name, _feed_page(_name, 0)),
+        QueryShape(f"{_name}.feed_next_page", _name, _feed_page(_name, 3)),
+        # Closed posts are skipped inside the index, so allow more keys per returned post
+        QueryShape(f"{_name}.state_bundle", _name, _state_bundle(_name), max_keys_ratio=10.0),
+        QueryShape(f"{_name}.backfill_last_activity", _name, _missing({"last_activity": {"$exists": False}})),
+        # A post is listed in the bundle of each of its states
+        QueryShape(f"state_bundles.listing_{_name}", "state_bundles", _bundles_listing(_name), max_keys_ratio=5.0)
+    ]
+for _name in ("scheme_posts", "gov_jobs_posts"):
+    QUERY_SHAPES += [
+        QueryShape(f"{_name}.archive_expired", _name, _expired(_name)),
+        QueryShape(f"{_name}.sector_fanout", _name, _stale_sector_name(_name)),
+        QueryShape(f"{_name}.backfill_sector_name", _name, _missing({"sector_name": None}))
+    ]
+QUERY_SHAPES.append(QueryShape("subscriptions.find_by_subscriber", "subscriptions", _by_subscriber))
+
+def seed(db: Database, count: int, seed_value: int = 0) -> None:
+    rng = random.Random(seed_value)
+    states = [f"State {i}" for i in range(30)]
+    sectors = {str(ObjectId()): f"Sector {i}" for i in range(20)}
+    now = datetime.utcnow()
+    for name, model in (("scheme_posts", SchemePost), ("gov_jobs_posts", GovJobPost),
+                        ("digital_services", DigitalService)):
+        documents = []
+        for i in range(count):
+            start = now - timedelta(days=rng.randint(0, 720))
+            updates = [Update(start + timedelta(days=d), f"Update {d}") for d in range(rng.randint(0, 4))]
+            fields = dict(
+                title=f"{name} {i}", description="Seeded for query plan checks",
+                required_documents=[Document("Aadhaar Card", "ID")],
+                states=rng.sample(states, rng.randint(1, 3)), cities=[], updates=updates
+            )
+            if model is DigitalService:
+                post = model(**fields)
+            else:
+                sector_id = rng.choice(list(sectors))
+                post = model(start_date=start, end_date=start + timedelta(days=rng.randint(10, 365)),
+                             sector_id=sector_id, sector_name=sectors[sector_id], **fields)
+            documents.append(post.to_mongo())
+        db[name].insert_many(documents)
+    subscriptions = [Subscription(f"user-{i // 3}", states=rng.sample(states, 2), cities=[], sector_ids=[],
+                                  documents=[], resources=[]) for i in range(count)]
+    db["subscriptions"].insert_many([{**subscription.to_dict(), "_id": ObjectId(subscription.id)}
+                                     for subscription in subscriptions])
+    sources = {name: db[name] for name in BUNDLE_SECTIONS.values()}
+    db["state_bundles"].insert_many([build_bundle(state, sources, now) for state in states])
+
+def _stages(plan: Dict) -> List[str]:
+    stages = [plan.get("stage", "")]
+    if "inputStage" in plan:
+        stages += _stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _stages(child)
+    return stages
+
+def explain_shape(db: Database, shape: QueryShape) -> Dict:
+    query_filter, sort, limit = shape.build(db)
+    command = {"find": shape.collection, "filter": query_filter}
+    if sort:
+        command["sort"] = dict(sort)
+    if limit:
+        command["limit"] = limit
+    explain = db.command("explain", command, verbosity="executionStats")
+
+    winning = explain["queryPlanner"]["winningPlan"]
+    stages = _stages(winning.get("queryPlan", winning))  # SBE wraps the tree in queryPlan
+    stats = explain["executionStats"]
+    returned = stats["nReturned"]
+    docs_ratio = stats["totalDocsExamined"] / max(returned, 1)
+    keys_ratio = stats["totalKeysExamined"] / max(returned, 1)
+
+    problems = []
+    if "COLLSCAN" in stages or not INDEX_STAGES.intersection(stages):
+        problems.append("not an index scan")
+    if docs_ratio > shape.max_docs_ratio:
+        problems.append(f"docs examined/returned {docs_ratio:.2f} > {shape.max_docs_ratio}")
+    if keys_ratio > shape.max_keys_ratio:
+        problems.append(f"keys examined/returned {keys_ratio:.2f} > {shape.max_keys_ratio}")
+    return {
+        "shape": shape.name,
+        "collection": shape.collection,
+        "stages": stages,
+        "returned": returned,
+        "keys_examined": stats["totalKeysExamined"],
+        "docs_examined": stats["totalDocsExamined"],
+        "docs_ratio": round(docs_ratio, 2),
+        "keys_ratio": round(keys_ratio, 2),
+        "time_ms": stats["executionTimeMillis"],
+        "passed": not problems,
+        "problems": problems
+    }
+
+def run(db: Database, shapes: List[QueryShape] = QUERY_SHAPES) -> List[Dict]:
+    return [explain_shape(db, shape) for shape in shapes]
+
+def to_markdown(results: List[Dict]) -> str:
+    lines = [
+        "| shape | plan | returned | keys | docs | time (ms) | result |",
+        "| --- | --- | --- | --- | --- | --- | --- |"
+    ]
+    for r in results:
+        outcome = "ok" if r["passed"] else "FAIL: " + "; ".join(r["problems"])
+        lines.append(f"| {r['shape']} | {' > '.join(r['stages'])} | {r['returned']} | "
+                     f"{r['keys_examined']} | {r['docs_examined']} | {r['time_ms']} | {outcome} |")
+    return "\n".join(lines) + "\n"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that every app query shape uses an index")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="ccos_scrapesarthi_query_plans", help="scratch database, dropped first")
+    parser.add_argument("--docs", type=int, default=2000, help="documents seeded per collection")
+    parser.add_argument("--max-docs-ratio", type=float)
+    parser.add_argument("--max-keys-ratio", type=float)
+    parser.add_argument("--report", help="write the results to this file (.json or .md)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database afterwards")
+    args = parser.parse_args(argv)
+
+    for shape in QUERY_SHAPES:
+        shape.max_docs_ratio = args.max_docs_ratio or shape.max_docs_ratio
+        shape.max_keys_ratio = args.max_keys_ratio or shape.max_keys_ratio
+
+    client = MongoClient(args.uri)
+    client.drop_database(args.db)
+    db = client[args.db]
+    try:
+        seed(db, args.docs)
+        ensure_indexes(db)
+        results = run(db)
+    finally:
+        if not args.keep:
+            client.drop_database(args.db)
+        client.close()
+
+    report = to_markdown(results)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(json.dumps(results, indent=2) if args.report.endswith(".json") else report)
+    return 0 if all(r["passed"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from typing import Any, Dict, List, Optional, Tuple
+from typing_extensions import NotRequired, TypedDict
 from datetime import datetime
 from bson import ObjectId
 
@@ -62,6 +63,20 @@ class StatesAndCitiesUpdate(BaseModel):
     name: Optional[str] = None
     cities: Optional[List[CityBase]] = None
 
+class CityCreate(BaseModel):
+    name: str
+
+class CityUpdate(BaseModel):
+    name: Optional[str] = None
+
+class CityImport(BaseModel):
+    cities: List[CityBase]
+
+class CityImportResponse(BaseModel):
+    state: StatesAndCitiesResponse
+    added: List[str]
+    skipped: List[str]
+
 # Nested schemas for scheme_posts, gov_jobs_posts, digital_services
 class DocumentBase(BaseModel):
     name: str
@@ -161,6 +176,7 @@ class SchemePostResponse(BaseModel):
     cities: List[str]
     updates: List[UpdateBase]
     sector_id: str
+    sector_name: Optional[str] = None
 
     class Config:
         allow_population_by_field_name = True
@@ -220,6 +236,7 @@ class GovJobPostResponse(BaseModel):
     cities: List[str]
     updates: List[UpdateBase]
     sector_id: str
+    sector_name: Optional[str] = None
 
     class Config:
         allow_population_by_field_name = True
@@ -281,4 +298,272 @@ class DigitalServiceUpdate(BaseModel):
     required_documents: Optional[List[DocumentBase]] = None
     updates: Optional[List[UpdateBase]] = None
     states: Optional[List[str]] = None
-    cities: Optional[List[str]] = None
\ No newline at end of file
+    cities: Optional[List[str]] = None
+
+# Schemas for stats
+class FacetCount(BaseModel):
+    key: Optional[str] = None
+    count: int
+
+class CollectionFacets(BaseModel):
+    by_state: List[FacetCount]
+    by_sector: List[FacetCount]
+    by_status: List[FacetCount]
+
+class FacetStatsResponse(BaseModel):
+    scheme_posts: CollectionFacets
+    gov_jobs_posts: CollectionFacets
+    digital_services: CollectionFacets
+
+# Schemas for batch get-by-ids
+class BatchGetRequest(BaseModel):
+    ids: List[str]
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "ids": ["60d5f7c9b1d5e9b4a8f9a2b3", "60d5f7c9b1d5e9b4a8f9a2b4"]
+        }
+    })
+
+class StatesAndCitiesBatchResponse(BaseModel):
+    items: List[StatesAndCitiesResponse]
+    missing: List[str]
+
+class SectorBatchResponse(BaseModel):
+    items: List[SectorResponse]
+    missing: List[str]
+
+class SchemePostBatchResponse(BaseModel):
+    items: List[SchemePostResponse]
+    missing: List[str]
+
+class GovJobPostBatchResponse(BaseModel):
+    items: List[GovJobPostResponse]
+    missing: List[str]
+
+class DigitalServiceBatchResponse(BaseModel):
+    items: List[DigitalServiceResponse]
+    missing: List[str]
+
+# Schemas for the cross-collection feed
+class FeedItem(BaseModel):
+    resource: str
+    id: str
+    title: str
+    description: str
+    states: List[str]
+    cities: List[str]
+    sector_id: Optional[str] = None
+    sector_name: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    last_activity: datetime
+
+class FeedResponse(BaseModel):
+    items: List[FeedItem]
+    next_cursor: Optional[str] = None
+
+# Schemas for materialized per-state bundles
+class BundleItem(BaseModel):
+    id: str
+    title: str
+    cities: List[str]
+    sector_id: Optional[str] = None
+    sector_name: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    last_activity: datetime
+
+class BundleCounts(BaseModel):
+    schemes: int
+    jobs: int
+    services: int
+
+class StateBundleResponse(BaseModel):
+    state: str
+    schemes: List[BundleItem]
+    jobs: List[BundleItem]
+    services: List[BundleItem]
+    counts: BundleCounts
+    valid_until: Optional[datetime] = None
+    built_at: datetime
+
+# Schemas for alert subscriptions
+class SubscriptionCreate(BaseModel):
+    subscriber_id: str
+    states: List[str] = []
+    cities: List[str] = []
+    sector_ids: List[str] = []
+    documents: List[str] = []
+    resources: List[str] = []
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "subscriber_id": "user-1024",
+            "states": ["Maharashtra"],
+            "cities": ["Pune"],
+            "sector_ids": ["60d5ec49f8d2e30b8c8b4567"],
+            "documents": ["Aadhaar Card", "PAN Card"],
+            "resources": ["scheme-posts"]
+        }
+    })
+
+class SubscriptionResponse(BaseModel):
+    id: str = Field(..., alias="_id")
+    subscriber_id: str
+    states: List[str]
+    cities: List[str]
+    sector_ids: List[str]
+    documents: List[str]
+    resources: List[str]
+
+    model_config = ConfigDict(populate_by_name=True, json_encoders={ObjectId: str})
+
+class SubscriptionUpdate(BaseModel):
+    states: Optional[List[str]] = None
+    cities: Optional[List[str]] = None
+    sector_ids: Optional[List[str]] = None
+    documents: Optional[List[str]] = None
+    resources: Optional[List[str]] = None
+
+# Schemas for document eligibility
+class EligibilityRequest(BaseModel):
+    documents: List[str]
+    state: Optional[str] = None
+    sector_id: Optional[str] = None
+    resources: List[str] = []
+    limit: int = Field(100, ge=1, le=1000)
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "documents": ["Aadhaar Card", "PAN Card", "Resume"],
+            "state": "Karnataka",
+            "resources": ["scheme-posts", "gov-jobs-posts"]
+        }
+    })
+
+class EligibilityItem(BaseModel):
+    resource: str
+    id: str
+    title: str
+    required_documents: List[str]
+    states: List[str]
+    cities: List[str]
+    sector_id: Optional[str] = None
+    sector_name: Optional[str] = None
+    end_date: Optional[datetime] = None
+    last_activity: Optional[datetime] = None
+
+class EligibilityResponse(BaseModel):
+    items: List[EligibilityItem]
+    total: int
+
+# Schemas for appending update notes
+class PostUpdatesPush(BaseModel):
+    updates: List[UpdateBase]
+    keep_last: Optional[int] = Field(None, ge=1)
+    sort_by_date: bool = True
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "updates": [
+                {"date": "2025-02-15T00:00:00", "note": "Exam schedule released"}
+            ],
+            "keep_last": 50
+        }
+    })
+
+class PostUpdateNote(UpdateBase):
+    post_id: str
+
+class PostUpdatesBulkPush(BaseModel):
+    notes: List[PostUpdateNote]
+    keep_last: Optional[int] = Field(None, ge=1)
+    sort_by_date: bool = True
+
+class PostUpdatesBulkResponse(BaseModel):
+    matched: int
+    modified: int
+    missing: List[str]
+
+# Schemas for write-behind ingestion
+class IngestTicket(BaseModel):
+    ticket_id: str
+    resource: str
+    id: str
+    status: str
+    error: Optional[str] = None
+
+# Batch validation for bulk payloads: the whole list is validated by one
+# compiled TypeAdapter into plain dicts, without building model objects
+class DocumentData(TypedDict):
+    name: str
+    type: NotRequired[Optional[str]]
+    description: NotRequired[Optional[str]]
+
+class UpdateData(TypedDict):
+    date: datetime
+    note: str
+
+class SchemePostData(TypedDict):
+    title: str
+    start_date: datetime
+    end_date: datetime
+    description: str
+    required_documents: List[DocumentData]
+    states: List[str]
+    cities: List[str]
+    updates: List[UpdateData]
+    sector_id: str
+
+class GovJobPostData(SchemePostData):
+    pass
+
+class DigitalServiceData(TypedDict):
+    title: str
+    description: str
+    required_documents: List[DocumentData]
+    updates: List[UpdateData]
+    states: List[str]
+    cities: List[str]
+
+scheme_post_batch_validator = TypeAdapter(List[SchemePostData])
+gov_job_post_batch_validator = TypeAdapter(List[GovJobPostData])
+digital_service_batch_validator = TypeAdapter(List[DigitalServiceData])
+
+def validate_batch(validator: TypeAdapter, items: List[Any]) -> Tuple[List[Tuple[int, Dict]], List[Dict]]:
+    # Returns (index, data) for valid items and the errors of every invalid one
+    try:
+        return list(enumerate(validator.validate_python(items))), []
+    except ValidationError as exc:
+        errors: Dict[int, List[Dict]] = {}
+        for error in exc.errors(include_url=False):
+            index, loc = error["loc"][0], error["loc"][1:]
+            errors.setdefault(index, []).append({"loc": list(loc), "msg": error["msg"], "type": error["type"]})
+
+    valid_indices = [index for index in range(len(items)) if index not in errors]
+    valid = validator.validate_python([items[index] for index in valid_indices])
+    return (
+        list(zip(valid_indices, valid)),
+        [{"index": index, "errors": item_errors} for index, item_errors in sorted(errors.items())]
+    )
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+class BulkCreateResponse(BaseModel):
+    inserted_ids: List[str]
+    errors: List[BulkItemError]
+
+# Schemas for sector name fan-out jobs
+class SectorFanoutJob(BaseModel):
+    job_id: str
+    sector_id: str
+    sector_name: str
+    status: str
+    total: Optional[int] = None
+    updated: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
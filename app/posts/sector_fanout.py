@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import uuid4
+from pymongo.collection import Collection
+from app.config import SECTOR_FANOUT_BATCH_SIZE, SECTOR_FANOUT_JOB_RETENTION
+from .model import Sector, notify_write
+
+logger = logging.getLogger(__name__)
+
+def stale_sector_name_filter(sector_id: str, sector_name: str) -> Dict:
+    return {"sector_id": sector_id, "sector_name": {"$ne": sector_name}}
+
+def backfill_sector_name(collection: Collection, sectors: Collection) -> int:
+    # Posts written before sector_name was copied onto them get their sector's current name
+    sector_ids = [sector_id for sector_id in collection.distinct("sector_id", {"sector_name": None}) if sector_id]
+    if not sector_ids:
+        return 0
+    modified = 0
+    for sector_id, sector_name in Sector.find_names(sector_ids, sectors).items():
+        result = collection.update_many({"sector_id": sector_id, "sector_name": None},
+                                        {"$set": {"sector_name": sector_name}})
+        modified += result.modified_count
+    if modified:
+        notify_write(collection.name, "update")
+    return modified
+
+# Refreshes the sector_name copied onto posts after a sector is renamed.
+# Jobs run one at a time, so consecutive renames are applied in order.
+class SectorFanout:
+    def __init__(self, batch_size: int = SECTOR_FANOUT_BATCH_SIZE,
+                 job_retention: int = SECTOR_FANOUT_JOB_RETENTION):
+        self.batch_size = batch_size
+        self.job_retention = job_retention
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sector-fanout")
+
+    def start(self, sector_id: str, sector_name: str, collections: List[Collection]) -> Dict:
+        job = {
+            "job_id": uuid4().hex,
+            "sector_id": sector_id,
+            "sector_name": sector_name,
+            "status": "pending",
+            "total": None,
+            "updated": 0,
+            "started_at": None,
+            "finished_at": None,
+            "error": None
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            while len(self._jobs) > self.job_retention:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, collections)
+        return dict(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self) -> List[Dict]:
+        with self._lock:
+            return [dict(job) for job in reversed(self._jobs.values())]
+
+    def _run(self, job: Dict, collections: List[Collection]) -> None:
+        query = stale_sector_name_filter(job["sector_id"], job["sector_name"])
+        job["status"] = "running"
+        job["started_at"] = datetime.utcnow()
+        try:
+            job["total"] = sum(collection.count_documents(query) for collection in collections)
+            for collection in collections:
+                while True:
+                    ids = [doc["_id"] for doc in collection.find(query, {"_id": 1}).limit(self.batch_size)]
+                    if not ids:
+                        break
+                    result = collection.update_many({"_id": {"$in": ids}}, {"$set": {"sector_name": job["sector_name"]}})
+                    job["updated"] += result.modified_count
+                    # Which posts changed isn't tracked per document; a bulk update carries none
+                    notify_write(collection.name, "update")
+            job["status"] = "done"
+        except Exception as exc:
+            logger.exception("Sector name fan-out for %s failed", job["sector_id"])
+            job["status"] = "failed"
+            job["error"] = str(exc)
+        finally:
+            job["finished_at"] = datetime.utcnow()
+
+sector_fanout = SectorFanout()
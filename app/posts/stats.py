@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+from pymongo.collection import Collection
+from app.config import STATS_CACHE_TTL_SECONDS
+from .cache import response_cache
+
+FACET_COLLECTIONS = ("scheme_posts", "gov_jobs_posts", "digital_services")
+FACETS = ("by_state", "by_sector", "by_status")
+
+_executor = ThreadPoolExecutor(max_workers=len(FACET_COLLECTIONS), thread_name_prefix="facets")
+
+def _facet_pipeline(now: datetime, has_sector: bool, has_end_date: bool) -> List[Dict]:
+    by_count = {"$sort": {"count": -1, "_id": 1}}
+    facets = {
+        "by_state": [
+            {"$unwind": "$states"},
+            {"$group": {"_id": "$states", "count": {"$sum": 1}}},
+            by_count
+        ]
+    }
+    if has_sector:
+        facets["by_sector"] = [{"$group": {"_id": "$sector_id", "count": {"$sum": 1}}}, by_count]
+    # Posts without an end date (digital services) are always open
+    status = {"$cond": [{"$gte": ["$end_date", now]}, "open", "closed"]} if has_end_date else "open"
+    facets["by_status"] = [{"$group": {"_id": status, "count": {"$sum": 1}}}, by_count]
+    return [{"$facet": facets}]
+
+def _collection_facets(collection: Collection, has_sector: bool, has_end_date: bool, now: datetime) -> Dict:
+    result = next(collection.aggregate(_facet_pipeline(now, has_sector, has_end_date)), {})
+    return {
+        facet: [{"key": row["_id"], "count": row["count"]} for row in result.get(facet, [])]
+        for facet in FACETS
+    }
+
+def _load_facet_stats(scheme_posts: Collection, gov_jobs_posts: Collection,
+                      digital_services: Collection) -> Dict:
+    now = datetime.utcnow()
+    # One aggregation per collection, run concurrently
+    futures = {
+        "scheme_posts": _executor.submit(_collection_facets, scheme_posts, True, True, now),
+        "gov_jobs_posts": _executor.submit(_collection_facets, gov_jobs_posts, True, True, now),
+        "digital_services": _executor.submit(_collection_facets, digital_services, False, False, now)
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+def get_facet_stats(scheme_posts: Collection, gov_jobs_posts: Collection,
+                    digital_services: Collection) -> Dict:
+    # Any write to one of the collections invalidates the cached counts
+    return response_cache.get_or_load(
+        "stats/facets",
+        [f"list:{name}" for name in FACET_COLLECTIONS],
+        lambda: _load_facet_stats(scheme_posts, gov_jobs_posts, digital_services),
+        ttl=STATS_CACHE_TTL_SECONDS
+    )
@@ -0,0 +1,304 @@
+# Synthetic dataset generator for capacity planning.
+#
+# Produces states_and_cities, sectors, scheme_posts, gov_jobs_posts and
+# digital_services documents shaped like the models in app/posts/model.py,
+# with skewed states/cities/required_documents/updates. Output is fully
+# determined by --seed (independently of --workers). Documents are either
+# written straight to MongoDB in unordered batches or, with --out, as
+# mongorestore-compatible <out>/<db>/<collection>.bson files.
+#
+# Writes go to a scratch database by default. Loading into the configured app
+# database (MONGO_DB_NAME) needs --allow-app-db.
+#
+#   python -m app.posts.synthetic --db ccos_scrapesarthi_load --scheme-posts 2000000 --workers 8
+#   python -m app.posts.synthetic --out dump/ --scheme-posts 2000000 && mongorestore dump/
+import argparse
+import itertools
+import os
+import random
+import shutil
+import struct
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId, encode
+from pymongo import MongoClient
+from app.config import MONGO_DB_NAME
+from .model import compute_last_activity
+
+STATES_AND_CITIES: Dict[str, List[str]] = {
+    "Andhra Pradesh": ["Visakhapatnam", "Vijayawada", "Guntur", "Nellore", "Tirupati", "Kurnool"],
+    "Arunachal Pradesh": ["Itanagar", "Naharlagun", "Pasighat", "Tawang"],
+    "Assam": ["Guwahati", "Silchar", "Dibrugarh", "Jorhat", "Nagaon", "Tezpur"],
+    "Bihar": ["Patna", "Gaya", "Bhagalpur", "Muzaffarpur", "Darbhanga", "Purnia"],
+    "Chhattisgarh": ["Raipur", "Bhilai", "Bilaspur", "Korba", "Durg"],
+    "Goa": ["Panaji", "Margao", "Vasco da Gama", "Mapusa"],
+    "Gujarat": ["Ahmedabad", "Surat", "Vadodara", "Rajkot", "Bhavnagar", "Jamnagar", "Gandhinagar"],
+    "Haryana": ["Gurugram", "Faridabad", "Panipat", "Ambala", "Hisar", "Rohtak", "Karnal"],
+    "Himachal Pradesh": ["Shimla", "Dharamshala", "Mandi", "Solan", "Kullu"],
+    "Jharkhand": ["Ranchi", "Jamshedpur", "Dhanbad", "Bokaro", "Hazaribagh"],
+    "Karnataka": ["Bengaluru", "Mysuru", "Hubballi", "Mangaluru", "Belagavi", "Kalaburagi"],
+    "Kerala": ["Thiruvananthapuram", "Kochi", "Kozhikode", "Thrissur", "Kollam", "Kannur"],
+    "Madhya Pradesh": ["Indore", "Bhopal", "Jabalpur", "Gwalior", "Ujjain", "Sagar"],
+    "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Nashik", "Aurangabad", "Solapur", "Thane"],
+    "Manipur": ["Imphal", "Thoubal", "Bishnupur", "Churachandpur"],
+    "Meghalaya": ["Shillong", "Tura", "Jowai", "Nongstoin"],
+    "Mizoram": ["Aizawl", "Lunglei", "Champhai", "Serchhip"],
+    "Nagaland": ["Kohima", "Dimapur", "Mokokchung", "Tuensang"],
+    "Odisha": ["Bhubaneswar", "Cuttack", "Rourkela", "Berhampur", "Sambalpur", "Puri"],
+    "Punjab": ["Ludhiana", "Amritsar", "Jalandhar", "Patiala", "Bathinda", "Mohali"],
+    "Rajasthan": ["Jaipur", "Jodhpur", "Kota", "Bikaner", "Ajmer", "Udaipur"],
+    "Sikkim": ["Gangtok", "Namchi", "Gyalshing", "Mangan"],
+    "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai", "Tiruchirappalli", "Salem", "Tirunelveli"],
+    "Telangana": ["Hyderabad", "Warangal", "Nizamabad", "Karimnagar", "Khammam"],
+    "Tripura": ["Agartala", "Udaipur", "Dharmanagar", "Kailashahar"],
+    "Uttar Pradesh": ["Lucknow", "Kanpur", "Ghaziabad", "Agra", "Varanasi", "Meerut", "Prayagraj", "Noida"],
+    "Uttarakhand": ["Dehradun", "Haridwar", "Roorkee", "Haldwani", "Rudrapur"],
+    "West Bengal": ["Kolkata", "Howrah", "Durgapur", "Asansol", "Siliguri", "Bardhaman"],
+    "Andaman and Nicobar Islands": ["Port Blair"],
+    "Chandigarh": ["Chandigarh"],
+    "Dadra and Nagar Haveli and Daman and Diu": ["Daman", "Diu", "Silvassa"],
+    "Delhi": ["New Delhi", "Delhi"],
+    "Jammu and Kashmir": ["Srinagar", "Jammu", "Anantnag", "Baramulla"],
+    "Ladakh": ["Leh", "Kargil"],
+    "Lakshadweep": ["Kavaratti"],
+    "Puducherry": ["Puducherry", "Karaikal", "Mahe", "Yanam"]
+}
+
+# Relative population weight of each state, used to skew post placement
+STATE_WEIGHTS = {
+    "Uttar Pradesh": 20, "Maharashtra": 12, "Bihar": 10, "West Bengal": 9, "Madhya Pradesh": 7,
+    "Tamil Nadu": 7, "Rajasthan": 7, "Karnataka": 6, "Gujarat": 6, "Andhra Pradesh": 5, "Odisha": 4,
+    "Telangana": 4, "Kerala": 3, "Jharkhand": 3, "Assam": 3, "Punjab": 3, "Chhattisgarh": 3, "Haryana": 3,
+    "Delhi": 2, "Jammu and Kashmir": 1
+}
+
+DOCUMENT_TYPES = [
+    ("Aadhaar Card", "ID"), ("PAN Card", "ID"), ("Ration Card", "ID"), ("Voter ID", "ID"),
+    ("Passport", "ID"), ("Driving Licence", "ID"), ("Income Certificate", "Proof"),
+    ("Caste Certificate", "Proof"), ("Domicile Certificate", "Proof"), ("Bank Passbook", "Proof"),
+    ("Land Ownership Document", "Proof"), ("Birth Certificate", "Proof"), ("Disability Certificate", "Proof"),
+    ("Class 10 Marksheet", "Education"), ("Class 12 Marksheet", "Education"), ("Graduation Degree", "Education"),
+    ("Resume", "Document"), ("Passport Photo", "Document"), ("Signature Scan", "Document"),
+    ("Experience Certificate", "Document"), ("Medical Fitness Certificate", "Document"),
+    ("Electricity Bill", "Proof"), ("BPL Card", "Proof"), ("Kisan Credit Card", "ID"),
+    ("MGNREGA Job Card", "ID"), ("Marriage Certificate", "Proof"), ("Death Certificate", "Proof"),
+    ("Affidavit", "Document"), ("NOC", "Document"), ("GST Registration", "Proof")
+]
+
+SECTOR_AREAS = [
+    "Education", "Healthcare", "Agriculture", "Employment", "Housing", "Women and Child Development",
+    "Social Welfare", "Skill Development", "Rural Development", "Urban Development", "Finance",
+    "Banking", "Insurance", "Pension", "Transport", "Energy", "Water Resources", "Sanitation",
+    "Environment", "Forest", "Fisheries", "Animal Husbandry", "Dairy", "Textiles", "MSME",
+    "Startups", "Information Technology", "Telecom", "Tourism", "Culture", "Sports", "Youth Affairs",
+    "Minority Affairs", "Tribal Affairs", "Disability", "Senior Citizens", "Defence", "Railways",
+    "Police", "Judiciary", "Revenue", "Food and Civil Supplies", "Cooperatives", "Labour",
+    "Mining", "Science and Technology"
+]
+SECTOR_QUALIFIERS = ["", "Rural", "Urban", "Central", "State", "Research", "Scholarships", "Recruitment"]
+
+UPDATE_NOTES = [
+    "Application window opened", "Last date extended", "Exam schedule released", "Admit cards released",
+    "Answer key published", "Results declared", "Document verification scheduled", "Corrigendum issued",
+    "Merit list published", "Application window closed"
+]
+
+COLLECTIONS = ("scheme_posts", "gov_jobs_posts", "digital_services")
+SCRATCH_DB = "ccos_scrapesarthi_synthetic"
+
+def _object_id(rng: random.Random, created_at: datetime) -> ObjectId:
+    # Realistic timestamp part, deterministic remainder; created_at is naive UTC,
+    # so the host's timezone must not shift it
+    seconds = int(created_at.replace(tzinfo=timezone.utc).timestamp())
+    return ObjectId(struct.pack(">I", seconds) + rng.getrandbits(64).to_bytes(8, "big"))
+
+def _zipf_cum_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+def build_reference_data(seed: int, sector_count: int, towns_per_state: int) -> Tuple[List[Dict], List[Dict]]:
+    rng = random.Random(f"{seed}:reference")
+    created_at = datetime(2024, 1, 1)
+    states = []
+    for name, cities in STATES_AND_CITIES.items():
+        names = cities + [f"{name} Town {i}" for i in range(1, towns_per_state + 1)]
+        states.append({
+            "_id": _object_id(rng, created_at),
+            "name": name,
+            "cities": [{"city_id": str(_object_id(rng, created_at)), "name": city} for city in names]
+        })
+
+    sector_names = [f"{qualifier} {area}".strip() for qualifier in SECTOR_QUALIFIERS for area in SECTOR_AREAS]
+    sectors = [
+        {"_id": _object_id(rng, created_at), "name": name, "description": f"Schemes and services for {name}"}
+        for name in sector_names[:sector_count]
+    ]
+    return states, sectors
+
+# Per-process generation context, built once in each worker
+class _Context:
+    def __init__(self, states: List[Dict], sectors: List[Dict]):
+        self.state_names = [state["name"] for state in states]
+        self.state_cum_weights = list(itertools.accumulate(STATE_WEIGHTS.get(name, 1) for name in self.state_names))
+        self.cities = {state["name"]: [city["name"] for city in state["cities"]] for state in states}
+        self.city_cum_weights = {name: _zipf_cum_weights(len(cities)) for name, cities in self.cities.items()}
+        self.sectors = [(str(sector["_id"]), sector["name"]) for sector in sectors]
+        self.sector_cum_weights = _zipf_cum_weights(len(sectors), 0.8)
+        self.documents = [{"name": name, "type": doc_type, "description": None} for name, doc_type in DOCUMENT_TYPES]
+        self.document_cum_weights = _zipf_cum_weights(len(DOCUMENT_TYPES), 0.9)
+        self.now = datetime(2026, 1, 1)
+
+    def post(self, rng: random.Random, collection: str, index: int) -> Dict:
+        created_at = self.now - timedelta(seconds=rng.randint(0, 2 * 365 * 86400))
+        object_id = _object_id(rng, created_at)
+
+        # Most posts target one state, a few are national
+        if rng.random() < 0.05:
+            states = list(self.state_names)
+        else:
+            states = list(dict.fromkeys(rng.choices(self.state_names, cum_weights=self.state_cum_weights,
+                                                    k=min(int(rng.expovariate(1.2)) + 1, 6))))
+        cities = []
+        for state in states[:3]:
+            k = min(int(rng.expovariate(0.6)), len(self.cities[state]))
+            cities += dict.fromkeys(rng.choices(self.cities[state], cum_weights=self.city_cum_weights[state], k=k))
+
+        documents = {
+            doc["name"]: dict(doc)
+            for doc in rng.choices(self.documents, cum_weights=self.document_cum_weights,
+                                   k=min(int(rng.expovariate(0.45)) + 1, 12))
+        }
+        updates = [
+            {"date": created_at + timedelta(days=rng.randint(0, 120)), "note": rng.choice(UPDATE_NOTES)}
+            for _ in range(min(int(rng.paretovariate(1.5)) - 1, 40))
+        ]
+        updates.sort(key=lambda update: update["date"])
+
+        kind = {"scheme_posts": "Scheme", "gov_jobs_posts": "Recruitment", "digital_services": "Service"}[collection]
+        title = f"{kind} {index} - {states[0]}"
+        description = f"Synthetic {kind.lower()} generated for capacity planning"
+        # Same field order as the models' to_dict()
+        if collection == "digital_services":
+            post = {
+                "_id": object_id, "title": title, "description": description,
+                "required_documents": list(documents.values()), "updates": updates,
+                "states": states, "cities": cities
+            }
+        else:
+            post = {
+                "_id": object_id, "title": title, "start_date": created_at,
+                "end_date": created_at + timedelta(days=rng.randint(15, 365)), "description": description,
+                "required_documents": list(documents.values()), "states": states, "cities": cities,
+                "updates": updates
+            }
+            post["sector_id"], post["sector_name"] = rng.choices(self.sectors, cum_weights=self.sector_cum_weights)[0]
+        post["last_activity"] = compute_last_activity([update["date"] for update in updates], object_id)
+        return post
+
+_context: Optional[_Context] = None
+_options: Dict = {}
+
+def _init_worker(states: List[Dict], sectors: List[Dict], options: Dict) -> None:
+    global _context, _options
+    _context = _Context(states, sectors)
+    _options = options
+
+def _generate_chunk(task: Tuple[str, int, int, int]) -> int:
+    collection, chunk, start, count = task
+    # Seeded per chunk, so output doesn't depend on how chunks are spread over workers
+    rng = random.Random(f"{_options['seed']}:{collection}:{chunk}")
+    posts = [_context.post(rng, collection, index) for index in range(start, start + count)]
+    if _options.get("out"):
+        with open(_part_path(_options["out"], _options["db"], collection, chunk), "wb") as f:
+            f.write(b"".join(encode(post) for post in posts))
+    else:
+        client = MongoClient(_options["uri"])
+        try:
+            client[_options["db"]][collection].insert_many(posts, ordered=False, bypass_document_validation=True)
+        finally:
+            client.close()
+    return count
+
+def _part_path(out: str, db: str, collection: str, chunk: int) -> str:
+    return os.path.join(out, db, f"{collection}.bson.part-{chunk:06d}")
+
+def generate(counts: Dict[str, int], seed: int = 0, sector_count: int = 300, towns_per_state: int = 60,
+             uri: str = "mongodb://localhost:27017", db: str = SCRATCH_DB,
+             out: Optional[str] = None, workers: int = os.cpu_count() or 1, chunk_size: int = 10000,
+             allow_app_db: bool = False) -> Dict[str, int]:
+    if not out and db == MONGO_DB_NAME and not allow_app_db:
+        raise ValueError(f"Refusing to write synthetic data into the app database {db!r}")
+    states, sectors = build_reference_data(seed, sector_count, towns_per_state)
+    options = {"seed": seed, "uri": uri, "db": db, "out": out}
+
+    if out:
+        os.makedirs(os.path.join(out, db), exist_ok=True)
+        for name, documents in (("states_and_cities", states), ("sectors", sectors)):
+            with open(os.path.join(out, db, f"{name}.bson"), "wb") as f:
+                f.write(b"".join(encode(document) for document in documents))
+    else:
+        client = MongoClient(uri)
+        client[db]["states_and_cities"].insert_many(states, ordered=False)
+        client[db]["sectors"].insert_many(sectors, ordered=False)
+        client.close()
+
+    tasks = [
+        (collection, chunk, start, min(chunk_size, counts[collection] - start))
+        for collection in COLLECTIONS if counts.get(collection)
+        for chunk, start in enumerate(range(0, counts[collection], chunk_size))
+    ]
+    written = {collection: 0 for collection in COLLECTIONS}
+    with Pool(workers, initializer=_init_worker, initargs=(states, sectors, options)) as pool:
+        for task, count in zip(tasks, pool.imap(_generate_chunk, tasks)):
+            written[task[0]] += count
+
+    if out:
+        # Stitch the per-chunk parts together in chunk order
+        for collection in COLLECTIONS:
+            parts = [task[1] for task in tasks if task[0] == collection]
+            if not parts:
+                continue
+            with open(os.path.join(out, db, f"{collection}.bson"), "wb") as target:
+                for chunk in parts:
+                    path = _part_path(out, db, collection, chunk)
+                    with open(path, "rb") as source:
+                        shutil.copyfileobj(source, target)
+                    os.remove(path)
+    return written
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic ScrapeSarthi dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scheme-posts", type=int, default=1000000)
+    parser.add_argument("--gov-jobs-posts", type=int, default=500000)
+    parser.add_argument("--digital-services", type=int, default=100000)
+    parser.add_argument("--sectors", type=int, default=300)
+    parser.add_argument("--towns-per-state", type=int, default=60, help="synthetic towns added to each state's cities")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default=SCRATCH_DB)
+    parser.add_argument("--allow-app-db", action="store_true", help=f"allow writing into {MONGO_DB_NAME}")
+    parser.add_argument("--out", help="write mongorestore-compatible BSON files here instead of to MongoDB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    if not args.out and args.db == MONGO_DB_NAME and not args.allow_app_db:
+        parser.error(f"--db {args.db} is the app database; pass --allow-app-db to write into it")
+
+    started = time.monotonic()
+    written = generate(
+        {"scheme_posts": args.scheme_posts, "gov_jobs_posts": args.gov_jobs_posts,
+         "digital_services": args.digital_services},
+        seed=args.seed, sector_count=args.sectors, towns_per_state=args.towns_per_state,
+        uri=args.uri, db=args.db, out=args.out, workers=args.workers, chunk_size=args.chunk_size,
+        allow_app_db=args.allow_app_db
+    )
+    elapsed = time.monotonic() - started
+    total = sum(written.values())
+    print(f"Generated {total} posts {written} in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} docs/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
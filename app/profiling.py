@@ -0,0 +1,347 @@
+import asyncio
+import cProfile
+import functools
+import hmac
+import marshal
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.admission import API_PREFIX, STREAMING_PREFIXES
+from app.config import (PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_BUFFER_SIZE, PROFILE_TOP_ENTRIES,
+                        PROFILING_ENABLED)
+from app.posts import model
+
+# One profiled request. Timings are collected by the middleware (total), the
+# ProfiledRoute (validation before the endpoint, JSON encoding after it), the
+# Mongo command listener and the wrapped model conversions. cProfile covers the
+# endpoint call; the rest of the request shows up in the breakdown only.
+class ProfileCapture:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid4().hex
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.status: Optional[int] = None
+        self.started_at = datetime.utcnow()
+        self.seconds = {"total": 0.0, "mongo_io": 0.0, "model_conversion": 0.0, "validation": 0.0,
+                        "endpoint": 0.0, "json_encoding": 0.0}
+        self.mongo_commands = 0
+        self.converting = False
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+        self.stats: Optional[pstats.Stats] = None
+        self.allocations: List[Dict] = []
+        self.memory_peak_kb = 0.0
+        self._started = 0.0
+        self._tracing = False
+
+    def add_profile(self, profiler: cProfile.Profile) -> None:
+        if self.stats is None:
+            self.stats = pstats.Stats(profiler)
+        else:
+            self.stats.add(profiler)
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        self.seconds["total"] = time.perf_counter() - self._started
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__)
+        ])
+        self.memory_peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        if self._tracing:
+            tracemalloc.stop()
+        self.allocations = [
+            {"location": str(stat.traceback), "size_kb": stat.size / 1024, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ENTRIES]
+        ]
+
+    def breakdown(self) -> Dict[str, float]:
+        result = {f"{name}_ms": value * 1000 for name, value in self.seconds.items()}
+        # Endpoint time not spent talking to Mongo or converting models
+        result["other_endpoint_ms"] = max(
+            0.0, result["endpoint_ms"] - result["mongo_io_ms"] - result["model_conversion_ms"]
+        )
+        return result
+
+    def top_functions(self) -> List[Dict]:
+        if self.stats is None:
+            return []
+        rows = sorted(self.stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {"function": pstats.func_std_string(func), "calls": calls, "total_ms": total * 1000,
+             "cumulative_ms": cumulative * 1000}
+            for func, (_, calls, total, cumulative, _) in rows[:PROFILE_TOP_ENTRIES]
+        ]
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "status": self.status,
+            "started_at": self.started_at,
+            "total_ms": self.seconds["total"] * 1000
+        }
+
+    def detail(self) -> Dict:
+        return {
+            **self.summary(),
+            "breakdown": self.breakdown(),
+            "mongo_commands": self.mongo_commands,
+            "memory_peak_kb": self.memory_peak_kb,
+            "top_functions": self.top_functions(),
+            "allocations": self.allocations
+        }
+
+    def dump_stats(self) -> bytes:
+        # Same format as pstats.Stats.dump_stats, loadable with pstats or snakeviz
+        return marshal.dumps(self.stats.stats if self.stats is not None else {})
+
+current_capture: ContextVar[Optional[ProfileCapture]] = ContextVar("current_capture", default=None)
+
+def _enable_profiler() -> Optional[cProfile.Profile]:
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is active in this thread
+        return None
+    return profiler
+
+# Ring buffer of recent captures. cProfile and tracemalloc are process wide,
+# so only one request is profiled at a time; others pass through untouched.
+class ProfileStore:
+    def __init__(self, size: int = PROFILE_BUFFER_SIZE):
+        self._captures = deque(maxlen=size)
+        self._active = threading.Lock()
+
+    def begin(self, method: str, path: str, trigger: str) -> Optional[ProfileCapture]:
+        if not self._active.acquire(blocking=False):
+            return None
+        return ProfileCapture(method, path, trigger)
+
+    def finish(self, capture: ProfileCapture) -> None:
+        self._captures.appendleft(capture)
+        self._active.release()
+
+    def list(self) -> List[Dict]:
+        return [capture.summary() for capture in list(self._captures)]
+
+    def get(self, capture_id: str) -> Optional[ProfileCapture]:
+        return next((capture for capture in list(self._captures) if capture.id == capture_id), None)
+
+profile_store = ProfileStore()
+
+# Times every Mongo command run while a capture is current in the calling thread
+class MongoTimingListener(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def _finished(self, duration_micros: int) -> None:
+        capture = current_capture.get()
+        if capture is not None:
+            capture.seconds["mongo_io"] += duration_micros / 1_000_000
+            capture.mongo_commands += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event.duration_micros)
+
+mongo_timing_listener = MongoTimingListener()
+
+def _timed_conversion(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        capture = current_capture.get()
+        # Nested conversions (a post's documents and updates) count once
+        if capture is None or capture.converting:
+            return func(*args, **kwargs)
+        capture.converting = True
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            capture.seconds["model_conversion"] += time.perf_counter() - started
+            capture.converting = False
+    return wrapper
+
+def instrument_models() -> None:
+    for cls in (model.City, model.StatesAndCities, model.Sector, model.Document, model.Update,
+                model.SchemePost, model.GovJobPost, model.DigitalService, model.Subscription):
+        for name in ("to_dict", "to_mongo", "from_dict"):
+            attribute = cls.__dict__.get(name)
+            if isinstance(attribute, classmethod):
+                setattr(cls, name, classmethod(_timed_conversion(attribute.__func__)))
+            elif callable(attribute):
+                setattr(cls, name, _timed_conversion(attribute))
+
+# Model conversions are only wrapped when profiling can actually be triggered
+if PROFILING_ENABLED:
+    instrument_models()
+
+# Raw header bytes against the configured token, in constant time
+def token_matches(value: Optional[bytes], token: str) -> bool:
+    return bool(token) and value is not None and hmac.compare_digest(value, token.encode())
+
+def _profiled_endpoint(endpoint: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            capture = current_capture.get()
+            if capture is None:
+                return await endpoint(*args, **kwargs)
+            capture.endpoint_started = time.perf_counter()
+            # Also records whatever other tasks the event loop runs meanwhile
+            profiler = _enable_profiler()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    capture.add_profile(profiler)
+                capture.endpoint_finished = time.perf_counter()
+        return async_wrapper
+
+    # Sync endpoints run in the threadpool, so the profiler is enabled in that thread
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        capture = current_capture.get()
+        if capture is None:
+            return endpoint(*args, **kwargs)
+        capture.endpoint_started = time.perf_counter()
+        profiler = _enable_profiler()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                capture.add_profile(profiler)
+            capture.endpoint_finished = time.perf_counter()
+    return sync_wrapper
+
+# Route class splitting a profiled request into validation (before the
+# endpoint runs), the endpoint itself and JSON encoding (after it returns)
+class ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request) -> Response:
+            capture = current_capture.get()
+            if capture is None:
+                return await handler(request)
+            started = time.perf_counter()
+            capture.endpoint_started = capture.endpoint_finished = None
+            try:
+                return await handler(request)
+            finally:
+                finished = time.perf_counter()
+                if capture.endpoint_started is not None and capture.endpoint_finished is not None:
+                    capture.seconds["validation"] += capture.endpoint_started - started
+                    capture.seconds["endpoint"] += capture.endpoint_finished - capture.endpoint_started
+                    capture.seconds["json_encoding"] += finished - capture.endpoint_finished
+                else:
+                    # Rejected before the endpoint ran
+                    capture.seconds["validation"] += finished - started
+
+        return profiled_handler
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, store: ProfileStore = profile_store, token: str = PROFILE_TOKEN,
+                 sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.store = store
+        self.token = token
+        self.sample_rate = sample_rate
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        path = scope["path"]
+        if not path.startswith(API_PREFIX) or path.startswith(STREAMING_PREFIXES):
+            return None
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile-token" and token_matches(value, self.token):
+                    return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        capture = self.store.begin(scope["method"], scope["path"], trigger) if trigger else None
+        if capture is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                capture.status = message["status"]
+                message.setdefault("headers", []).append((b"x-profile-id", capture.id.encode()))
+            await send(message)
+
+        token = current_capture.set(capture)
+        capture.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            capture.stop()
+            current_capture.reset(token)
+            self.store.finish(capture)
+
+# Admin endpoints, guarded by the same token as header-triggered profiling
+admin_router = APIRouter()
+
+def _check_token(token: Optional[str]) -> None:
+    # Starlette decodes header values as latin-1, which gives back the raw bytes
+    if not token_matches(token.encode("latin-1") if token is not None else None, PROFILE_TOKEN):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+@admin_router.get("/profiles")
+def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    _check_token(x_profile_token)
+    return profile_store.list()
+
+@admin_router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    _check_token(x_profile_token)
+    capture = profile_store.get(profile_id)
+    if not capture:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return capture.detail()
+
+@admin_router.get("/profiles/{profile_id}/download")
+def download_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    _check_token(x_profile_token)
+    capture = profile_store.get(profile_id)
+    if not capture:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        capture.dump_stats(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+    )
@@ -0,0 +1,339 @@
+import bisect
+import glob
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from bson import decode_file_iter
+from app.config import STORAGE_BACKEND, STORAGE_SNAPSHOT_DIR
+from app.database import get_db, close_client
+
+# Storage behind the models. The models and services only use the pymongo
+# Collection API, so a backend hands out collection objects by name: real
+# pymongo collections for Mongo, or read-only in-memory collections for edge
+# nodes and test runs loaded from a BSON snapshot (mongodump or the synthetic
+# dataset generator layout).
+
+class ReadOnlyStorageError(Exception):
+    pass
+
+class UnsupportedQueryError(Exception):
+    pass
+
+class StorageBackend:
+    read_only = False
+
+    def collection(self, name: str):
+        raise NotImplementedError
+
+    def __getitem__(self, name: str):
+        return self.collection(name)
+
+    def close(self) -> None:
+        pass
+
+class MongoBackend(StorageBackend):
+    def __init__(self, db):
+        self.db = db
+
+    def collection(self, name: str):
+        return self.db[name]
+
+    def close(self) -> None:
+        close_client()
+
+# Secondary indexes kept by the embedded engine
+HASH_INDEX_FIELDS = ("states", "cities", "sector_id", "subscriber_id", "post_ids")
+RANGE_INDEX_FIELDS = ("start_date", "end_date", "last_activity")
+
+_MISSING = object()
+
+def _values(document: Dict, path: str) -> List[Any]:
+    # Values at a dotted path, descending into arrays the way MongoDB does
+    current = [document]
+    for part in path.split("."):
+        found = []
+        for value in current:
+            if isinstance(value, dict) and part in value:
+                found.append(value[part])
+            elif isinstance(value, list):
+                found += [item[part] for item in value if isinstance(item, dict) and part in item]
+        current = found
+    flat = []
+    for value in current:
+        flat += value if isinstance(value, list) else [value]
+    return flat + [value for value in current if isinstance(value, list)]
+
+def _compare(values: List[Any], predicate: Callable[[Any], bool]) -> bool:
+    for value in values:
+        try:
+            if predicate(value):
+                return True
+        except TypeError:
+            continue
+    return False
+
+def _match_operators(values: List[Any], spec: Dict) -> bool:
+    for op, operand in spec.items():
+        if op == "$eq":
+            ok = operand in values if values else operand is None
+        elif op == "$ne":
+            ok = not (operand in values if values else operand is None)
+        elif op == "$in":
+            ok = any(item in values for item in operand) or (not values and None in operand)
+        elif op == "$nin":
+            ok = not any(item in values for item in operand)
+        elif op == "$gt":
+            ok = _compare(values, lambda value: value > operand)
+        elif op == "$gte":
+            ok = _compare(values, lambda value: value >= operand)
+        elif op == "$lt":
+            ok = _compare(values, lambda value: value < operand)
+        elif op == "$lte":
+            ok = _compare(values, lambda value: value <= operand)
+        elif op == "$exists":
+            ok = bool(values) == bool(operand)
+        else:
+            raise UnsupportedQueryError(f"Operator {op} is not supported by the embedded engine")
+        if not ok:
+            return False
+    return True
+
+def matches(document: Dict, query: Dict) -> bool:
+    for key, spec in query.items():
+        if key == "$or":
+            if not any(matches(document, clause) for clause in spec):
+                return False
+        elif key == "$and":
+            if not all(matches(document, clause) for clause in spec):
+                return False
+        elif key.startswith("$"):
+            raise UnsupportedQueryError(f"Operator {key} is not supported by the embedded engine")
+        elif isinstance(spec, dict) and spec and all(op.startswith("$") for op in spec):
+            if not _match_operators(_values(document, key), spec):
+                return False
+        elif not _match_operators(_values(document, key), {"$eq": spec}):
+            return False
+    return True
+
+def _project(document: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return dict(document)
+    if any(value for key, value in projection.items() if key != "_id"):
+        result = {key: document[key] for key, value in projection.items() if value and key in document}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    return {key: value for key, value in document.items() if projection.get(key, 1)}
+
+class _SortKey:
+    # Orders like MongoDB for the types we store: missing/None first, then by value
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        if self.value is None or other.value is None:
+            return self.value is None and other.value is not None
+        try:
+            return self.value < other.value
+        except TypeError:
+            return type(self.value).__name__ < type(other.value).__name__
+
+class MemoryCursor:
+    def __init__(self, documents: Callable[[], List[Dict]], projection: Optional[Dict]):
+        self._documents = documents
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._iterator: Optional[Iterator[Dict]] = None
+
+    def sort(self, key_or_list, direction: Optional[int] = None) -> "MemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction or 1)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def _run(self) -> Iterator[Dict]:
+        documents = self._documents()
+        # Stable sorts from the last key to the first give the compound order
+        for field, direction in reversed(self._sort):
+            documents.sort(key=lambda document: _SortKey(document.get(field)), reverse=direction < 0)
+        end = self._skip + self._limit if self._limit else None
+        for document in documents[self._skip:end]:
+            yield _project(document, self._projection)
+
+    def __iter__(self) -> "MemoryCursor":
+        return self
+
+    def __next__(self) -> Dict:
+        if self._iterator is None:
+            self._iterator = self._run()
+        return next(self._iterator)
+
+    next = __next__
+
+    def close(self) -> None:
+        self._iterator = iter(())
+
+class MemoryCollection:
+    def __init__(self, name: str, documents: Iterable[Dict] = ()):
+        self.name = name
+        self._documents: Dict[Any, Dict] = {}
+        self._hash: Dict[str, Dict[Any, Set[Any]]] = {field: {} for field in HASH_INDEX_FIELDS}
+        self._range: Dict[str, List[Tuple[Any, Any]]] = {field: [] for field in RANGE_INDEX_FIELDS}
+        for document in documents:
+            self._add(document)
+        for entries in self._range.values():
+            entries.sort(key=lambda entry: entry[0])
+        self._range_keys = {field: [entry[0] for entry in entries] for field, entries in self._range.items()}
+
+    def _add(self, document: Dict) -> None:
+        self._documents[document["_id"]] = document
+        for field, index in self._hash.items():
+            value = document.get(field, _MISSING)
+            if value is _MISSING:
+                continue
+            for item in value if isinstance(value, list) else [value]:
+                try:
+                    index.setdefault(item, set()).add(document["_id"])
+                except TypeError:
+                    continue
+        for field, entries in self._range.items():
+            if document.get(field) is not None:
+                entries.append((document[field], document["_id"]))
+
+    def _range_bounds(self, field: str, spec: Dict) -> Optional[Tuple[int, int]]:
+        keys = self._range_keys[field]
+        low, high = 0, len(keys)
+        bounded = False
+        try:
+            for op, operand in spec.items():
+                if op == "$gte":
+                    low, bounded = max(low, bisect.bisect_left(keys, operand)), True
+                elif op == "$gt":
+                    low, bounded = max(low, bisect.bisect_right(keys, operand)), True
+                elif op == "$lte":
+                    high, bounded = min(high, bisect.bisect_right(keys, operand)), True
+                elif op == "$lt":
+                    high, bounded = min(high, bisect.bisect_left(keys, operand)), True
+        except TypeError:
+            return None
+        return (low, max(low, high)) if bounded else None
+
+    def _plan(self, query: Dict) -> Optional[Tuple[int, Callable[[], Set[Any]]]]:
+        # Cheapest index access for the query as (estimated size, loader); None means a full scan.
+        # Only one index is used; matches() verifies the remaining conditions.
+        best = None
+        for field, spec in query.items():
+            plan = None
+            operators = isinstance(spec, dict) and spec and all(op.startswith("$") for op in spec)
+            if field == "$or":
+                clauses = [self._plan(clause) for clause in spec]
+                if all(clause is not None for clause in clauses):
+                    plan = (sum(clause[0] for clause in clauses),
+                            lambda clauses=clauses: set().union(*(clause[1]() for clause in clauses)))
+            elif field in self._range and (operators or spec is not None):
+                bounds = self._range_bounds(field, spec if operators else {"$gte": spec, "$lte": spec})
+                if bounds is not None:
+                    entries = self._range[field]
+                    plan = (bounds[1] - bounds[0],
+                            lambda entries=entries, bounds=bounds: {e[1] for e in entries[bounds[0]:bounds[1]]})
+            elif field == "_id" or field in self._hash:
+                if operators and "$in" in spec:
+                    keys = list(spec["$in"])
+                elif not operators and not isinstance(spec, (dict, list)):
+                    keys = [spec]
+                else:
+                    keys = None
+                if keys is not None and field == "_id":
+                    plan = (len(keys), lambda keys=keys: {key for key in keys if key in self._documents})
+                elif keys is not None:
+                    index = self._hash[field]
+                    buckets = [index.get(key, set()) for key in keys]
+                    plan = (sum(len(bucket) for bucket in buckets), lambda buckets=buckets: set().union(*buckets))
+            if plan is not None and (best is None or plan[0] < best[0]):
+                best = plan
+        return best
+
+    def _find(self, query: Optional[Dict]) -> List[Dict]:
+        query = query or {}
+        plan = self._plan(query)
+        if plan is None:
+            documents = self._documents.values()
+        else:
+            documents = [self._documents[object_id] for object_id in plan[1]()]
+        return [document for document in documents if matches(document, query)]
+
+    def find(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None) -> MemoryCursor:
+        return MemoryCursor(lambda: self._find(filter), projection)
+
+    def find_one(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        return next(self.find(filter, projection).limit(1), None)
+
+    def count_documents(self, filter: Dict) -> int:
+        return len(self._find(filter))
+
+    def distinct(self, key: str, filter: Optional[Dict] = None) -> List[Any]:
+        values: Dict[Any, None] = {}
+        for document in self._find(filter):
+            for value in _values(document, key):
+                if not isinstance(value, list):
+                    values[value] = None
+        return list(values)
+
+    def aggregate(self, *args, **kwargs):
+        raise UnsupportedQueryError("Aggregations are not supported by the embedded engine")
+
+    def _read_only(self, *args, **kwargs):
+        raise ReadOnlyStorageError(f"{self.name} is read-only on this node")
+
+    insert_one = insert_many = replace_one = update_one = update_many = _read_only
+    delete_one = delete_many = find_one_and_update = bulk_write = create_index = _read_only
+
+class MemoryBackend(StorageBackend):
+    read_only = True
+
+    def __init__(self, snapshot_dir: str):
+        self.collections: Dict[str, MemoryCollection] = {}
+        for path in sorted(glob.glob(os.path.join(snapshot_dir, "*.bson"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, "rb") as snapshot:
+                self.collections[name] = MemoryCollection(name, decode_file_iter(snapshot))
+
+    def collection(self, name: str) -> MemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(name)
+        return self.collections[name]
+
+def is_read_only(collection) -> bool:
+    return isinstance(collection, MemoryCollection)
+
+def create_storage() -> StorageBackend:
+    if STORAGE_BACKEND == "memory":
+        return MemoryBackend(STORAGE_SNAPSHOT_DIR)
+    return MongoBackend(get_db())
+
+_storage: Optional[StorageBackend] = None
+
+# Opened by the app lifespan, or on first use outside of it
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        _storage.close()
+        _storage = None
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+from typing import Any, Dict, List
+from pymongo import MongoClient
+from app.posts.cache import response_cache
+from app.posts.model import StatesAndCities, Sector
+from app.storage import StorageBackend
+
+# Collections whose index metadata is loaded before the worker takes traffic
+WARM_COLLECTIONS = ("states_and_cities", "sectors", "scheme_posts", "gov_jobs_posts", "digital_services",
+                    "state_bundles", "subscriptions")
+
+class Readiness:
+    def __init__(self):
+        self.ready = False
+        self.checks: Dict[str, Any] = {}
+
+    def report(self) -> Dict[str, Any]:
+        return {"ready": self.ready, **self.checks}
+
+def ping(client: MongoClient) -> float:
+    started = time.perf_counter()
+    client.admin.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+def warm_pool(client: MongoClient, size: int) -> int:
+    # Concurrent pings each check out their own connection, so the pool opens them all now
+    # instead of on the first requests after a deploy
+    if size <= 0:
+        return 0
+    with ThreadPoolExecutor(max_workers=size) as pool:
+        list(pool.map(lambda _: client.admin.command("ping"), range(size)))
+    return size
+
+def measure_ping(client: MongoClient, samples: int = 5) -> float:
+    return median(ping(client) for _ in range(samples))
+
+def prime_index_metadata(storage: StorageBackend) -> Dict[str, List[str]]:
+    return {name: sorted(storage[name].index_information()) for name in WARM_COLLECTIONS}
+
+def prime_reference_data(storage: StorageBackend) -> Dict[str, int]:
+    # Same cache keys the list routes read, so the first requests are hits
+    counts = {}
+    for model, name in ((StatesAndCities, "states_and_cities"), (Sector, "sectors")):
+        collection = storage[name]
+        items = response_cache.get_list(name, lambda: [item.to_dict() for item in model.find_all(collection)])
+        counts[name] = len(items)
+    return counts
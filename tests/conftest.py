@@ -0,0 +1,43 @@
+import mongomock
+import mongomock.collection
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app import storage as storage_module
+from app.posts.api import router
+from app.posts.cache import MemoryLRUBackend, response_cache
+from app.posts.eligibility import eligibility_index
+from app.storage import MongoBackend
+
+def _without_sort(method):
+    def add(self, *args, sort=None, **kwargs):
+        return method(self, *args, **kwargs)
+    return add
+
+@pytest.fixture(scope="session", autouse=True)
+def mongomock_bulk_sort():
+    # pymongo passes sort= to bulk updates and replaces, which this mongomock predates
+    builder = mongomock.collection.BulkOperationBuilder
+    original = builder.add_update, builder.add_replace
+    builder.add_update, builder.add_replace = _without_sort(original[0]), _without_sort(original[1])
+    yield
+    builder.add_update, builder.add_replace = original
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()["ccos_scrapesarthi"]
+
+@pytest.fixture(autouse=True)
+def storage(db, monkeypatch):
+    # Every test gets its own mongomock database and an empty cache
+    backend = MongoBackend(db)
+    monkeypatch.setattr(storage_module, "_storage", backend)
+    monkeypatch.setattr(response_cache, "backend", MemoryLRUBackend())
+    monkeypatch.setattr(eligibility_index, "collections", {})
+    return backend
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    return TestClient(app)
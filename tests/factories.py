@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from app.posts.model import SchemePost, GovJobPost, DigitalService, Document
+
+def scheme_post(states: Optional[List[str]] = None, documents: Optional[List[str]] = None,
+                sector_id: str = "60d5ec49f8d2e30b8c8b4567", end_in_days: int = 30, **fields) -> SchemePost:
+    now = datetime.utcnow()
+    return SchemePost(
+        title=fields.pop("title", "Scheme"),
+        description=fields.pop("description", "A scheme"),
+        start_date=fields.pop("start_date", now - timedelta(days=1)),
+        end_date=fields.pop("end_date", now + timedelta(days=end_in_days)),
+        required_documents=[Document(name) for name in (documents or [])],
+        updates=fields.pop("updates", []),
+        states=states or ["Goa"],
+        cities=fields.pop("cities", []),
+        sector_id=sector_id,
+        **fields
+    )
+
+def gov_job_post(states: Optional[List[str]] = None, documents: Optional[List[str]] = None,
+                 sector_id: str = "60d5ec49f8d2e30b8c8b4567", end_in_days: int = 30, **fields) -> GovJobPost:
+    now = datetime.utcnow()
+    return GovJobPost(
+        title=fields.pop("title", "Job"),
+        description=fields.pop("description", "A job"),
+        start_date=fields.pop("start_date", now - timedelta(days=1)),
+        end_date=fields.pop("end_date", now + timedelta(days=end_in_days)),
+        required_documents=[Document(name) for name in (documents or [])],
+        updates=fields.pop("updates", []),
+        states=states or ["Goa"],
+        cities=fields.pop("cities", []),
+        sector_id=sector_id,
+        **fields
+    )
+
+def digital_service(states: Optional[List[str]] = None, documents: Optional[List[str]] = None,
+                    **fields) -> DigitalService:
+    return DigitalService(
+        title=fields.pop("title", "Service"),
+        description=fields.pop("description", "A service"),
+        required_documents=[Document(name) for name in (documents or [])],
+        updates=fields.pop("updates", []),
+        states=states or ["Goa"],
+        cities=fields.pop("cities", []),
+        **fields
+    )
+
+def scheme_payload(**fields) -> dict:
+    payload = {
+        "title": "Scheme",
+        "description": "A scheme",
+        "start_date": "2030-01-01T00:00:00",
+        "end_date": "2030-12-31T00:00:00",
+        "required_documents": [{"name": "Aadhaar Card", "type": "ID"}],
+        "updates": [],
+        "states": ["Goa"],
+        "cities": ["Panaji"],
+        "sector_id": "60d5ec49f8d2e30b8c8b4567"
+    }
+    payload.update(fields)
+    return payload
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from app.admission import AdmissionController, ConcurrencyLimiter, DETAIL_PRIORITY, LIST_PRIORITY
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("GET", "/api/v1/scheme-posts/", ("reads", LIST_PRIORITY)),
+    ("GET", "/api/v1/scheme-posts/60d5ec49f8d2e30b8c8b4567", ("reads", DETAIL_PRIORITY)),
+    ("POST", "/api/v1/scheme-posts/", ("writes", DETAIL_PRIORITY)),
+    ("DELETE", "/api/v1/sectors/60d5ec49f8d2e30b8c8b4567", ("writes", DETAIL_PRIORITY)),
+    ("POST", "/api/v1/eligibility", ("reads", LIST_PRIORITY)),
+    ("POST", "/api/v1/scheme-posts/batch-get", ("exports", LIST_PRIORITY)),
+    ("GET", "/api/v1/feed", ("exports", LIST_PRIORITY)),
+])
+def test_classify(method, path, expected):
+    assert AdmissionController().classify(method, path) == expected
+
+def test_limiter_queues_by_priority_and_sheds_when_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter("reads", limit=1, max_queue=2, timeout=1)
+        assert await limiter.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            assert await limiter.acquire(priority)
+            order.append(name)
+            limiter.release()
+
+        tasks = [asyncio.create_task(waiter("list", LIST_PRIORITY)),
+                 asyncio.create_task(waiter("detail", DETAIL_PRIORITY))]
+        await asyncio.sleep(0)
+        assert not await limiter.acquire()
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order, limiter.metrics()
+
+    order, metrics = asyncio.run(scenario())
+    assert order == ["detail", "list"]
+    assert (metrics["in_flight"], metrics["admitted"], metrics["shed"]) == (0, 3, 1)
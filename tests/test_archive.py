@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.posts.archive import archive_expired_posts
+from tests.factories import scheme_post
+
+def test_expired_posts_move_to_the_archive(storage):
+    posts, archive = storage["scheme_posts"], storage["scheme_posts_archive"]
+    expired = scheme_post(title="expired", end_in_days=-40)
+    recent = scheme_post(title="recent", end_in_days=-1)
+    expired.save(posts)
+    recent.save(posts)
+
+    assert archive_expired_posts(posts, archive, retention_days=30, batch_size=1) == 1
+    assert [doc["title"] for doc in posts.find()] == ["recent"]
+    assert [doc["title"] for doc in archive.find()] == ["expired"]
+    assert archive_expired_posts(posts, archive, retention_days=30) == 0
+
+class _ExtendedDuringArchive:
+    # Extends a post's end_date between the archiver's read and its delete
+    def __init__(self, collection, post_id):
+        self._collection = collection
+        self._post_id = post_id
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def delete_many(self, filter):
+        self._collection.update_one({"_id": self._post_id},
+                                    {"$set": {"end_date": datetime.utcnow() + timedelta(days=30)}})
+        return self._collection.delete_many(filter)
+
+def test_post_extended_during_archiving_is_kept(storage):
+    posts, archive = storage["scheme_posts"], storage["scheme_posts_archive"]
+    extended = scheme_post(title="extended", end_in_days=-40)
+    expired = scheme_post(title="expired", end_in_days=-40)
+    extended.save(posts)
+    expired.save(posts)
+
+    moved = archive_expired_posts(_ExtendedDuringArchive(posts, ObjectId(extended.id)), archive, retention_days=30)
+    assert moved == 1
+    assert [doc["title"] for doc in posts.find()] == ["extended"]
+    assert [doc["title"] for doc in archive.find()] == ["expired"]
@@ -0,0 +1,35 @@
+from app.posts.model import Sector
+from tests.factories import scheme_post
+
+def test_batch_get_keeps_request_order_and_reports_missing(client, storage):
+    first, second = scheme_post(title="first"), scheme_post(title="second")
+    first.save(storage["scheme_posts"])
+    second.save(storage["scheme_posts"])
+    absent = "60d5ec49f8d2e30b8c8b4500"
+
+    body = client.post("/api/v1/scheme-posts/batch-get", json={"ids": [second.id, absent, first.id, second.id]}).json()
+    assert [item["title"] for item in body["items"]] == ["second", "first"]
+    assert body["missing"] == [absent]
+
+    listed = client.get("/api/v1/scheme-posts/", params={"ids": f"{first.id}, not-an-id"}).json()
+    assert [item["title"] for item in listed["items"]] == ["first"]
+    assert listed["missing"] == ["not-an-id"]
+
+def test_batch_get_can_include_archived_posts(client, storage):
+    archived = scheme_post(title="archived")
+    archived.save(storage["scheme_posts_archive"])
+
+    assert client.post("/api/v1/scheme-posts/batch-get", json={"ids": [archived.id]}).json()["missing"] == [archived.id]
+    body = client.post("/api/v1/scheme-posts/batch-get", params={"include_archived": True},
+                       json={"ids": [archived.id]}).json()
+    assert [item["title"] for item in body["items"]] == ["archived"]
+
+def test_batch_get_sectors_and_limit(client, storage, monkeypatch):
+    sector = Sector(name="Education")
+    sector.save(storage["sectors"])
+    body = client.post("/api/v1/sectors/batch-get", json={"ids": [sector.id]}).json()
+    assert [item["name"] for item in body["items"]] == ["Education"]
+
+    monkeypatch.setattr("app.posts.api.MAX_BATCH_IDS", 2)
+    ids = ["60d5ec49f8d2e30b8c8b4500", "60d5ec49f8d2e30b8c8b4501", "60d5ec49f8d2e30b8c8b4502"]
+    assert client.post("/api/v1/sectors/batch-get", json={"ids": ids}).status_code == 400
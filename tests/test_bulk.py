@@ -0,0 +1,28 @@
+from app.posts.model import Sector
+from tests.factories import scheme_payload
+
+def test_bulk_create_inserts_valid_items_and_reports_invalid_ones(client, storage):
+    sector = Sector(name="Education")
+    sector.save(storage["sectors"])
+    payload = scheme_payload(sector_id=sector.id, updates=[{"date": "2030-01-05T00:00:00", "note": "Opened"}])
+    invalid = scheme_payload(end_date="soon")
+    del invalid["title"]
+
+    response = client.post("/api/v1/scheme-posts/bulk", json=[payload, invalid, payload])
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["inserted_ids"]) == 2
+    assert [error["index"] for error in body["errors"]] == [1]
+    assert sorted(error["loc"][0] for error in body["errors"][0]["errors"]) == ["end_date", "title"]
+
+    # Same stored shape as a post created one at a time
+    single = client.post("/api/v1/scheme-posts/", json=payload).json()
+    bulk = client.get(f"/api/v1/scheme-posts/{body['inserted_ids'][0]}").json()
+    assert {**bulk, "_id": None} == {**single, "_id": None}
+    assert bulk["sector_name"] == "Education"
+    stored = storage["scheme_posts"].find_one({"title": "Scheme"})
+    assert stored["last_activity"].isoformat() == "2030-01-05T00:00:00"
+
+def test_bulk_create_limit(client, monkeypatch):
+    monkeypatch.setattr("app.posts.api.BULK_MAX_ITEMS", 1)
+    assert client.post("/api/v1/scheme-posts/bulk", json=[scheme_payload(), scheme_payload()]).status_code == 400
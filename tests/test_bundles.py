@@ -0,0 +1,44 @@
+from app.posts.bundles import StateBundleRefresher
+from tests.factories import scheme_post, gov_job_post, digital_service
+
+def test_bundle_lists_open_posts_and_answers_conditional_requests(client, storage):
+    scheme_post(title="goa scheme", states=["Goa"]).save(storage["scheme_posts"])
+    scheme_post(title="closed", states=["Goa"], end_in_days=-1).save(storage["scheme_posts"])
+    gov_job_post(title="kerala job", states=["Kerala"]).save(storage["gov_jobs_posts"])
+    digital_service(title="goa service", states=["Goa"]).save(storage["digital_services"])
+
+    response = client.get("/api/v1/states/Goa/bundle")
+    assert response.status_code == 200
+    bundle = response.json()
+    assert [post["title"] for post in bundle["schemes"]] == ["goa scheme"]
+    assert [post["title"] for post in bundle["services"]] == ["goa service"]
+    assert bundle["counts"] == {"schemes": 1, "jobs": 0, "services": 1}
+    etag = response.headers["etag"]
+    assert storage["state_bundles"].count_documents({}) == 1
+
+    cached = client.get("/api/v1/states/Goa/bundle", headers={"If-None-Match": etag})
+    assert (cached.status_code, cached.content) == (304, b"")
+    for header in (f'"other", W/{etag}', "*"):
+        assert client.get("/api/v1/states/Goa/bundle", headers={"If-None-Match": header}).status_code == 304
+    assert client.get("/api/v1/states/Goa/bundle", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get("/api/v1/states/Nowhere/bundle").json()["counts"] == {"schemes": 0, "jobs": 0, "services": 0}
+    assert storage["state_bundles"].count_documents({}) == 1
+
+def test_refresher_rebuilds_bundles_touched_by_writes(client, storage):
+    refresher = StateBundleRefresher(storage, delay=0)
+    post = scheme_post(title="moving", states=["Goa"])
+    post.save(storage["scheme_posts"])
+    etag = client.get("/api/v1/states/Goa/bundle").headers["etag"]
+
+    refresher.start()
+    try:
+        post.states = ["Kerala"]
+        post.save(storage["scheme_posts"])
+    finally:
+        refresher.stop()
+    refresher.refresh()
+
+    response = client.get("/api/v1/states/Goa/bundle", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["schemes"] == []
+    assert [item["title"] for item in client.get("/api/v1/states/Kerala/bundle").json()["schemes"]] == ["moving"]
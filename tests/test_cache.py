@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.posts.cache import MemoryLRUBackend, RedisBackend, ResponseCache
+
+# Just enough of redis.Redis for RedisBackend
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def _live(self, key):
+        item = self.values.get(key)
+        if item is not None and item[1] is not None and item[1] <= time.monotonic():
+            del self.values[key]
+            return None
+        return item
+
+    def get(self, key):
+        item = self._live(key)
+        return item[0] if item else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, px=None):
+        value = value if isinstance(value, bytes) else str(value).encode()
+        self.values[key] = (value, time.monotonic() + px / 1000 if px is not None else None)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        item = self._live(key)
+        self.values[key] = (str(value).encode(), item[1] if item else None)
+        return value
+
+    def ttl_ms(self, key):
+        return (self.values[key][1] - time.monotonic()) * 1000
+
+def _backends():
+    return [MemoryLRUBackend(), RedisBackend(client=FakeRedis(), version_ttl=3600)]
+
+@pytest.mark.parametrize("backend", _backends(), ids=["memory", "redis"])
+def test_writes_invalidate_cached_reads(backend):
+    cache = ResponseCache(backend)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"title": f"v{len(loads)}"}
+
+    assert cache.get_document("scheme_posts", "a", loader) == {"title": "v1"}
+    assert cache.get_document("scheme_posts", "a", loader) == {"title": "v1"}
+    cache.invalidate("scheme_posts", "b")
+    assert cache.get_document("scheme_posts", "a", loader) == {"title": "v1"}
+    cache.invalidate("scheme_posts", "a")
+    assert cache.get_document("scheme_posts", "a", loader) == {"title": "v2"}
+    cache.invalidate("scheme_posts")
+    assert cache.get_document("scheme_posts", "a", loader) == {"title": "v3"}
+    assert len(loads) == 3
+
+@pytest.mark.parametrize("backend", _backends(), ids=["memory", "redis"])
+def test_backends_return_the_same_datetimes(backend):
+    cache = ResponseCache(backend)
+    aware = datetime(2030, 1, 1, 5, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    value = {"end_date": aware, "updates": [{"date": aware}]}
+
+    expected = {"end_date": datetime(2030, 1, 1), "updates": [{"date": datetime(2030, 1, 1)}]}
+    assert cache.get_or_load("key", [], lambda: value) == expected
+    assert cache.get_or_load("key", [], lambda: None) == expected
+
+def test_memory_versions_are_bounded_and_never_reused():
+    backend = MemoryLRUBackend(max_versions=2)
+    cache = ResponseCache(backend)
+    cache.get_list("scheme_posts", lambda: "stale")
+    for name in ("scheme_posts", "gov_jobs_posts", "digital_services", "sectors"):
+        backend.bump_version(f"list:{name}")
+    assert len(backend._versions) == 2
+    # The evicted name reads a version newer than any it was cached under
+    assert cache.get_list("scheme_posts", lambda: "fresh") == "fresh"
+
+def test_redis_version_keys_expire_after_entries():
+    client = FakeRedis()
+    backend = RedisBackend(client=client, version_ttl=3600)
+    backend.bump_version("list:scheme_posts")
+    backend.set("entry", {"v": 1}, ttl=86400)
+
+    assert 3590_000 < client.ttl_ms("version:list:scheme_posts") <= 3600_000
+    assert client.ttl_ms("entry") <= 1800_000
+    assert backend.get_versions(["list:scheme_posts", "list:sectors"]) == [1, 0]
+    backend.bump_version("list:sectors")
+    assert backend.get_versions(["list:scheme_posts", "list:sectors"]) == [1, 2]
@@ -0,0 +1,42 @@
+STATE = {"name": "Goa", "cities": [{"city_id": "panaji", "name": "Panaji"}]}
+
+def test_add_and_remove_a_city_in_one_round_trip(client):
+    state_id = client.post("/api/v1/states-and-cities/", json=STATE).json()["_id"]
+
+    response = client.post(f"/api/v1/states-and-cities/{state_id}/cities/margao", json={"name": "Margao"})
+    assert response.status_code == 201
+    assert [city["city_id"] for city in response.json()["cities"]] == ["panaji", "margao"]
+    # Reads see the write straight away
+    assert len(client.get(f"/api/v1/states-and-cities/{state_id}").json()["cities"]) == 2
+
+    assert client.delete(f"/api/v1/states-and-cities/{state_id}/cities/panaji").status_code == 204
+    cities = client.get(f"/api/v1/states-and-cities/{state_id}").json()["cities"]
+    assert [city["city_id"] for city in cities] == ["margao"]
+
+def test_city_conflicts_and_missing_targets(client):
+    state_id = client.post("/api/v1/states-and-cities/", json=STATE).json()["_id"]
+    absent = "60d5ec49f8d2e30b8c8b4500"
+
+    duplicate = client.post(f"/api/v1/states-and-cities/{state_id}/cities/panaji", json={"name": "Panjim"})
+    assert (duplicate.status_code, duplicate.json()["detail"]) == (409, "City already exists")
+    missing_state = client.post(f"/api/v1/states-and-cities/{absent}/cities/margao", json={"name": "Margao"})
+    assert (missing_state.status_code, missing_state.json()["detail"]) == (404, "State not found")
+    missing_city = client.delete(f"/api/v1/states-and-cities/{state_id}/cities/margao")
+    assert (missing_city.status_code, missing_city.json()["detail"]) == (404, "City not found")
+
+def test_update_a_city_in_place(client):
+    state_id = client.post("/api/v1/states-and-cities/", json=STATE).json()["_id"]
+    absent = "60d5ec49f8d2e30b8c8b4500"
+    url = f"/api/v1/states-and-cities/{state_id}/cities/panaji"
+
+    response = client.patch(url, json={"name": "Panjim"})
+    assert response.status_code == 200
+    assert response.json()["cities"] == [{"city_id": "panaji", "name": "Panjim"}]
+    for body in ({"name": None}, {}):
+        assert client.patch(url, json=body).status_code == 422
+    assert client.get(f"/api/v1/states-and-cities/{state_id}").json()["cities"][0]["name"] == "Panjim"
+
+    missing_city = client.patch(f"/api/v1/states-and-cities/{state_id}/cities/margao", json={"name": "Margao"})
+    assert (missing_city.status_code, missing_city.json()["detail"]) == (404, "City not found")
+    missing_state = client.patch(f"/api/v1/states-and-cities/{absent}/cities/panaji", json={"name": "Panjim"})
+    assert (missing_state.status_code, missing_state.json()["detail"]) == (404, "State not found")
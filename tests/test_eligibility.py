@@ -0,0 +1,77 @@
+import time
+from app.posts.cache import response_cache
+from app.posts.eligibility import eligibility_index
+from app.posts.model import Sector
+from app.posts.sector_fanout import SectorFanout
+from tests.factories import scheme_post, digital_service, scheme_payload
+
+def _titles(client, **body):
+    response = client.post("/api/v1/eligibility", json=body)
+    assert response.status_code == 200
+    return sorted(item["title"] for item in response.json()["items"])
+
+def test_eligible_posts_require_only_held_documents(client, storage):
+    scheme_post(title="aadhaar", documents=["Aadhaar Card"]).save(storage["scheme_posts"])
+    scheme_post(title="aadhaar+pan", documents=["Aadhaar Card", "PAN Card"]).save(storage["scheme_posts"])
+    scheme_post(title="closed", documents=[], end_in_days=-1).save(storage["scheme_posts"])
+    digital_service(title="service", documents=["PAN Card"], states=["Kerala"]).save(storage["digital_services"])
+    eligibility_index.load(storage)
+
+    assert _titles(client, documents=["aadhaar  card"]) == ["aadhaar"]
+    assert _titles(client, documents=["Aadhaar Card", "PAN Card"]) == ["aadhaar", "aadhaar+pan", "service"]
+    assert _titles(client, documents=["Aadhaar Card", "PAN Card"], state="Goa") == ["aadhaar", "aadhaar+pan"]
+    assert _titles(client, documents=["PAN Card"], resources=["digital-services"]) == ["service"]
+
+def test_tz_aware_post_dates_do_not_break_eligibility(client, storage):
+    eligibility_index.load(storage)
+    response = client.post("/api/v1/scheme-posts/", json=scheme_payload(
+        title="aware", start_date="2030-01-01T00:00:00Z", end_date="2030-12-31T00:00:00Z"
+    ))
+    assert response.status_code == 201
+    scheme_post(title="naive", documents=["Aadhaar Card"]).save(storage["scheme_posts"])
+
+    assert _titles(client, documents=["Aadhaar Card"]) == ["aware", "naive"]
+
+def test_sector_rename_patches_names_and_rebuilds_once(client, storage, monkeypatch):
+    sector = Sector(name="Education")
+    sector.save(storage["sectors"])
+    for _ in range(3):
+        scheme_post(sector_id=sector.id, sector_name="Education").save(storage["scheme_posts"])
+    eligibility_index.load(storage)
+
+    loads = []
+    original = eligibility_index.load_collection
+    monkeypatch.setattr(eligibility_index, "load_collection", lambda collection: (loads.append(collection.name),
+                                                                                  original(collection)))
+    monkeypatch.setattr("app.posts.eligibility.ELIGIBILITY_REBUILD_DELAY_SECONDS", 0.05)
+
+    sector.name = "Schooling"
+    sector.save(storage["sectors"])
+    # Patched in place before the fan-out has touched the posts
+    items = client.post("/api/v1/eligibility", json={"documents": []}).json()["items"]
+    assert {item["sector_name"] for item in items} == {"Schooling"}
+
+    job = SectorFanout(batch_size=1).start(sector.id, sector.name, [storage["scheme_posts"]])
+    deadline = time.time() + 5
+    while not loads and time.time() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.2)
+    assert job["job_id"]
+    assert loads == ["scheme_posts"]
+
+def test_index_rebuilds_after_another_worker_writes(client, storage, monkeypatch):
+    eligibility_index.load(storage)
+    monkeypatch.setattr(eligibility_index, "reload_seconds", 0)
+    monkeypatch.setattr("app.posts.eligibility.ELIGIBILITY_REBUILD_DELAY_SECONDS", 0.01)
+    assert eligibility_index.reload_if_changed() == []
+
+    # Written by another worker: no local notification, only the shared version moves
+    storage["scheme_posts"].insert_one(scheme_post(title="elsewhere").to_mongo())
+    assert _titles(client, documents=["Aadhaar Card"]) == []
+    response_cache.invalidate("scheme_posts")
+
+    deadline = time.time() + 5
+    while not eligibility_index.eligible(["Aadhaar Card"])[1] and time.time() < deadline:
+        time.sleep(0.02)
+    assert _titles(client, documents=["Aadhaar Card"]) == ["elsewhere"]
+    assert eligibility_index.reload_if_changed() == []
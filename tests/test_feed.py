@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta
+from app.posts.model import Update
+from tests.factories import scheme_post, gov_job_post, digital_service
+
+def test_feed_pages_through_all_resources_by_latest_activity(client, storage):
+    now = datetime.utcnow()
+    for days, post, collection in (
+        (1, scheme_post(title="scheme"), "scheme_posts"),
+        (2, gov_job_post(title="job"), "gov_jobs_posts"),
+        (3, digital_service(title="service"), "digital_services"),
+        (4, scheme_post(title="older scheme"), "scheme_posts")
+    ):
+        post.updates = [Update(date=now - timedelta(days=days), note="Opened")]
+        post.save(storage[collection])
+
+    first = client.get("/api/v1/feed", params={"limit": 3}).json()
+    assert [(item["resource"], item["title"]) for item in first["items"]] == [
+        ("scheme-posts", "scheme"), ("gov-jobs-posts", "job"), ("digital-services", "service")
+    ]
+    second = client.get("/api/v1/feed", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [(item["resource"], item["title"]) for item in second["items"]] == [("scheme-posts", "older scheme")]
+    assert second["next_cursor"] is None
+
+def test_feed_rejects_a_malformed_cursor(client):
+    assert client.get("/api/v1/feed", params={"cursor": "nope"}).status_code == 400
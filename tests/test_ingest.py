@@ -0,0 +1,28 @@
+import pytest
+from app.posts import api
+from app.posts.ingest import IngestQueue
+from tests.factories import scheme_payload
+
+@pytest.fixture
+def queue(monkeypatch):
+    ingest = IngestQueue(batch_size=10, flush_interval=0.01)
+    monkeypatch.setattr(api, "ingest_queue", ingest)
+    return ingest
+
+def test_ingested_posts_are_written_in_the_background(client, storage, queue):
+    queue.start()
+    tickets = [client.post("/api/v1/scheme-posts/ingest", json=scheme_payload(title=f"post {i}")) for i in range(3)]
+    queue.stop()
+
+    assert [response.status_code for response in tickets] == [202, 202, 202]
+    for response in tickets:
+        ticket = client.get(f"/api/v1/ingest/tickets/{response.json()['ticket_id']}").json()
+        assert (ticket["resource"], ticket["status"]) == ("scheme_posts", "written")
+        assert client.get(f"/api/v1/scheme-posts/{ticket['id']}").status_code == 200
+    assert sorted(doc["title"] for doc in storage["scheme_posts"].find()) == ["post 0", "post 1", "post 2"]
+
+def test_ingestion_is_refused_while_the_queue_is_closed(client, queue):
+    response = client.post("/api/v1/scheme-posts/ingest", json=scheme_payload())
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert client.get("/api/v1/ingest/tickets/unknown").status_code == 404
@@ -0,0 +1,34 @@
+import asyncio
+import json
+from app.posts.live import LiveHub, live_hub
+from tests.factories import scheme_post
+
+def test_websocket_receives_matching_post_writes(client, storage):
+    with client.websocket_connect("/api/v1/live/ws?state=Goa&resource=scheme-posts") as websocket:
+        scheme_post(title="kerala", states=["Kerala"]).save(storage["scheme_posts"])
+        post = scheme_post(title="goa", states=["Goa"])
+        post.save(storage["scheme_posts"])
+
+        event = json.loads(websocket.receive_text())
+        assert (event["op"], event["resource"], event["id"]) == ("insert", "scheme-posts", post.id)
+        assert event["post"]["title"] == "goa"
+        assert live_hub.metrics()["subscribers"] == 1
+
+def test_unknown_resource_is_rejected(client):
+    assert client.get("/api/v1/live/events", params={"resource": "scheme_posts"}).status_code == 400
+
+def test_slow_subscriber_is_dropped_instead_of_buffering():
+    async def scenario():
+        hub = LiveHub(buffer_size=2, max_subscribers=1)
+        subscriber = hub.subscribe(resource="gov-jobs-posts")
+        for i in range(3):
+            hub.publish("gov_jobs_posts", "update", {"_id": i, "states": []})
+        hub.publish("scheme_posts", "update", {"_id": 9, "states": []})
+        await asyncio.sleep(0)
+        events = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+        hub.unsubscribe(subscriber)
+        return events, hub.metrics()
+
+    events, metrics = asyncio.run(scenario())
+    assert events == [None]
+    assert metrics == {"subscribers": 0, "published": 3, "dropped": 1}
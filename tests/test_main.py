@@ -0,0 +1,36 @@
+import time
+from pymongo.errors import ServerSelectionTimeoutError
+from fastapi.testclient import TestClient
+from app import main
+
+def test_worker_stays_up_until_the_database_answers(db, monkeypatch):
+    attempts = []
+
+    def warm_pool(client, size):
+        attempts.append(size)
+        if len(attempts) < 3:
+            raise ServerSelectionTimeoutError("localhost:27017: connection refused")
+        return size
+
+    monkeypatch.setattr(main, "get_client", lambda: db.client)
+    monkeypatch.setattr(main, "warm_pool", warm_pool)
+    # Pipeline updates aren't supported by mongomock
+    monkeypatch.setattr(main, "backfill_last_activity", lambda collection: 0)
+    monkeypatch.setattr(main, "STARTUP_RETRY_SECONDS", 0.05)
+    app = main.create_app()
+
+    with TestClient(app) as client:
+        assert client.get("/healthz").status_code == 200
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert "connection refused" in response.json()["startup_error"]
+
+        deadline = time.time() + 5
+        while not app.state.readiness.ready and time.time() < deadline:
+            time.sleep(0.02)
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert "startup_error" not in response.json()
+        assert len(attempts) == 3
+        assert client.get("/metrics/matching").json()["subscriptions"] == 0
+    assert app.state.matcher._thread is None
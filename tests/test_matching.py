@@ -0,0 +1,47 @@
+from app.posts.cache import response_cache
+from app.posts.matching import SubscriptionMatcher
+from app.posts.model import Subscription
+from tests.factories import scheme_post
+
+def _subscription(subscriber_id: str, **fields) -> Subscription:
+    return Subscription(subscriber_id=subscriber_id, states=fields.get("states", []), cities=fields.get("cities", []),
+                        sector_ids=fields.get("sector_ids", []), documents=fields.get("documents", []),
+                        resources=fields.get("resources", []))
+
+def _matcher(storage, notified):
+    return SubscriptionMatcher(storage, notifier=lambda resource, post_id, ids: notified.extend(ids),
+                               reload_seconds=0)
+
+def test_new_post_reaches_matching_subscribers(storage):
+    notified = []
+    matcher = _matcher(storage, notified)
+    matcher.start()
+    try:
+        _subscription("goa", states=["Goa"]).save(storage["subscriptions"])
+        _subscription("kerala", states=["Kerala"]).save(storage["subscriptions"])
+        _subscription("jobs-only", resources=["gov-jobs-posts"]).save(storage["subscriptions"])
+        # Document names compare the same way the eligibility index does
+        _subscription("holder", documents=["aadhaar  CARD"]).save(storage["subscriptions"])
+        _subscription("no-docs", documents=["PAN Card"]).save(storage["subscriptions"])
+        post = scheme_post(states=["Goa"], documents=["Aadhaar Card"])
+        count = matcher.match_post("scheme_posts", post.to_dict())
+    finally:
+        matcher.stop()
+    assert count == 2
+    assert sorted(notified) == ["goa", "holder"]
+
+def test_index_reloads_when_another_worker_writes(storage):
+    matcher = _matcher(storage, [])
+    matcher.start()
+    matcher.stop()
+    assert len(matcher.index) == 0
+    assert not matcher.reload_if_changed()
+
+    # Written by another worker: no local notification, only the shared version moves
+    storage["subscriptions"].insert_one(_subscription("elsewhere").to_dict())
+    assert len(matcher.index) == 0
+    response_cache.invalidate("subscriptions")
+
+    assert matcher.reload_if_changed()
+    assert len(matcher.index) == 1
+    assert not matcher.reload_if_changed()
@@ -0,0 +1,40 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app import profiling
+from app.posts import model
+from app.posts.api import router
+from app.profiling import ProfileStore, ProfilingMiddleware, admin_router, token_matches
+
+def test_models_are_not_wrapped_while_profiling_is_off():
+    assert not profiling.PROFILING_ENABLED
+    assert not hasattr(model.SchemePost.to_dict, "__wrapped__")
+    assert not hasattr(model.SchemePost.from_dict, "__wrapped__")
+
+def test_token_matches():
+    assert token_matches(b"secret", "secret")
+    assert not token_matches(b"secreT", "secret")
+    assert not token_matches(None, "secret")
+    assert not token_matches(b"", "")
+
+def test_header_token_profiles_a_request(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    store = ProfileStore()
+    monkeypatch.setattr(profiling, "profile_store", store)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, token="secret", sample_rate=0)
+    app.include_router(router, prefix="/api/v1")
+    app.include_router(admin_router, prefix="/admin")
+    client = TestClient(app)
+
+    assert "x-profile-id" not in client.get("/api/v1/scheme-posts/").headers
+    assert "x-profile-id" not in client.get("/api/v1/scheme-posts/", headers={"x-profile-token": "wrong"}).headers
+    profile_id = client.get("/api/v1/scheme-posts/", headers={"x-profile-token": "secret"}).headers["x-profile-id"]
+
+    assert client.get(f"/admin/profiles/{profile_id}", headers={"x-profile-token": "wrong"}).status_code == 403
+    detail = client.get(f"/admin/profiles/{profile_id}", headers={"x-profile-token": "secret"}).json()
+    assert detail["status"] == 200
+    assert detail["trigger"] == "header"
+    assert detail["breakdown"]["endpoint_ms"] > 0
+    assert detail["top_functions"]
+    assert [summary["id"] for summary in client.get("/admin/profiles", headers={"x-profile-token": "secret"}).json()] \
+        == [profile_id]
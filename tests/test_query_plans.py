@@ -0,0 +1,52 @@
+from app.posts.indexes import ensure_indexes
+from app.posts.query_plans import QUERY_SHAPES, QueryShape, explain_shape, seed, to_markdown
+
+def test_every_shape_builds_a_query_against_seeded_data(db):
+    seed(db, 100)
+    ensure_indexes(db)
+    for shape in QUERY_SHAPES:
+        query_filter, sort, limit = shape.build(db)
+        cursor = db[shape.collection].find(query_filter)
+        if sort:
+            cursor = cursor.sort(sort)
+        list(cursor.limit(limit or 0))
+
+def test_subscription_bundle_and_backfill_queries_are_checked(db):
+    seed(db, 30)
+    shapes = {shape.name: shape for shape in QUERY_SHAPES}
+    assert {"scheme_posts.backfill_sector_name", "digital_services.backfill_last_activity"} <= set(shapes)
+    for name in ("subscriptions.find_by_subscriber", "state_bundles.listing_gov_jobs_posts"):
+        query_filter, _, _ = shapes[name].build(db)
+        assert db[shapes[name].collection].count_documents(query_filter)
+
+class _ExplainDb:
+    # Answers explain with a canned plan instead of running the query
+    def __init__(self, plan, returned, keys, docs):
+        self.explain = {
+            "queryPlanner": {"winningPlan": plan},
+            "executionStats": {"nReturned": returned, "totalKeysExamined": keys, "totalDocsExamined": docs,
+                               "executionTimeMillis": 1}
+        }
+        self.commands = []
+
+    def command(self, name, command, verbosity):
+        self.commands.append(command)
+        return self.explain
+
+def _shape(**ratios):
+    return QueryShape("posts.feed", "scheme_posts", lambda db: ({"a": 1}, [("b", -1)], 21), **ratios)
+
+def test_index_scan_within_ratios_passes():
+    db = _ExplainDb({"queryPlan": {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {
+        "stage": "IXSCAN"}}}}, returned=21, keys=21, docs=21)
+    result = explain_shape(db, _shape())
+    assert db.commands == [{"find": "scheme_posts", "filter": {"a": 1}, "sort": {"b": -1}, "limit": 21}]
+    assert (result["stages"], result["passed"]) == (["LIMIT", "FETCH", "IXSCAN"], True)
+    assert "| posts.feed | LIMIT > FETCH > IXSCAN | 21 | 21 | 21 | 1 | ok |" in to_markdown([result])
+
+def test_collection_scans_and_wasteful_plans_fail():
+    result = explain_shape(_ExplainDb({"stage": "COLLSCAN"}, returned=5, keys=0, docs=500), _shape())
+    assert result["problems"] == ["not an index scan", "docs examined/returned 100.00 > 2.0"]
+    result = explain_shape(_ExplainDb({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+                                      returned=10, keys=50, docs=10), _shape(max_keys_ratio=4.0))
+    assert result["problems"] == ["keys examined/returned 5.00 > 4.0"]
@@ -0,0 +1,49 @@
+import time
+import pytest
+from app.posts.model import Sector, add_write_listener, remove_write_listener
+from app.posts.sector_fanout import SectorFanout, backfill_sector_name
+from tests.factories import scheme_post
+
+@pytest.fixture
+def writes():
+    seen = []
+
+    def listener(collection_name, op, document):
+        seen.append((collection_name, op, document))
+
+    add_write_listener(listener)
+    yield seen
+    remove_write_listener(listener)
+
+def test_backfill_copies_sector_names_onto_older_posts(storage, writes):
+    posts = storage["scheme_posts"]
+    sector = Sector(name="Education")
+    sector.save(storage["sectors"])
+    scheme_post(title="old", sector_id=sector.id).save(posts)
+    scheme_post(title="current", sector_id=sector.id, sector_name="Education").save(posts)
+    scheme_post(title="orphan", sector_id="60d5ec49f8d2e30b8c8b4500").save(posts)
+    posts.update_one({"title": "old"}, {"$unset": {"sector_name": ""}})
+    writes.clear()
+
+    assert backfill_sector_name(posts, storage["sectors"]) == 1
+    names = {doc["title"]: doc.get("sector_name") for doc in posts.find()}
+    assert names == {"old": "Education", "current": "Education", "orphan": None}
+    assert backfill_sector_name(posts, storage["sectors"]) == 0
+    assert writes == [("scheme_posts", "update", None)]
+
+def test_fanout_refreshes_renamed_sector(storage, writes):
+    posts = storage["scheme_posts"]
+    for _ in range(3):
+        scheme_post(sector_id="60d5ec49f8d2e30b8c8b4567", sector_name="Old").save(posts)
+    writes.clear()
+    fanout = SectorFanout(batch_size=2)
+    job = fanout.start("60d5ec49f8d2e30b8c8b4567", "New", [posts])
+    deadline = time.time() + 5
+    while fanout.get_job(job["job_id"])["status"] != "done" and time.time() < deadline:
+        time.sleep(0.01)
+
+    job = fanout.get_job(job["job_id"])
+    assert (job["status"], job["total"], job["updated"]) == ("done", 3, 3)
+    assert {doc["sector_name"] for doc in posts.find()} == {"New"}
+    # Bulk changes are reported as document-less updates
+    assert writes == [("scheme_posts", "update", None)] * 2
@@ -0,0 +1,26 @@
+from tests.factories import scheme_post, gov_job_post, digital_service
+
+def test_facet_counts_per_collection(client, storage):
+    scheme_post(states=["Goa", "Kerala"], sector_id="a").save(storage["scheme_posts"])
+    scheme_post(states=["Goa"], sector_id="b").save(storage["scheme_posts"])
+    scheme_post(states=["Goa"], sector_id="a", end_in_days=-1).save(storage["scheme_posts"])
+    gov_job_post(states=["Kerala"]).save(storage["gov_jobs_posts"])
+    digital_service(states=["Goa"]).save(storage["digital_services"])
+
+    stats = client.get("/api/v1/stats/facets").json()
+    assert stats["scheme_posts"] == {
+        "by_state": [{"key": "Goa", "count": 3}, {"key": "Kerala", "count": 1}],
+        "by_sector": [{"key": "a", "count": 2}, {"key": "b", "count": 1}],
+        "by_status": [{"key": "open", "count": 2}, {"key": "closed", "count": 1}]
+    }
+    assert stats["gov_jobs_posts"]["by_status"] == [{"key": "open", "count": 1}]
+    assert stats["digital_services"] == {
+        "by_state": [{"key": "Goa", "count": 1}],
+        "by_sector": [],
+        "by_status": [{"key": "open", "count": 1}]
+    }
+
+def test_facet_counts_follow_writes(client, storage):
+    assert client.get("/api/v1/stats/facets").json()["gov_jobs_posts"]["by_state"] == []
+    gov_job_post(states=["Kerala"]).save(storage["gov_jobs_posts"])
+    assert client.get("/api/v1/stats/facets").json()["gov_jobs_posts"]["by_state"] == [{"key": "Kerala", "count": 1}]
@@ -0,0 +1,45 @@
+import glob
+import os
+import pytest
+from bson import decode_file_iter
+from fastapi.testclient import TestClient
+from app import storage as storage_module
+from app.main import create_app
+from app.posts.synthetic import SCRATCH_DB, generate
+from app.storage import MemoryBackend, MongoBackend
+from tests.factories import scheme_payload
+
+@pytest.fixture(scope="module")
+def snapshot_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("snapshot")
+    generate({"scheme_posts": 60, "gov_jobs_posts": 40, "digital_services": 20}, seed=3, sector_count=5,
+             towns_per_state=2, out=str(out), workers=1)
+    return os.path.join(str(out), SCRATCH_DB)
+
+def _client(backend, monkeypatch) -> TestClient:
+    monkeypatch.setattr(storage_module, "_storage", backend)
+    return TestClient(create_app())
+
+def _load_into(db, snapshot_dir: str) -> None:
+    for path in glob.glob(os.path.join(snapshot_dir, "*.bson")):
+        with open(path, "rb") as snapshot:
+            documents = list(decode_file_iter(snapshot))
+        db[os.path.splitext(os.path.basename(path))[0]].insert_many(documents)
+
+def test_snapshot_reads_match_mongo(db, snapshot_dir, monkeypatch):
+    _load_into(db, snapshot_dir)
+    paths = ["/api/v1/feed?limit=50", "/api/v1/scheme-posts/", "/api/v1/gov-jobs-posts/", "/api/v1/sectors/"]
+    mongo = _client(MongoBackend(db), monkeypatch)
+    expected = [mongo.get(path).json() for path in paths]
+    assert len(expected[0]["items"]) == 50 and expected[1] and expected[3]
+    memory = _client(MemoryBackend(snapshot_dir), monkeypatch)
+
+    assert [memory.get(path).json() for path in paths] == expected
+
+def test_snapshot_node_refuses_writes_and_ingestion(snapshot_dir, monkeypatch):
+    client = _client(MemoryBackend(snapshot_dir), monkeypatch)
+
+    assert client.post("/api/v1/scheme-posts/", json=scheme_payload()).status_code == 405
+    response = client.post("/api/v1/scheme-posts/ingest", json=scheme_payload())
+    assert response.status_code == 405
+    assert response.json() == {"detail": "This node is read-only"}
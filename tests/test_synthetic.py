@@ -0,0 +1,37 @@
+import os
+import time
+import pytest
+from app.config import MONGO_DB_NAME
+from app.posts.synthetic import SCRATCH_DB, generate, main
+
+@pytest.fixture
+def set_timezone(monkeypatch):
+    def set_timezone(name: str) -> None:
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+    yield set_timezone
+    monkeypatch.undo()
+    time.tzset()
+
+def _dataset(out: str) -> dict:
+    generate({"scheme_posts": 30, "gov_jobs_posts": 20, "digital_services": 10}, seed=7, sector_count=5,
+             towns_per_state=2, out=str(out), workers=2, chunk_size=8)
+    folder = os.path.join(str(out), SCRATCH_DB)
+    return {name: open(os.path.join(folder, name), "rb").read() for name in sorted(os.listdir(folder))}
+
+def test_generated_dataset_is_identical_across_host_timezones(tmp_path, set_timezone):
+    set_timezone("UTC")
+    utc = _dataset(tmp_path / "utc")
+    set_timezone("Asia/Kolkata")
+    ist = _dataset(tmp_path / "ist")
+
+    assert sorted(utc) == ["digital_services.bson", "gov_jobs_posts.bson", "scheme_posts.bson", "sectors.bson",
+                           "states_and_cities.bson"]
+    assert utc == ist
+
+def test_app_database_needs_an_explicit_flag(capsys):
+    with pytest.raises(ValueError):
+        generate({"scheme_posts": 1}, db=MONGO_DB_NAME)
+    with pytest.raises(SystemExit):
+        main(["--db", MONGO_DB_NAME])
+    assert "--allow-app-db" in capsys.readouterr().err
@@ -0,0 +1,24 @@
+from tests.factories import scheme_post
+
+def test_bulk_update_notes_report_missing_and_malformed_ids(client, storage):
+    post = scheme_post()
+    post.save(storage["scheme_posts"])
+    absent = "60d5ec49f8d2e30b8c8b4500"
+
+    response = client.post("/api/v1/scheme-posts/updates", json={"notes": [
+        {"post_id": post.id, "date": "2030-02-01T00:00:00", "note": "Second"},
+        {"post_id": post.id, "date": "2030-01-01T00:00:00", "note": "First"},
+        {"post_id": absent, "date": "2030-01-01T00:00:00", "note": "Lost"},
+        {"post_id": "not-an-id", "date": "2030-01-01T00:00:00", "note": "Bad"}
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {"matched": 1, "modified": 1, "missing": [absent, "not-an-id"]}
+    stored = client.get(f"/api/v1/scheme-posts/{post.id}").json()
+    assert [update["note"] for update in stored["updates"]] == ["First", "Second"]
+
+def test_bulk_update_notes_with_only_malformed_ids(client):
+    response = client.post("/api/v1/scheme-posts/updates", json={"notes": [
+        {"post_id": "not-an-id", "date": "2030-01-01T00:00:00", "note": "Bad"}
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {"matched": 0, "modified": 0, "missing": ["not-an-id"]}